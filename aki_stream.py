@@ -0,0 +1,270 @@
+# ========= Copyright 2023-2024 @ CAMEL-AI.org. All Rights Reserved. =========
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ========= Copyright 2023-2024 @ CAMEL-AI.org. All Rights Reserved. =========
+r"""
+Streaming KDIGO acute kidney injury (AKI) staging from serum creatinine.
+
+Creatinine results are converted to mg/dL with the molar mass of the eGFR
+calculators, and the lowest creatinine of each patient over the last 48
+hours and 7 days is kept in two rolling minima. Each rolling minimum is a
+monotonic queue stored in a growable ring buffer of flat arrays, so a
+result costs O(1) amortized whatever the number of results in the window.
+
+Date: March 2025
+"""
+
+from array import array
+
+from camel.toolkits.medcalc_bench.utils.unit_registry import (
+    UNIT_SYMBOLS,
+    compound_code,
+    convert,
+    unit_code,
+)
+
+_CREATININE = compound_code(113.12)
+_MG_DL = unit_code("mg/dL")
+
+
+def creatinine_mg_dl(value, unit):
+    r"""
+    Converts a creatinine result to mg/dL with the molar mass 113.12 g/mol
+    of `ckd_epi_2021_creatinine.py`, without rounding intermediate steps.
+    """
+
+    code = unit_code(unit)
+    creatinine = convert(value, code, _MG_DL, _CREATININE)
+
+    if creatinine != creatinine:
+        raise ValueError(
+            f"Unsupported creatinine unit: {UNIT_SYMBOLS[code]}; expected a "
+            "mass or molar concentration such as mg/dL or µmol/L."
+        )
+
+    return creatinine
+
+
+def kdigo_stage(creatinine, minimum_48h, minimum_7d, rrt=False):
+    r"""
+    Stages AKI with the KDIGO creatinine criteria.
+
+    Parameters:
+        creatinine (float): The current creatinine in mg/dL.
+        minimum_48h (float): The lowest creatinine of the last 48 hours.
+        minimum_7d (float): The lowest creatinine of the last 7 days, used
+        as the baseline.
+        rrt (bool): Whether renal replacement therapy was started.
+        (default: :obj:`False`)
+
+    Returns:
+        int: 0 without AKI, otherwise the stage 1, 2 or 3:
+            - Stage 1: a rise of 0.3 mg/dL or more within 48 hours, or 1.5
+            to 1.9 times the baseline.
+            - Stage 2: 2.0 to 2.9 times the baseline.
+            - Stage 3: 3.0 times the baseline or more, a creatinine of
+            4.0 mg/dL or more meeting a stage 1 criterion, or renal
+            replacement therapy.
+
+    Notes:
+        - The rise and the ratio are rounded to three decimals before they
+        are compared, so e.g. 0.9 to 1.2 mg/dL counts as a 0.3 mg/dL rise
+        despite its floating-point difference of 0.29999999999999993.
+    """
+
+    ratio = round(creatinine / minimum_7d, 3)
+    rise = round(creatinine - minimum_48h, 3)
+    stage_1 = ratio >= 1.5 or rise >= 0.3
+
+    if rrt or ratio >= 3 or (creatinine >= 4 and stage_1):
+        return 3
+    if ratio >= 2:
+        return 2
+    return 1 if stage_1 else 0
+
+
+class _RollingMinimum:
+    __slots__ = ("span", "times", "values", "head", "size")
+
+    def __init__(self, span, capacity=8):
+        self.span = span
+        self.times = array("d", [0.0]) * capacity
+        self.values = array("d", [0.0]) * capacity
+        self.head = 0
+        self.size = 0
+
+    def _grow(self):
+        capacity = len(self.values)
+        order = [(self.head + i) % capacity for i in range(self.size)]
+        self.times = array("d", (self.times[i] for i in order))
+        self.values = array("d", (self.values[i] for i in order))
+        self.times.extend(array("d", [0.0]) * capacity)
+        self.values.extend(array("d", [0.0]) * capacity)
+        self.head = 0
+
+    def push(self, time, value):
+        # Values are increasing from the oldest to the newest entry, so the
+        # oldest entry still in the window is the minimum.
+        capacity = len(self.values)
+        values = self.values
+
+        while self.size and values[
+            (self.head + self.size - 1) % capacity
+        ] >= value:
+            self.size -= 1
+
+        if self.size == capacity:
+            self._grow()
+            capacity = len(self.values)
+            values = self.values
+
+        tail = (self.head + self.size) % capacity
+        self.times[tail] = time
+        values[tail] = value
+        self.size += 1
+
+        start = time - self.span
+        while self.times[self.head] < start:
+            self.head = (self.head + 1) % capacity
+            self.size -= 1
+
+    def minimum(self):
+        return self.values[self.head]
+
+
+class _PatientAKI:
+    __slots__ = ("time", "short", "long", "stage")
+
+    def __init__(self, short_window, long_window):
+        self.time = None
+        self.short = _RollingMinimum(short_window)
+        self.long = _RollingMinimum(long_window)
+        self.stage = 0
+
+
+class AKIStream:
+    r"""
+    Stages AKI per patient over a stream of creatinine results.
+
+    Parameters:
+        short_window (float): The window of the absolute rise criterion, in
+        the unit of the result times. (default: :obj:`48`, hours)
+        long_window (float): The window of the baseline creatinine.
+        (default: :obj:`168`, 7 days in hours)
+
+    Notes:
+        - Results of a patient must arrive in non-decreasing time order.
+        - The current result is part of both windows, so a first result or
+        a new minimum stages as 0.
+
+    Example:
+        stream = AKIStream()
+        stream.add("p1", 0, 0.9, "mg/dL")
+        stream.add("p1", 30, 1.3, "mg/dL")
+
+        output: ('p1', 30, 0, 1)
+    """
+
+    def __init__(self, short_window=48, long_window=168):
+        self.short_window = short_window
+        self.long_window = long_window
+        self._patients = {}
+
+    def add(self, patient, time, value, unit="mg/dL", rrt=False):
+        r"""
+        Ingests one creatinine result.
+
+        Parameters:
+            patient (Hashable): The patient identifier.
+            time (float): The time of the result.
+            value (float): The creatinine value.
+            unit (str): The unit of `value`, e.g. "mg/dL" or "µmol/L".
+            (default: :obj:`"mg/dL"`)
+            rrt (bool): Whether renal replacement therapy was started.
+            (default: :obj:`False`)
+
+        Returns:
+            tuple: (patient, time, previous_stage, stage) when the stage
+            changes, None otherwise.
+        """
+
+        state = self._patients.get(patient)
+        if state is None:
+            state = self._patients[patient] = _PatientAKI(
+                self.short_window, self.long_window
+            )
+        elif time < state.time:
+            raise ValueError(
+                f"Result for patient {patient} at time {time} arrived after "
+                f"a result at time {state.time}."
+            )
+
+        creatinine = creatinine_mg_dl(value, unit)
+        state.time = time
+        state.short.push(time, creatinine)
+        state.long.push(time, creatinine)
+
+        stage = kdigo_stage(
+            creatinine, state.short.minimum(), state.long.minimum(), rrt
+        )
+        if stage == state.stage:
+            return None
+
+        previous, state.stage = state.stage, stage
+        return patient, time, previous, stage
+
+    def add_results(self, results):
+        r"""
+        Ingests an iterable of results, each a tuple of the `add` arguments
+        (patient, time, value, unit[, rrt]), and yields the stage changes.
+        """
+
+        add = self.add
+        for result in results:
+            change = add(*result)
+            if change is not None:
+                yield change
+
+    def stage(self, patient):
+        r"""
+        Returns the current AKI stage of a patient, 0 if never seen.
+        """
+
+        state = self._patients.get(patient)
+        return 0 if state is None else state.stage
+
+    def discharge(self, patient):
+        r"""
+        Drops the state of a patient, e.g. at discharge.
+        """
+
+        self._patients.pop(patient, None)
+
+
+if __name__ == "__main__":
+    results = [
+        ("p1", 0.0, 0.9, "mg/dL"),
+        ("p1", 20.0, 1.0, "mg/dL"),
+        ("p1", 30.0, 1.3, "mg/dL"),
+        ("p1", 60.0, 1.9, "mg/dL"),
+        ("p1", 90.0, 2.8, "mg/dL"),
+        ("p1", 200.0, 2.6, "mg/dL"),
+        ("p1", 300.0, 2.5, "mg/dL"),
+        ("p2", 0.0, 80.0, "µmol/L"),
+        ("p2", 12.0, 110.0, "µmol/L"),
+        ("p2", 36.0, 120.0, "µmol/L", True),
+    ]
+
+    stream = AKIStream()
+    for change in stream.add_results(results):
+        print(change)
+    print(stream.stage("p1"), stream.stage("p2"))
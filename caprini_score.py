@@ -23,6 +23,8 @@ Modifications include:
 Date: March 2025
 """
 
+import numpy as np
+
 from camel.toolkits.medcalc_bench.utils.age_conversion import (
     age_conversion_explanation,
 )
@@ -236,6 +238,180 @@ def caprini_score_explanation(input_parameters):
     return {"Explanation": explanation, "Answer": score}
 
 
+# Precompiled factor index used by the batch scorer. Every scored factor
+# (age band, surgery type, mobility level, BMI > 25 and each boolean risk
+# factor) gets a dense id and a weight.
+age_bands = {
+    "age 41-60": 1,
+    "age 61-74": 2,
+    "age >= 75": 3,
+}
+
+caprini_factors = (
+    list(age_bands)
+    + [f"surgery_type: {key}" for key in surgery_type]
+    + [f"mobility: {key}" for key in mobility]
+    + ["bmi > 25"]
+    + [key for key, value in param_full_name.items() if type(value) is tuple]
+)
+caprini_factor_ids = {key: index for index, key in enumerate(caprini_factors)}
+caprini_weights = np.array(
+    list(age_bands.values())
+    + list(surgery_type.values())
+    + list(mobility.values())
+    + [2]
+    + [
+        value[1]
+        for value in param_full_name.values()
+        if type(value) is tuple
+    ]
+)
+
+# ICD-10-CM code prefixes (without the dot) of coded diagnoses that imply a
+# boolean risk factor. The longest matching prefix wins.
+caprini_icd10_prefixes = {
+    "I50": "chf",
+    "A40": "sepsis",
+    "A41": "sepsis",
+    "R652": "sepsis",
+    "J12": "pneumonia",
+    "J13": "pneumonia",
+    "J14": "pneumonia",
+    "J15": "pneumonia",
+    "J16": "pneumonia",
+    "J17": "pneumonia",
+    "J18": "pneumonia",
+    "S32": "hip_pelvis_leg_fracture",
+    "S72": "hip_pelvis_leg_fracture",
+    "S82": "hip_pelvis_leg_fracture",
+    "I63": "stroke",
+    "T07": "multiple trauma",
+    "S141": "acute_spinal_chord_injury",
+    "S241": "acute_spinal_chord_injury",
+    "S341": "acute_spinal_chord_injury",
+    "I83": "varicose_veins",
+    "R600": "current_swollen_legs",
+    "Z86718": "previous_dvt",
+    "Z86711": "previous_pe",
+    "D6851": "positive_factor_v",
+    "D6852": "positive_prothrombin",
+    "E7211": "serum_homocysteine",
+    "D6862": "positive_lupus_anticoagulant",
+    "D6861": "elevated_anticardiolipin_antibody",
+    "D7582": "heparin_induced_thrombocytopenia",
+    "D6859": "congenital_acquired_thrombophilia",
+    "D6869": "congenital_acquired_thrombophilia",
+    "K50": "inflammatory_bowel_disease",
+    "K51": "inflammatory_bowel_disease",
+    "I21": "acute_myocardial_infarction",
+    "J44": "copd",
+    "C": "malignancy",
+    "Z85": "malignancy",
+}
+_longest_icd10_prefix = max(map(len, caprini_icd10_prefixes))
+
+
+def caprini_factor_list(input_parameters):
+    r"""
+    Encodes the inputs of `caprini_score_explanation` as factor ids.
+
+    Parameters:
+        input_parameters (dict): The same dictionary as taken by
+        `caprini_score_explanation`.
+
+    Returns:
+        list: The ids (indices into `caprini_factors`) of the factors that
+        score points for the patient.
+    """
+
+    factor_ids = []
+    age = age_conversion_explanation(input_parameters["age"])[1]
+
+    if 41 <= age <= 60:
+        factor_ids.append(caprini_factor_ids["age 41-60"])
+    elif 61 <= age <= 74:
+        factor_ids.append(caprini_factor_ids["age 61-74"])
+    elif age >= 75:
+        factor_ids.append(caprini_factor_ids["age >= 75"])
+
+    for param, value in input_parameters.items():
+        if param in ("surgery_type", "mobility"):
+            factor_ids.append(caprini_factor_ids[f"{param}: {value}"])
+        elif param == "bmi":
+            if value[0] > 25:
+                factor_ids.append(caprini_factor_ids["bmi > 25"])
+        elif param in caprini_factor_ids and value:
+            factor_ids.append(caprini_factor_ids[param])
+
+    return factor_ids
+
+
+def icd10_factor_list(codes):
+    r"""
+    Maps a coded problem list to the ids of the risk factors it implies.
+
+    Parameters:
+        codes (Iterable[str]): ICD-10-CM codes, with or without dots.
+
+    Returns:
+        list: The sorted, distinct factor ids implied by the codes.
+    """
+
+    factor_ids = set()
+
+    for code in codes:
+        code = code.replace(".", "").strip().upper()
+        for length in range(min(len(code), _longest_icd10_prefix), 0, -1):
+            key = caprini_icd10_prefixes.get(code[:length])
+            if key is not None:
+                factor_ids.add(caprini_factor_ids[key])
+                break
+
+    return sorted(factor_ids)
+
+
+def caprini_scores(factor_ids, offsets=None):
+    r"""
+    Scores a batch of patients from sparse factor-id lists.
+
+    Parameters:
+        factor_ids (list or array_like): Either one list of factor ids per
+        patient, or a flat array of factor ids when `offsets` is given.
+        offsets (array_like): The CSR row pointer of the flat `factor_ids`:
+        patient i owns factor_ids[offsets[i]:offsets[i + 1]].
+        (default: :obj:`None`)
+
+    Returns:
+        numpy.ndarray: The Caprini score of each patient.
+
+    Notes:
+        - The patient-by-factor incidence matrix is kept in CSR form and
+        multiplied with `caprini_weights` by one weighted bincount.
+        - A factor listed more than once for a patient is counted once.
+        - Present boolean risk factors score their points, as the
+        explanation of `caprini_score_explanation` describes, although its
+        answer leaves them out.
+    """
+
+    if offsets is None:
+        offsets = np.cumsum([0] + [len(row) for row in factor_ids])
+        factor_ids = [factor_id for row in factor_ids for factor_id in row]
+
+    factor_ids = np.asarray(factor_ids, dtype=np.int64)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    size = len(offsets) - 1
+    count = len(caprini_factors)
+
+    rows = np.repeat(np.arange(size), np.diff(offsets))
+    cells = np.unique(rows * count + factor_ids)
+
+    return np.bincount(
+        cells // count,
+        weights=caprini_weights[cells % count],
+        minlength=size,
+    ).astype(np.int64)
+
+
 if __name__ == "__main__":
     # Defining test cases
     test_cases = [
@@ -280,3 +456,12 @@ if __name__ == "__main__":
         result = caprini_score_explanation(input_variables)
         print(result)
         print("-" * 50)
+
+    print(
+        caprini_scores(
+            [
+                caprini_factor_list(test_cases[0]),
+                icd10_factor_list(["I50.9", "C34.90", "Z86.718"]),
+            ]
+        )
+    )
@@ -0,0 +1,286 @@
+# ========= Copyright 2023-2024 @ CAMEL-AI.org. All Rights Reserved. =========
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ========= Copyright 2023-2024 @ CAMEL-AI.org. All Rights Reserved. =========
+r"""
+Columnar cardiovascular risk kernel: HEART, RCRI, CHA2DS2-VASc and HAS-BLED.
+
+The four scores share age, sex, hypertension, diabetes and stroke history.
+This kernel reads each shared column of a cohort table once and evaluates
+`heart_score.py`, `cardiac_risk_index.py`, `cha2ds2_vasc_score.py` and
+`has_bled_score.py` on whole arrays.
+
+Date: March 2025
+"""
+
+import numpy as np
+
+from camel.toolkits.medcalc_bench.criteria_bitmask import (
+    cha2ds2_vasc_criteria,
+    encode_columns,
+    has_bled_criteria,
+    score_masks,
+)
+from camel.toolkits.medcalc_bench.utils.unit_converter_new import (
+    conversion_column,
+)
+
+# Points of the categorical HEART inputs, with the value assumed when an
+# input is not reported.
+heart_categories = {
+    "history": (
+        {
+            "Slightly suspicious": 0,
+            "Moderately suspicious": 1,
+            "Highly suspicious": 2,
+        },
+        "Slightly suspicious",
+    ),
+    "electrocardiogram": (
+        {
+            "Normal": 0,
+            "Non-specific repolarization disturbance": 1,
+            "Significant ST deviation": 2,
+        },
+        "Normal",
+    ),
+    "initial_troponin": (
+        {
+            "less than or equal to normal limit": 0,
+            "between the normal limit or up to "
+            "three times the normal limit": 1,
+            "greater than three times normal limit": 2,
+        },
+        "less than or equal to normal limit",
+    ),
+}
+
+heart_risk_factors = (
+    "hypertension",
+    "hypercholesterolemia",
+    "diabetes_mellitus",
+    "obesity",
+    "smoking",
+    "family_with_cvd",
+    "atherosclerotic_disease",
+)
+
+rcri_criteria = (
+    "elevated_risk_surgery",
+    "ischemetic_heart_disease",
+    "congestive_heart_failure",
+    "cerebrovascular_disease",
+    "pre_operative_insulin_treatment",
+)
+
+
+def _size(columns):
+    column = next(iter(columns.values()))
+    if isinstance(column, tuple):
+        column = column[0]
+    return len(column)
+
+
+def _flags(columns, name, size):
+    if name not in columns:
+        return np.zeros(size, dtype=bool)
+    return np.asarray(columns[name], dtype=bool)
+
+
+def _category_points(columns, name, size):
+    points, default = heart_categories[name]
+
+    if name not in columns:
+        return np.full(size, points[default], dtype=np.int64)
+
+    column = np.array(columns[name], dtype=object)
+    column[np.equal(column, None)] = default
+    uniques, inverse = np.unique(column.astype(str), return_inverse=True)
+    mapped = np.array([points[value] for value in uniques], dtype=np.int64)
+
+    return mapped[inverse.reshape(-1)]
+
+
+def heart_scores(columns):
+    r"""
+    Computes HEART scores for a cohort.
+
+    Parameters:
+        columns (dict): Equal-length columns, see `cardiovascular_risk`.
+
+    Returns:
+        numpy.ndarray: The HEART scores (dtype int64).
+
+    Notes:
+        - Like the scalar calculator, the risk factor criterion gives 1
+        point for 1-2 risk factors and 2 points for 3 or more, so a history
+        of atherosclerotic disease counts as one risk factor.
+    """
+
+    size = _size(columns)
+    age = np.asarray(columns["age"], dtype=np.float64)
+
+    risk_factors = np.zeros(size, dtype=np.int64)
+    for name in heart_risk_factors:
+        risk_factors += _flags(columns, name, size)
+
+    scores = np.digitize(age, (45, 65)) + np.digitize(risk_factors, (1, 3))
+    for name in heart_categories:
+        scores += _category_points(columns, name, size)
+
+    return scores
+
+
+def rcri_scores(columns):
+    r"""
+    Computes Revised Cardiac Risk Index scores for a cohort.
+
+    Parameters:
+        columns (dict): Equal-length columns, see `cardiovascular_risk`.
+
+    Returns:
+        numpy.ndarray: The RCRI scores (dtype int64).
+    """
+
+    size = _size(columns)
+    scores = np.zeros(size, dtype=np.int64)
+
+    for name in rcri_criteria:
+        scores += _flags(columns, name, size)
+
+    if "pre_operative_creatinine" in columns:
+        values, units = columns["pre_operative_creatinine"]
+        creatinine = conversion_column(
+            values, units, "creatinine", 113.12, None, "mg/dL"
+        )
+        scores += creatinine > 2
+
+    return scores
+
+
+def _bitmask_scores(criteria, columns):
+    keys = {key for _, key, _ in criteria["features"]}
+    masks = encode_columns(
+        criteria, {key: columns[key] for key in keys if key in columns}
+    )
+    return score_masks(criteria, masks)
+
+
+def cha2ds2_vasc_scores(columns):
+    r"""
+    Computes CHA2DS2-VASc scores for a cohort with the criteria masks of
+    `criteria_bitmask.py`.
+
+    Parameters:
+        columns (dict): Equal-length columns, see `cardiovascular_risk`.
+
+    Returns:
+        numpy.ndarray: The CHA2DS2-VASc scores (dtype int64).
+    """
+
+    return _bitmask_scores(cha2ds2_vasc_criteria, columns)
+
+
+def has_bled_scores(columns):
+    r"""
+    Computes HAS-BLED scores for a cohort with the criteria masks of
+    `criteria_bitmask.py`.
+
+    Parameters:
+        columns (dict): Equal-length columns, see `cardiovascular_risk`.
+
+    Returns:
+        numpy.ndarray: The HAS-BLED scores (dtype int64).
+    """
+
+    return _bitmask_scores(has_bled_criteria, columns)
+
+
+def cardiovascular_risk(columns):
+    r"""
+    Computes HEART, RCRI, CHA2DS2-VASc and HAS-BLED for a cohort.
+
+    Parameters:
+        columns (dict): Equal-length columns keyed like the calculators'
+        inputs:
+            - "age": age in years; "sex": "Male" or "Female".
+            - "pre_operative_creatinine": a (values, units) pair, where
+            `units` is one unit or an array of units.
+            - "alcoholic_drinks": drinks per week.
+            - "history", "electrocardiogram", "initial_troponin": HEART
+            categories, None where not reported.
+            - The criteria of the four calculators: optional booleans.
+            HEART uses "diabetes" when "diabetes_mellitus" is not given.
+
+    Returns:
+        dict: The scores whose inputs are present, as int64 arrays: "heart"
+        (needs age), "rcri" (needs any RCRI input), "cha2ds2_vasc" (needs
+        age and sex) and "has_bled" (needs age and alcoholic drinks).
+
+    Example:
+        cardiovascular_risk({"age": [72], "sex": ["Female"],
+        "hypertension": [True], "stroke": [True], "alcoholic_drinks": [2]})
+
+        output: {'heart': array([3]), 'cha2ds2_vasc': array([5]),
+        'has_bled': array([3])}
+    """
+
+    results = {}
+
+    if "age" in columns:
+        heart_columns = columns
+        if "diabetes_mellitus" not in columns and "diabetes" in columns:
+            heart_columns = dict(
+                columns, diabetes_mellitus=columns["diabetes"]
+            )
+        results["heart"] = heart_scores(heart_columns)
+
+    if any(
+        name in columns
+        for name in rcri_criteria + ("pre_operative_creatinine",)
+    ):
+        results["rcri"] = rcri_scores(columns)
+
+    if "age" in columns and "sex" in columns:
+        results["cha2ds2_vasc"] = cha2ds2_vasc_scores(columns)
+
+    if "age" in columns and "alcoholic_drinks" in columns:
+        results["has_bled"] = has_bled_scores(columns)
+
+    return results
+
+
+if __name__ == "__main__":
+    columns = {
+        "age": [72, 58, 81],
+        "sex": ["Female", "Male", "Male"],
+        "hypertension": [True, False, True],
+        "diabetes": [False, True, True],
+        "stroke": [True, False, False],
+        "chf": [False, False, True],
+        "history": ["Moderately suspicious", None, "Highly suspicious"],
+        "electrocardiogram": [
+            "Normal",
+            "Non-specific repolarization disturbance",
+            "Significant ST deviation",
+        ],
+        "smoking": [False, True, True],
+        "congestive_heart_failure": [False, False, True],
+        "elevated_risk_surgery": [True, False, True],
+        "pre_operative_creatinine": ([1.1, 2.4, 221.0], ["mg/dL", "mg/dL",
+                                                         "µmol/L"]),
+        "alcoholic_drinks": [2, 10, 0],
+        "labile_inr": [False, False, True],
+    }
+
+    for name, values in cardiovascular_risk(columns).items():
+        print(name, values)
@@ -0,0 +1,413 @@
+# ========= Copyright 2023-2024 @ CAMEL-AI.org. All Rights Reserved. =========
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ========= Copyright 2023-2024 @ CAMEL-AI.org. All Rights Reserved. =========
+r"""
+ICD-10 classifier feeding the Charlson Comorbidity Index (CCI).
+
+Claim-line ICD-10 codes are mapped to the inputs of `cci.py` with the Quan
+et al. (2005) Charlson coding algorithm. The code prefixes are compiled
+once into a sorted, prefix-free array, so a whole column of codes is
+classified with one binary search and one prefix comparison per code.
+Claims are then reduced per patient in fixed-size chunks, keeping only the
+most severe liver disease, diabetes and solid tumor tier.
+
+Date: March 2025
+"""
+
+from itertools import islice
+
+import numpy as np
+
+from camel.toolkits.medcalc_bench.criteria_bitmask import (
+    cci_criteria,
+    score_records,
+)
+
+
+def _codes(*specs):
+    # Expands specs such as "I60-I69" or "K70.0-K70.3" into code prefixes.
+    prefixes = []
+
+    for spec in specs:
+        first, _, last = spec.replace(".", "").partition("-")
+        if not last:
+            prefixes.append(first)
+            continue
+
+        head = len(first.rstrip("0123456789"))
+        width = len(first) - head
+        for number in range(int(first[head:]), int(last[head:]) + 1):
+            prefixes.append(f"{first[:head]}{number:0{width}d}")
+
+    return prefixes
+
+
+def _diabetes_codes(subcodes):
+    return [
+        f"{block}{subcode}"
+        for block in ("E10", "E11", "E12", "E13", "E14")
+        for subcode in subcodes
+    ]
+
+
+# CCI input (key, value) of each category, in increasing severity within a
+# key, so later categories override earlier ones for the same patient.
+cci_categories = (
+    ("mi", True),
+    ("chf", True),
+    ("peripheral_vascular_disease", True),
+    ("cva", True),
+    ("tia", True),
+    ("dementia", True),
+    ("copd", True),
+    ("connective_tissue_disease", True),
+    ("peptic_ucler_disease", True),
+    ("hemiplegia", True),
+    ("moderate_to_severe_ckd", True),
+    ("leukemia", True),
+    ("lymphoma", True),
+    ("aids", True),
+    ("liver_disease", "mild"),
+    ("liver_disease", "moderate to severe"),
+    ("diabetes_mellitus", "uncomplicated"),
+    ("diabetes_mellitus", "end-organ damage"),
+    ("solid_tumor", "localized"),
+    ("solid_tumor", "metastatic"),
+)
+
+# Values of the CCI inputs for patients without a matching code.
+cci_defaults = {key: False for key, value in cci_categories}
+cci_defaults.update(
+    {
+        "liver_disease": "none",
+        "diabetes_mellitus": "none or diet-controlled",
+        "solid_tumor": "none",
+    }
+)
+
+# ICD-10 code prefixes (without the dot) of each category, following the
+# Quan et al. (2005) enhanced ICD-10 Charlson coding algorithm.
+cci_icd10_prefixes = {
+    ("mi", True): _codes("I21", "I22", "I25.2"),
+    ("chf", True): _codes(
+        "I09.9",
+        "I11.0",
+        "I13.0",
+        "I13.2",
+        "I25.5",
+        "I42.0",
+        "I42.5-I42.9",
+        "I43",
+        "I50",
+        "P29.0",
+    ),
+    ("peripheral_vascular_disease", True): _codes(
+        "I70",
+        "I71",
+        "I73.1",
+        "I73.8",
+        "I73.9",
+        "I77.1",
+        "I79.0",
+        "I79.2",
+        "K55.1",
+        "K55.8",
+        "K55.9",
+        "Z95.8",
+        "Z95.9",
+    ),
+    ("cva", True): _codes("H34.0", "I60-I69"),
+    ("tia", True): _codes("G45", "G46"),
+    ("dementia", True): _codes("F00-F03", "F05.1", "G30", "G31.1"),
+    ("copd", True): _codes(
+        "I27.8",
+        "I27.9",
+        "J40-J47",
+        "J60-J67",
+        "J68.4",
+        "J70.1",
+        "J70.3",
+    ),
+    ("connective_tissue_disease", True): _codes(
+        "M05", "M06", "M31.5", "M32-M34", "M35.1", "M35.3", "M36.0"
+    ),
+    ("peptic_ucler_disease", True): _codes("K25-K28"),
+    ("hemiplegia", True): _codes(
+        "G04.1",
+        "G11.4",
+        "G80.1",
+        "G80.2",
+        "G81",
+        "G82",
+        "G83.0-G83.4",
+        "G83.9",
+    ),
+    ("moderate_to_severe_ckd", True): _codes(
+        "I12.0",
+        "I13.1",
+        "N03.2-N03.7",
+        "N05.2-N05.7",
+        "N18",
+        "N19",
+        "N25.0",
+        "Z49.0-Z49.2",
+        "Z94.0",
+        "Z99.2",
+    ),
+    ("leukemia", True): _codes("C91-C95"),
+    ("lymphoma", True): _codes("C81-C85", "C88", "C90", "C96"),
+    ("aids", True): _codes("B20-B22", "B24"),
+    ("liver_disease", "mild"): _codes(
+        "B18",
+        "K70.0-K70.3",
+        "K70.9",
+        "K71.3-K71.5",
+        "K71.7",
+        "K73",
+        "K74",
+        "K76.0",
+        "K76.2-K76.4",
+        "K76.8",
+        "K76.9",
+        "Z94.4",
+    ),
+    ("liver_disease", "moderate to severe"): _codes(
+        "I85.0",
+        "I85.9",
+        "I86.4",
+        "I98.2",
+        "K70.4",
+        "K71.1",
+        "K72.1",
+        "K72.9",
+        "K76.5-K76.7",
+    ),
+    ("diabetes_mellitus", "uncomplicated"): _diabetes_codes("01689"),
+    ("diabetes_mellitus", "end-organ damage"): _diabetes_codes("23457"),
+    ("solid_tumor", "localized"): _codes(
+        "C00-C26", "C30-C34", "C37-C41", "C43", "C45-C58", "C60-C76", "C97"
+    ),
+    ("solid_tumor", "metastatic"): _codes("C77-C80"),
+}
+
+
+def _compile(prefixes):
+    pairs = sorted(
+        (prefix, cci_categories.index(category))
+        for category, codes in prefixes.items()
+        for prefix in codes
+    )
+
+    for (prefix, _), (following, _) in zip(pairs, pairs[1:]):
+        if following.startswith(prefix):
+            raise ValueError(
+                f"ICD-10 prefix {prefix} overlaps with prefix {following}."
+            )
+
+    return (
+        np.array([prefix for prefix, _ in pairs]),
+        np.array([category for _, category in pairs], dtype=np.int8),
+    )
+
+
+# In a sorted prefix-free array, the only prefix that can match a code is
+# the last prefix sorting at or before the code.
+_PREFIXES, _PREFIX_CATEGORIES = _compile(cci_icd10_prefixes)
+
+
+def normalize_codes(codes):
+    r"""
+    Normalizes ICD-10 codes to upper case without dots or spaces.
+
+    Parameters:
+        codes (array_like): ICD-10 codes such as "I50.9" or "e11.65".
+
+    Returns:
+        numpy.ndarray: The normalized codes as a unicode string array.
+    """
+
+    codes = np.asarray(codes, dtype=str)
+    codes = np.char.replace(codes, ".", "")
+    return np.char.upper(np.char.strip(codes))
+
+
+def classify_codes(codes):
+    r"""
+    Maps a column of ICD-10 codes to CCI categories.
+
+    Parameters:
+        codes (array_like): ICD-10 codes, with or without dots.
+
+    Returns:
+        numpy.ndarray: The index into `cci_categories` of each code (dtype
+        int8), or -1 for codes that do not count towards the CCI.
+    """
+
+    codes = normalize_codes(codes)
+
+    if not codes.size:
+        return np.empty(0, dtype=np.int8)
+
+    rows = np.searchsorted(_PREFIXES, codes, side="right") - 1
+    candidates = _PREFIXES[np.maximum(rows, 0)]
+    matched = (rows >= 0) & np.char.startswith(codes, candidates)
+
+    return np.where(matched, _PREFIX_CATEGORIES[np.maximum(rows, 0)], -1)
+
+
+def _record(mask):
+    record = dict(cci_defaults)
+
+    for category, (key, value) in enumerate(cci_categories):
+        if mask >> category & 1:
+            record[key] = value
+
+    return record
+
+
+def cci_record(codes):
+    r"""
+    Builds the CCI inputs of one patient from the patient's ICD-10 codes.
+
+    Parameters:
+        codes (Iterable[str]): The patient's ICD-10 codes.
+
+    Returns:
+        dict: The inputs of `compute_cci_explanation` except "age", with the
+        most severe liver disease, diabetes and solid tumor tier.
+    """
+
+    mask = 0
+
+    for category in classify_codes(list(codes)).tolist():
+        if category >= 0:
+            mask |= 1 << category
+
+    return _record(mask)
+
+
+def stream_cci_records(claims, chunk_size=1000000):
+    r"""
+    Reduces a stream of claim lines to one set of CCI inputs per patient.
+
+    Parameters:
+        claims (Iterable[tuple]): (patient, icd10_code) pairs in which the
+        lines of each patient are contiguous, e.g. sorted by patient.
+        chunk_size (int): The number of claim lines classified at a time.
+        (default: :obj:`1000000`)
+
+    Yields:
+        tuple: (patient, record) where record is the output of `cci_record`
+        for all codes of the patient.
+
+    Notes:
+        - Memory is bounded by `chunk_size`: only the categories of the
+        patient spanning a chunk boundary are carried over.
+        - A patient whose lines are not contiguous is yielded more than
+        once.
+    """
+
+    claims = iter(claims)
+    pending = None
+    pending_mask = 0
+
+    while True:
+        chunk = list(islice(claims, chunk_size))
+        if not chunk:
+            break
+
+        patients = np.empty(len(chunk), dtype=object)
+        patients[:] = [patient for patient, _ in chunk]
+        categories = classify_codes([code for _, code in chunk])
+
+        bits = np.where(
+            categories >= 0,
+            np.left_shift(1, categories.astype(np.int64)),
+            0,
+        )
+        starts = np.flatnonzero(
+            np.concatenate(([True], patients[1:] != patients[:-1]))
+        )
+        masks = np.bitwise_or.reduceat(bits, starts).tolist()
+        group_patients = patients[starts].tolist()
+
+        if pending is not None:
+            if group_patients[0] == pending:
+                masks[0] |= pending_mask
+            else:
+                yield pending, _record(pending_mask)
+
+        for patient, mask in zip(group_patients[:-1], masks[:-1]):
+            yield patient, _record(mask)
+
+        pending = group_patients[-1]
+        pending_mask = masks[-1]
+
+    if pending is not None:
+        yield pending, _record(pending_mask)
+
+
+def stream_cci_scores(claims, ages, chunk_size=1000000):
+    r"""
+    Scores the CCI of every patient in a stream of claim lines.
+
+    Parameters:
+        claims (Iterable[tuple]): (patient, icd10_code) pairs, contiguous
+        per patient, see `stream_cci_records`.
+        ages (Mapping): The age of each patient in the format of
+        `compute_cci_explanation`, e.g. {"p1": (72, "years")}. Patients
+        without an age are scored without age points.
+        chunk_size (int): The number of patients scored at a time.
+        (default: :obj:`1000000`)
+
+    Yields:
+        tuple: (patient, score) pairs in stream order.
+    """
+
+    records = stream_cci_records(claims, chunk_size)
+
+    while True:
+        batch = list(islice(records, chunk_size))
+        if not batch:
+            break
+
+        for patient, record in batch:
+            age = ages.get(patient)
+            if age is not None:
+                record["age"] = age
+
+        scores = score_records(cci_criteria, [record for _, record in batch])
+        yield from zip((patient for patient, _ in batch), scores.tolist())
+
+
+if __name__ == "__main__":
+    claims = [
+        ("p1", "I50.9"),
+        ("p1", "K70.30"),
+        ("p1", "K72.10"),
+        ("p1", "E11.9"),
+        ("p2", "C34.90"),
+        ("p2", "C78.00"),
+        ("p2", "Z00.00"),
+        ("p3", "J44.1"),
+        ("p3", "G45.9"),
+    ]
+    ages = {"p1": (72, "years"), "p2": (58, "years"), "p3": (45, "years")}
+
+    print(classify_codes([code for _, code in claims]))
+    for patient, record in stream_cci_records(claims, chunk_size=4):
+        print(
+            patient,
+            {k: v for k, v in record.items() if v != cci_defaults[k]},
+        )
+    print(list(stream_cci_scores(claims, ages, chunk_size=4)))
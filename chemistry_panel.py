@@ -0,0 +1,235 @@
+# ========= Copyright 2023-2024 @ CAMEL-AI.org. All Rights Reserved. =========
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ========= Copyright 2023-2024 @ CAMEL-AI.org. All Rights Reserved. =========
+r"""
+Columnar chemistry panel: osmolality, corrected sodium and calcium, LDL,
+HOMA-IR and FENa.
+
+A wide lab table is converted column by column, once per target unit, and
+the six closed-form values of `sOsm.py`, `sch.py`, `calcium_correction.py`,
+`ldl_calculated.py`, `homa_ir.py` and `compute_fena.py` are evaluated on
+whole arrays.
+
+Date: March 2025
+"""
+
+import numpy as np
+
+from camel.toolkits.medcalc_bench.utils.rounding import round_number_array
+from camel.toolkits.medcalc_bench.utils.unit_converter_new import (
+    conversion_column,
+)
+
+# Compound, molar mass and valence of each lab column.
+chemistry_labs = {
+    "sodium": ("sodium", 22.99, 1),
+    "bun": ("BUN", 28.02, None),
+    "glucose": ("glucose", 180.16, None),
+    "albumin": ("albumin", 66500, None),
+    "calcium": ("calcium", 40.08, 2),
+    "total_cholestrol": ("total cholestrol", 386.654, None),
+    "hdl_cholestrol": ("hdl cholestrol", 386.654, None),
+    "triglycerides": ("triglycerides", 861.338, None),
+    "creatinine": ("creatinine", 113.12, 1),
+    "urine_sodium": ("urine sodium", 22.99, 1),
+    "urine_creatinine": ("urine creatinine", 113.12, 1),
+}
+
+# Factor from each insulin unit to µIU/mL, as applied by `homa_ir.py`.
+# Other units are taken as µIU/mL.
+insulin_factors = {"pmol/L": 6, "ng/mL": 24.8}
+
+# Lab columns and the unit each derived value reads them in.
+_derived_inputs = {
+    "serum_osmolality": (
+        ("sodium", "mmol/L"),
+        ("bun", "mg/dL"),
+        ("glucose", "mg/dL"),
+    ),
+    "corrected_sodium": (("sodium", "mEq/L"), ("glucose", "mg/dL")),
+    "corrected_calcium": (("calcium", "mg/dL"), ("albumin", "g/dL")),
+    "ldl": (
+        ("total_cholestrol", "mg/dL"),
+        ("hdl_cholestrol", "mg/dL"),
+        ("triglycerides", "mg/dL"),
+    ),
+    "homa_ir": (("insulin", None), ("glucose", "mg/dL")),
+    "fena": (
+        ("sodium", "mEq/L"),
+        ("creatinine", "mg/dL"),
+        ("urine_sodium", "mEq/L"),
+        ("urine_creatinine", "mg/dL"),
+    ),
+}
+
+
+def serum_osmolality(sodium, bun, glucose):
+    r"""
+    Computes serum osmolality (mOsm/kg) from sodium in mmol/L and BUN and
+    glucose in mg/dL.
+    """
+
+    return round_number_array(2 * sodium + (bun / 2.8) + (glucose / 18))
+
+
+def corrected_sodium(sodium, glucose):
+    r"""
+    Computes sodium corrected for hyperglycemia (mEq/L) from sodium in mEq/L
+    and glucose in mg/dL.
+    """
+
+    return round_number_array(sodium + 0.024 * (glucose - 100))
+
+
+def corrected_calcium(calcium, albumin, normal_albumin=4.0):
+    r"""
+    Computes calcium corrected for albumin (mg/dL) from calcium in mg/dL and
+    albumin in g/dL.
+    """
+
+    return round_number_array(0.8 * (normal_albumin - albumin) + calcium)
+
+
+def ldl_cholesterol(total_cholestrol, hdl_cholestrol, triglycerides):
+    r"""
+    Computes LDL cholesterol (mg/dL) with the Friedewald equation from
+    inputs in mg/dL.
+    """
+
+    return round_number_array(
+        total_cholestrol - hdl_cholestrol - (triglycerides / 5)
+    )
+
+
+def homa_ir(insulin, glucose):
+    r"""
+    Computes HOMA-IR from insulin in µIU/mL and glucose in mg/dL.
+    """
+
+    return round_number_array((insulin * glucose) / 405)
+
+
+def fena(sodium, creatinine, urine_sodium, urine_creatinine):
+    r"""
+    Computes the fractional excretion of sodium (%) from sodium in mEq/L and
+    creatinine in mg/dL, in serum and urine.
+    """
+
+    return round_number_array(
+        (creatinine * urine_sodium) / (sodium * urine_creatinine) * 100
+    )
+
+
+def insulin_column(values, units):
+    r"""
+    Converts a column of insulin values to µIU/mL like `homa_ir.py`.
+
+    Parameters:
+        values (array_like): The insulin values.
+        units (str or array_like): The unit of every value, or one unit.
+
+    Returns:
+        numpy.ndarray: The insulin values in µIU/mL as float64.
+    """
+
+    values = np.array(values, dtype=np.float64)
+    units = np.broadcast_to(np.asarray(units, dtype=str), values.shape)
+
+    for unit, factor in insulin_factors.items():
+        values[units == unit] *= factor
+
+    return values
+
+
+_derived_functions = {
+    "serum_osmolality": serum_osmolality,
+    "corrected_sodium": corrected_sodium,
+    "corrected_calcium": corrected_calcium,
+    "ldl": ldl_cholesterol,
+    "homa_ir": homa_ir,
+    "fena": fena,
+}
+
+
+def chemistry_panel(columns):
+    r"""
+    Computes the derived chemistry values of a wide lab table.
+
+    Parameters:
+        columns (dict): Equal-length lab columns keyed like the calculators'
+        inputs ("sodium", "bun", "glucose", "calcium", "albumin",
+        "total_cholestrol", "hdl_cholestrol", "triglycerides", "insulin",
+        "creatinine", "urine_sodium", "urine_creatinine"), each a
+        (values, units) pair where `units` is one unit or an array of
+        units.
+
+    Returns:
+        dict: The derived values whose inputs are all present, as float64
+        arrays: "serum_osmolality", "corrected_sodium", "corrected_calcium",
+        "ldl", "homa_ir" and "fena".
+
+    Notes:
+        - Each column is converted once per unit the formulas read it in,
+        e.g. sodium in mmol/L for osmolality and in mEq/L for the corrected
+        sodium and FENa, so every value equals the scalar calculator's.
+
+    Example:
+        chemistry_panel({"sodium": ([134.0], "mmol/L"),
+        "glucose": ([360.0], "mg/dL")})
+
+        output: {'corrected_sodium': array([140.24])}
+    """
+
+    labs = {}
+    results = {}
+
+    def lab(name, unit):
+        if (name, unit) not in labs:
+            values, units = columns[name]
+            if name == "insulin":
+                labs[name, unit] = insulin_column(values, units)
+            else:
+                labs[name, unit] = conversion_column(
+                    values, units, *chemistry_labs[name], unit
+                )
+        return labs[name, unit]
+
+    for derived, inputs in _derived_inputs.items():
+        if all(name in columns for name, _ in inputs):
+            results[derived] = _derived_functions[derived](
+                *(lab(name, unit) for name, unit in inputs)
+            )
+
+    return results
+
+
+if __name__ == "__main__":
+    columns = {
+        "sodium": ([134.0, 141.0, 128.0], ["mmol/L", "mEq/L", "mmol/L"]),
+        "bun": ([18.0, 6.1, 40.0], ["mg/dL", "mmol/L", "mg/dL"]),
+        "glucose": ([360.0, 5.6, 95.0], ["mg/dL", "mmol/L", "mg/dL"]),
+        "calcium": ([8.1, 2.2, 9.4], ["mg/dL", "mmol/L", "mg/dL"]),
+        "albumin": ([2.6, 35.0, 4.1], ["g/dL", "g/L", "g/dL"]),
+        "total_cholestrol": ([220.0, 5.2, 180.0], ["mg/dL", "mmol/L",
+                                                   "mg/dL"]),
+        "hdl_cholestrol": ([45.0, 1.3, 60.0], ["mg/dL", "mmol/L", "mg/dL"]),
+        "triglycerides": ([150.0, 1.7, 90.0], ["mg/dL", "mmol/L", "mg/dL"]),
+        "insulin": ([12.0, 60.0, 0.5], ["µIU/mL", "pmol/L", "ng/mL"]),
+        "creatinine": ([1.9, 88.4, 1.1], ["mg/dL", "µmol/L", "mg/dL"]),
+        "urine_sodium": ([12.0, 40.0, 30.0], "mmol/L"),
+        "urine_creatinine": ([110.0, 7000.0, 90.0], ["mg/dL", "µmol/L",
+                                                     "mg/dL"]),
+    }
+
+    for name, values in chemistry_panel(columns).items():
+        print(name, values)
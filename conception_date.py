@@ -23,7 +23,9 @@ Modifications include:
 Date: March 2025
 """
 
-from datetime import datetime, timedelta
+from camel.toolkits.medcalc_bench.obstetric_dates import (
+    conception_date_lookup,
+)
 
 
 def add_2_weeks_explanation(input_data):
@@ -73,18 +75,17 @@ def add_2_weeks_explanation(input_data):
         f"The patient's last menstrual period was {input_date_str}. \n"
     )
 
-    input_date = datetime.strptime(input_date_str, "%m/%d/%Y")
-    future_date = input_date + timedelta(weeks=2)
+    future_date = conception_date_lookup(input_date_str)
 
     explanation += (
         f"Hence, the estimated date of conception after adding 2 weeks "
         f"to the patient's last menstrual period date is "
-        f"{future_date.strftime('%m/%d/%Y')}. \n"
+        f"{future_date}. \n"
     )
 
     return {
         "Explanation": explanation,
-        "Answer": future_date.strftime('%m/%d/%Y'),
+        "Answer": future_date,
     }
 
 
@@ -0,0 +1,587 @@
+# ========= Copyright 2023-2024 @ CAMEL-AI.org. All Rights Reserved. =========
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ========= Copyright 2023-2024 @ CAMEL-AI.org. All Rights Reserved. =========
+r"""
+Bit-packed evaluation of criteria-based scores.
+
+Each patient's criteria for one score are packed into a single uint64 mask,
+one bit per feature. Features are keyed by the same input dictionary keys the
+scalar calculators use (e.g. `peptic_ucler_disease`), with continuous inputs
+such as age or heart rate turned into threshold bits. A score is a weighted
+sum of terms, where a term is met when any of its feature bits is set, so
+scoring a whole cohort is one bit unpacking and two small matrix products.
+
+Covered scores: CHA2DS2-VASc, HAS-BLED, Wells' criteria for DVT and PE,
+PERC, Centor, FeverPAIN, the Charlson Comorbidity Index and the history
+findings of the Glasgow-Blatchford score.
+
+Date: March 2025
+"""
+
+import numpy as np
+
+from camel.toolkits.medcalc_bench.utils.age_conversion import age_conversion
+from camel.toolkits.medcalc_bench.utils.convert_temperature import (
+    fahrenheit_to_celsius,
+)
+
+# Normalizers turning a raw input dictionary value into the number that the
+# feature tests compare against. Column inputs are expected pre-normalized.
+_record_normalizers = {
+    "age": age_conversion,
+    "heart_rate": lambda value: value[0],
+    "oxygen_sat": lambda value: value[0],
+    "temperature": lambda value: fahrenheit_to_celsius(value[0], value[1]),
+}
+
+
+def _untiered(value, tiers):
+    # Truthy values outside the known tiers count as a plain "present".
+    return bool(value) and value not in tiers
+
+
+def _criteria(features, terms):
+    bits = {name: bit for bit, (name, _, _) in enumerate(features)}
+
+    if len(bits) > 64:
+        raise ValueError("At most 64 features fit in one mask.")
+
+    membership = np.zeros((len(features), len(terms)), dtype=np.int32)
+    for column, (names, _) in enumerate(terms):
+        for name in names:
+            membership[bits[name], column] = 1
+
+    weights = np.array([weight for _, weight in terms])
+
+    return {
+        "features": features,
+        "terms": terms,
+        "bits": bits,
+        "membership": membership,
+        "weights": weights,
+    }
+
+
+cha2ds2_vasc_criteria = _criteria(
+    features=[
+        ("age_65_to_74", "age", lambda age: (age >= 65) & (age < 75)),
+        ("age_75_or_more", "age", lambda age: age >= 75),
+        ("female", "sex", lambda sex: sex.lower() == "female"),
+        ("chf", "chf", None),
+        ("hypertension", "hypertension", None),
+        ("stroke", "stroke", None),
+        ("tia", "tia", None),
+        ("thromboembolism", "thromboembolism", None),
+        ("vascular_disease", "vascular_disease", None),
+        ("diabetes", "diabetes", None),
+    ],
+    terms=[
+        (("age_65_to_74",), 1),
+        (("age_75_or_more",), 2),
+        (("female",), 1),
+        (("chf",), 1),
+        (("hypertension",), 1),
+        (("stroke", "tia", "thromboembolism"), 2),
+        (("vascular_disease",), 1),
+        (("diabetes",), 1),
+    ],
+)
+
+has_bled_criteria = _criteria(
+    features=[
+        ("age_over_65", "age", lambda age: age > 65),
+        (
+            "alcohol_8_or_more",
+            "alcoholic_drinks",
+            lambda drinks: drinks >= 8,
+        ),
+        ("hypertension", "hypertension", None),
+        ("liver_disease_has_bled", "liver_disease_has_bled", None),
+        ("renal_disease_has_bled", "renal_disease_has_bled", None),
+        ("stroke", "stroke", None),
+        ("prior_bleeding", "prior_bleeding", None),
+        ("labile_inr", "labile_inr", None),
+        ("medications_for_bleeding", "medications_for_bleeding", None),
+    ],
+    terms=[
+        (("age_over_65",), 1),
+        (("alcohol_8_or_more",), 1),
+        (("hypertension",), 1),
+        (("liver_disease_has_bled",), 1),
+        (("renal_disease_has_bled",), 1),
+        (("stroke",), 1),
+        (("prior_bleeding",), 1),
+        (("labile_inr",), 1),
+        (("medications_for_bleeding",), 1),
+    ],
+)
+
+wells_dvt_criteria = _criteria(
+    features=[
+        (name, name, None)
+        for name in (
+            "active_cancer",
+            "bedridden_for_atleast_3_days",
+            "major_surgery_in_last_12_weeks",
+            "calf_swelling_3cm",
+            "collateral_superficial_veins",
+            "leg_swollen",
+            "localized_tenderness_on_deep_venuous_system",
+            "pitting_edema_on_symptomatic_leg",
+            "paralysis_paresis_immobilization_in_lower_extreme",
+            "previous_dvt",
+            "alternative_to_dvt_diagnosis",
+        )
+    ],
+    terms=[
+        (("active_cancer",), 1),
+        (
+            (
+                "bedridden_for_atleast_3_days",
+                "major_surgery_in_last_12_weeks",
+            ),
+            1,
+        ),
+        (("calf_swelling_3cm",), 1),
+        (("collateral_superficial_veins",), 1),
+        (("leg_swollen",), 1),
+        (("localized_tenderness_on_deep_venuous_system",), 1),
+        (("pitting_edema_on_symptomatic_leg",), 1),
+        (("paralysis_paresis_immobilization_in_lower_extreme",), 1),
+        (("previous_dvt",), 1),
+        (("alternative_to_dvt_diagnosis",), -2),
+    ],
+)
+
+wells_pe_criteria = _criteria(
+    features=[
+        ("clinical_dvt", "clinical_dvt", None),
+        ("pe_number_one", "pe_number_one", None),
+        ("heart_rate_over_100", "heart_rate", lambda rate: rate > 100),
+        ("immobilization_for_3days", "immobilization_for_3days", None),
+        ("surgery_in_past4weeks", "surgery_in_past4weeks", None),
+        ("previous_pe", "previous_pe", None),
+        ("previous_dvt", "previous_dvt", None),
+        ("hemoptysis", "hemoptysis", None),
+        ("malignancy_with_treatment", "malignancy_with_treatment", None),
+    ],
+    terms=[
+        (("clinical_dvt",), 3),
+        (("pe_number_one",), 3),
+        (("heart_rate_over_100",), 1.5),
+        (("immobilization_for_3days", "surgery_in_past4weeks"), 1.5),
+        (("previous_pe", "previous_dvt"), 1.5),
+        (("hemoptysis",), 1),
+        (("malignancy_with_treatment",), 1),
+    ],
+)
+
+perc_criteria = _criteria(
+    features=[
+        ("age_50_or_more", "age", lambda age: age >= 50),
+        ("heart_rate_100_or_more", "heart_rate", lambda rate: rate >= 100),
+        ("oxygen_sat_under_95", "oxygen_sat", lambda sat: sat < 95),
+        ("unilateral_leg_swelling", "unilateral_leg_swelling", None),
+        ("hemoptysis", "hemoptysis", None),
+        ("recent_surgery_or_trauma", "recent_surgery_or_trauma", None),
+        ("previous_pe", "previous_pe", None),
+        ("previous_dvt", "previous_dvt", None),
+        ("hormonal_use", "hormonal_use", None),
+    ],
+    terms=[
+        (("age_50_or_more",), 1),
+        (("heart_rate_100_or_more",), 1),
+        (("oxygen_sat_under_95",), 1),
+        (("unilateral_leg_swelling",), 1),
+        (("hemoptysis",), 1),
+        (("recent_surgery_or_trauma",), 1),
+        (("previous_pe", "previous_dvt"), 1),
+        (("hormonal_use",), 1),
+    ],
+)
+
+centor_criteria = _criteria(
+    features=[
+        ("age_3_to_14", "age", lambda age: (age >= 3) & (age <= 14)),
+        ("age_45_or_more", "age", lambda age: age >= 45),
+        ("temperature_over_38", "temperature", lambda temp: temp > 38),
+        ("cough_absent", "cough_absent", None),
+        ("tender_lymph_nodes", "tender_lymph_nodes", None),
+        ("exudate_swelling_tonsils", "exudate_swelling_tonsils", None),
+    ],
+    terms=[
+        (("age_3_to_14",), 1),
+        (("age_45_or_more",), -1),
+        (("temperature_over_38",), 1),
+        (("cough_absent",), 1),
+        (("tender_lymph_nodes",), 1),
+        (("exudate_swelling_tonsils",), 1),
+    ],
+)
+
+feverpain_criteria = _criteria(
+    features=[
+        (name, name, None)
+        for name in (
+            "fever_24_hours",
+            "cough_coryza_absent",
+            "symptom_onset",
+            "purulent_tonsils",
+            "severe_tonsil_inflammation",
+        )
+    ],
+    terms=[
+        ((name,), 1)
+        for name in (
+            "fever_24_hours",
+            "cough_coryza_absent",
+            "symptom_onset",
+            "purulent_tonsils",
+            "severe_tonsil_inflammation",
+        )
+    ],
+)
+
+# History and presentation findings of the Glasgow-Blatchford score; the
+# banded laboratory and vital sign inputs are scored by
+# `glasgow_blatchford.py`.
+glasgow_blatchford_criteria = _criteria(
+    features=[
+        (name, name, None)
+        for name in (
+            "melena_present",
+            "syncope",
+            "hepatic_disease_history",
+            "cardiac_failure",
+        )
+    ],
+    terms=[
+        (("melena_present",), 1),
+        (("syncope",), 2),
+        (("hepatic_disease_history",), 2),
+        (("cardiac_failure",), 2),
+    ],
+)
+
+_liver_tiers = ("none", "mild", "moderate to severe")
+_diabetes_tiers = (
+    "none or diet-controlled",
+    "uncomplicated",
+    "end-organ damage",
+)
+_solid_tumor_tiers = ("none", "localized", "metastatic")
+
+cci_criteria = _criteria(
+    features=[
+        ("age_50_to_59", "age", lambda age: (age > 49) & (age < 60)),
+        ("age_60_to_69", "age", lambda age: (age > 59) & (age < 70)),
+        ("age_70_to_79", "age", lambda age: (age > 69) & (age < 80)),
+        ("age_80_or_more", "age", lambda age: age >= 80),
+    ]
+    + [
+        (name, name, None)
+        for name in (
+            "mi",
+            "chf",
+            "peripheral_vascular_disease",
+            "cva",
+            "tia",
+            "connective_tissue_disease",
+            "dementia",
+            "copd",
+            "peptic_ucler_disease",
+            "hemiplegia",
+            "moderate_to_severe_ckd",
+            "leukemia",
+            "lymphoma",
+            "aids",
+        )
+    ]
+    + [
+        ("liver_disease_mild", "liver_disease", lambda v: v == "mild"),
+        (
+            "liver_disease_moderate_to_severe",
+            "liver_disease",
+            lambda v: v == "moderate to severe",
+        ),
+        (
+            "liver_disease_other",
+            "liver_disease",
+            lambda v: _untiered(v, _liver_tiers),
+        ),
+        (
+            "diabetes_mellitus_uncomplicated",
+            "diabetes_mellitus",
+            lambda v: v == "uncomplicated",
+        ),
+        (
+            "diabetes_mellitus_end_organ_damage",
+            "diabetes_mellitus",
+            lambda v: v == "end-organ damage",
+        ),
+        (
+            "diabetes_mellitus_other",
+            "diabetes_mellitus",
+            lambda v: _untiered(v, _diabetes_tiers),
+        ),
+        (
+            "solid_tumor_localized",
+            "solid_tumor",
+            lambda v: v == "localized",
+        ),
+        (
+            "solid_tumor_metastatic",
+            "solid_tumor",
+            lambda v: v == "metastatic",
+        ),
+        (
+            "solid_tumor_other",
+            "solid_tumor",
+            lambda v: _untiered(v, _solid_tumor_tiers),
+        ),
+    ],
+    terms=[
+        (("age_50_to_59",), 1),
+        (("age_60_to_69",), 2),
+        (("age_70_to_79",), 3),
+        (("age_80_or_more",), 4),
+        (("mi",), 1),
+        (("chf",), 1),
+        (("peripheral_vascular_disease",), 1),
+        (("cva", "tia"), 1),
+        (("connective_tissue_disease",), 1),
+        (("dementia",), 1),
+        (("copd",), 1),
+        (("peptic_ucler_disease",), 1),
+        (("hemiplegia",), 2),
+        (("moderate_to_severe_ckd",), 2),
+        (("leukemia",), 2),
+        (("lymphoma",), 2),
+        (("aids",), 6),
+        (("liver_disease_mild",), 1),
+        (("liver_disease_moderate_to_severe",), 3),
+        (("liver_disease_other",), 1),
+        (("diabetes_mellitus_uncomplicated",), 1),
+        (("diabetes_mellitus_end_organ_damage",), 2),
+        (("diabetes_mellitus_other",), 1),
+        (("solid_tumor_localized",), 2),
+        (("solid_tumor_metastatic",), 6),
+        (("solid_tumor_other",), 1),
+    ],
+)
+
+bitmask_criteria = {
+    "cha2ds2_vasc": cha2ds2_vasc_criteria,
+    "has_bled": has_bled_criteria,
+    "wells_dvt": wells_dvt_criteria,
+    "wells_pe": wells_pe_criteria,
+    "perc": perc_criteria,
+    "centor": centor_criteria,
+    "feverpain": feverpain_criteria,
+    "glasgow_blatchford": glasgow_blatchford_criteria,
+    "cci": cci_criteria,
+}
+
+
+def encode_record(criteria, record):
+    r"""
+    Packs the criteria of one patient into an integer mask.
+
+    Parameters:
+        criteria (dict): One of the score criteria of this module, e.g.
+        `cha2ds2_vasc_criteria`.
+        record (dict): The patient's inputs in the format of the matching
+        scalar calculator, e.g. {"age": (78, "years"), "chf": True}.
+
+    Returns:
+        int: The mask with bit `criteria["bits"][name]` set for every
+        feature that is present.
+
+    Notes:
+        - Missing keys count as absent, like in the scalar calculators.
+    """
+
+    mask = 0
+    normalized = {}
+
+    for bit, (_, key, test) in enumerate(criteria["features"]):
+        value = record.get(key)
+
+        if value is None:
+            continue
+
+        if test is not None:
+            if key not in normalized:
+                normalize = _record_normalizers.get(key)
+                normalized[key] = normalize(value) if normalize else value
+            value = test(normalized[key])
+
+        if value:
+            mask |= 1 << bit
+
+    return mask
+
+
+def encode_records(criteria, records):
+    r"""
+    Packs the criteria of many patients into a uint64 mask column.
+
+    Parameters:
+        criteria (dict): One of the score criteria of this module.
+        records (Sequence[dict]): The patients' inputs in the format of the
+        matching scalar calculator.
+
+    Returns:
+        numpy.ndarray: One uint64 mask per record.
+    """
+
+    return np.fromiter(
+        (encode_record(criteria, record) for record in records),
+        dtype=np.uint64,
+        count=len(records),
+    )
+
+
+def _column_hits(column, test):
+    if test is None:
+        # Missing (NaN or None) flags count as absent.
+        if column.dtype.kind in "fc":
+            return (column != 0) & ~np.isnan(column)
+        if column.dtype.kind == "O":
+            return np.array(
+                [value == value and bool(value) for value in column.tolist()],
+                dtype=bool,
+            )
+        return column.astype(bool)
+
+    if column.dtype.kind in "biuf":
+        return np.asarray(test(column), dtype=bool)
+
+    # Categorical columns are tested once per distinct value.
+    if column.dtype.kind in "US":
+        values, inverse = np.unique(column, return_inverse=True)
+        tested = np.array([bool(test(value)) for value in values.tolist()])
+        return tested[inverse.ravel()]
+
+    cache = {}
+    hits = np.empty(len(column), dtype=bool)
+    for index, value in enumerate(column.tolist()):
+        hit = cache.get(value)
+        if hit is None:
+            hit = cache[value] = value is not None and bool(test(value))
+        hits[index] = hit
+
+    return hits
+
+
+def encode_columns(criteria, columns):
+    r"""
+    Packs the criteria of many patients from columnar inputs.
+
+    Parameters:
+        criteria (dict): One of the score criteria of this module.
+        columns (dict): Arrays keyed by the scalar calculators' input keys.
+        Continuous inputs are given already normalized: "age" in years,
+        "heart_rate" in beats per minute, "oxygen_sat" in percent and
+        "temperature" in degrees celsius. Missing columns, and NaN or None
+        values in flag columns, count as absent.
+
+    Returns:
+        numpy.ndarray: One uint64 mask per row.
+    """
+
+    lengths = {len(column) for column in columns.values()}
+
+    if len(lengths) != 1:
+        raise ValueError("All columns must have the same length.")
+
+    masks = np.zeros(lengths.pop(), dtype=np.uint64)
+
+    for bit, (_, key, test) in enumerate(criteria["features"]):
+        column = columns.get(key)
+
+        if column is None:
+            continue
+
+        hits = _column_hits(np.asarray(column), test)
+        masks |= hits.astype(np.uint64) << np.uint64(bit)
+
+    return masks
+
+
+def unpack_masks(criteria, masks):
+    r"""
+    Unpacks uint64 masks into a (n_patients, n_features) matrix of 0/1
+    feature indicators.
+    """
+
+    n_features = len(criteria["features"])
+    n_bytes = (n_features + 7) // 8
+    masks = np.ascontiguousarray(masks, dtype="<u8")
+    packed = masks.view(np.uint8).reshape(-1, 8)[:, :n_bytes]
+    bits = np.unpackbits(packed, axis=1, bitorder="little")
+
+    return bits[:, :n_features]
+
+
+def score_masks(criteria, masks):
+    r"""
+    Scores a column of packed criteria masks.
+
+    Parameters:
+        criteria (dict): One of the score criteria of this module.
+        masks (array_like): uint64 masks from `encode_records` or
+        `encode_columns`.
+
+    Returns:
+        numpy.ndarray: The score of each patient, matching the answer of the
+        scalar calculator.
+    """
+
+    bits = unpack_masks(criteria, masks).astype(np.int32)
+    met = (bits @ criteria["membership"]) > 0
+
+    return met @ criteria["weights"]
+
+
+def score_records(criteria, records):
+    r"""
+    Scores a batch of patients given in the scalar calculators' format.
+    """
+
+    return score_masks(criteria, encode_records(criteria, records))
+
+
+if __name__ == "__main__":
+    records = [
+        {
+            'sex': 'Male',
+            'thromboembolism': True,
+            'tia': True,
+            'hypertension': True,
+            'age': (78, 'years'),
+            'stroke': True,
+        },
+        {'sex': 'Female', 'age': (66, 'years'), 'diabetes': True},
+    ]
+    masks = encode_records(cha2ds2_vasc_criteria, records)
+    print([bin(mask) for mask in masks.tolist()])
+    print(score_masks(cha2ds2_vasc_criteria, masks))
+
+    columns = {
+        "age": np.array([45, 72, 85]),
+        "dementia": np.array([True, False, False]),
+        "liver_disease": np.array(["mild", "none", "moderate to severe"]),
+        "solid_tumor": np.array(["none", "metastatic", "localized"]),
+    }
+    print(score_masks(cci_criteria, encode_columns(cci_criteria, columns)))
@@ -0,0 +1,209 @@
+# ========= Copyright 2023-2024 @ CAMEL-AI.org. All Rights Reserved. =========
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ========= Copyright 2023-2024 @ CAMEL-AI.org. All Rights Reserved. =========
+r"""
+Incremental longitudinal eGFR trajectories.
+
+Each creatinine result is turned into an eGFR with `ckd_epi_2021`, and the
+per-patient least-squares line of eGFR over time is kept as running sums
+(count, sums, sums of squares and the cross-product). Times are shifted by
+the patient's first result time to keep the sums well conditioned, so
+adding a result and reading the slope are both O(1), without refitting the
+history.
+
+Date: March 2025
+"""
+
+from camel.toolkits.medcalc_bench.ckd_epi_2021_creatinine import ckd_epi_2021
+
+
+class _PatientEGFR:
+    __slots__ = (
+        "origin",
+        "time",
+        "egfr",
+        "count",
+        "sum_t",
+        "sum_y",
+        "sum_tt",
+        "sum_ty",
+        "sum_yy",
+    )
+
+    def __init__(self, origin):
+        self.origin = origin
+        self.time = origin
+        self.egfr = None
+        self.count = 0
+        self.sum_t = 0.0
+        self.sum_y = 0.0
+        self.sum_tt = 0.0
+        self.sum_ty = 0.0
+        self.sum_yy = 0.0
+
+
+class EGFRTrajectory:
+    r"""
+    Maintains per-patient eGFR values and least-squares eGFR slopes over a
+    stream of creatinine results.
+
+    Notes:
+        - Times are numbers in the unit the slope should use, e.g. years
+        for mL/min/1.73 m² per year, and must not decrease per patient.
+        - The slope is None until a patient has results at two different
+        times.
+
+    Example:
+        trajectory = EGFRTrajectory()
+        trajectory.add("p1", 0.0, (1.0, "mg/dL"), (60, "years"), "Male")
+        trajectory.add("p1", 1.0, (1.2, "mg/dL"), (61, "years"), "Male")
+        trajectory.slope("p1")
+
+        output: -17.36...
+    """
+
+    def __init__(self):
+        self._patients = {}
+
+    def add(self, patient, time, creatinine, age, sex):
+        r"""
+        Ingests one creatinine result.
+
+        Parameters:
+            patient (Hashable): The patient identifier.
+            time (float): The time of the result.
+            creatinine (tuple): The result as (value, unit), e.g.
+            (1.2, "mg/dL") or (106, "µmol/L").
+            age (tuple): The age at the time of the result, as (value,
+            unit), e.g. (61, "years").
+            sex (str): "Male" or "Female".
+
+        Returns:
+            float: The eGFR of the result in mL/min/1.73 m².
+        """
+
+        state = self._patients.get(patient)
+        if state is None:
+            state = self._patients[patient] = _PatientEGFR(time)
+        elif time < state.time:
+            raise ValueError(
+                f"Result for patient {patient} at time {time} arrived after "
+                f"a result at time {state.time}."
+            )
+
+        egfr = ckd_epi_2021(
+            {"creatinine": creatinine, "age": age, "sex": sex}
+        )
+        t = time - state.origin
+
+        state.time = time
+        state.egfr = egfr
+        state.count += 1
+        state.sum_t += t
+        state.sum_y += egfr
+        state.sum_tt += t * t
+        state.sum_ty += t * egfr
+        state.sum_yy += egfr * egfr
+
+        return egfr
+
+    def add_results(self, results):
+        r"""
+        Ingests an iterable of results, each a tuple of the `add` arguments
+        (patient, time, creatinine, age, sex).
+        """
+
+        add = self.add
+        for result in results:
+            add(*result)
+
+    def egfr(self, patient):
+        r"""
+        Returns the latest eGFR of a patient.
+        """
+
+        return self._patients[patient].egfr
+
+    def slope(self, patient):
+        r"""
+        Returns the least-squares eGFR slope of a patient per time unit.
+        """
+
+        return self.trajectory(patient)["slope"]
+
+    def trajectory(self, patient):
+        r"""
+        Summarizes the eGFR trajectory of a patient.
+
+        Parameters:
+            patient (Hashable): The patient identifier.
+
+        Returns:
+            dict: "results" (count), "egfr" (latest eGFR), "mean_egfr",
+            "slope" and "intercept" of the least-squares line on the
+            original time axis, and "r_squared". The line fields are None
+            while all results share one time.
+        """
+
+        state = self._patients[patient]
+        n = state.count
+        mean_t = state.sum_t / n
+        mean_y = state.sum_y / n
+        s_tt = state.sum_tt - n * mean_t * mean_t
+        s_ty = state.sum_ty - n * mean_t * mean_y
+        s_yy = state.sum_yy - n * mean_y * mean_y
+
+        summary = {
+            "results": n,
+            "egfr": state.egfr,
+            "mean_egfr": mean_y,
+            "slope": None,
+            "intercept": None,
+            "r_squared": None,
+        }
+
+        if s_tt > 1e-12 * max(1.0, state.sum_tt):
+            slope = s_ty / s_tt
+            summary["slope"] = slope
+            summary["intercept"] = mean_y - slope * (mean_t + state.origin)
+            # The running sums can push the ratio slightly past 1.
+            summary["r_squared"] = (
+                min(max(s_ty * s_ty / (s_tt * s_yy), 0.0), 1.0)
+                if s_yy > 0
+                else 1.0
+            )
+
+        return summary
+
+    def discharge(self, patient):
+        r"""
+        Drops the state of a patient.
+        """
+
+        self._patients.pop(patient, None)
+
+
+if __name__ == "__main__":
+    results = [
+        ("p1", 2004.5, (0.9, "mg/dL"), (58, "years"), "Female"),
+        ("p1", 2008.0, (1.1, "mg/dL"), (62, "years"), "Female"),
+        ("p1", 2013.2, (1.4, "mg/dL"), (67, "years"), "Female"),
+        ("p1", 2019.9, (1.9, "mg/dL"), (73, "years"), "Female"),
+        ("p2", 2010.0, (88.4, "µmol/L"), (45, "years"), "Male"),
+        ("p2", 2010.0, (97.0, "µmol/L"), (45, "years"), "Male"),
+    ]
+
+    trajectory = EGFRTrajectory()
+    trajectory.add_results(results)
+    for patient in ("p1", "p2"):
+        print(patient, trajectory.trajectory(patient))
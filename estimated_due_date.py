@@ -23,7 +23,7 @@ Modifications include:
 Date: March 2025
 """
 
-from datetime import datetime, timedelta
+from camel.toolkits.medcalc_bench.obstetric_dates import due_date_lookup
 
 
 def add_40_weeks_explanation(input_data):
@@ -83,43 +83,42 @@ def add_40_weeks_explanation(input_data):
         f"The patient's last menstrual period was {input_date_str}. \n"
     )
 
-    input_date = datetime.strptime(input_date_str, "%m/%d/%Y")
-    future_date = input_date + timedelta(weeks=40)
+    future_date = due_date_lookup(input_date_str, 28)
 
     explanation += (
         f"The date after adding 40 weeks to the patient's last "
         f"menstrual period date is "
-        f"{future_date.strftime('%m/%d/%Y')}. \n"
+        f"{future_date}. \n"
     )
 
     if cycle_length == 28:
         explanation += (
             f"Because the patient's cycle length is 28 days, we do not make "
             f"any changes to the date. Hence, the patient's estimated due "
-            f"date is {future_date.strftime('%m/%d/%Y')}. \n"
+            f"date is {future_date}. \n"
         )
     elif cycle_length < 28:
         cycle_length_gap = abs(cycle_length - 28)
-        future_date = future_date + timedelta(days=cycle_length_gap)
+        future_date = due_date_lookup(input_date_str, cycle_length)
         explanation += (
             f"Because the patient's cycle length is {abs(cycle_length)} days, "
             f"this means that we must subtract {cycle_length_gap} days from "
             f"the patient's estimate due date. Hence, the patient's "
-            f"estimated due date is {future_date.strftime('%m/%d/%Y')}. \n"
+            f"estimated due date is {future_date}. \n"
         )
     elif cycle_length > 28:
         cycle_length_gap = abs(cycle_length - 28)
-        future_date = future_date + timedelta(days=cycle_length_gap)
+        future_date = due_date_lookup(input_date_str, cycle_length)
         explanation += (
             f"Because the patient's cycle length is {cycle_length} days, "
             f"this means that we must add {cycle_length_gap} days to the "
             f"patient's estimate due date. Hence, the patient's estimated "
-            f"due date is {future_date.strftime('%m/%d/%Y')}. \n"
+            f"due date is {future_date}. \n"
         )
 
     return {
         "Explanation": explanation,
-        "Answer": future_date.strftime('%m/%d/%Y'),
+        "Answer": future_date,
     }
 
 
@@ -0,0 +1,171 @@
+# ========= Copyright 2023-2024 @ CAMEL-AI.org. All Rights Reserved. =========
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ========= Copyright 2023-2024 @ CAMEL-AI.org. All Rights Reserved. =========
+r"""
+Columnar fluid and water balance: maintenance fluids and free water deficit.
+
+Evaluates the 4-2-1 rule of `maintenance_fluid_calc.py` and the free water
+deficit of `free_water_deficit.py` on whole wards, with the weight, sodium
+and total body water fraction of every patient as arrays.
+
+Date: March 2025
+"""
+
+import numpy as np
+
+from camel.toolkits.medcalc_bench.utils.rounding import round_number_array
+from camel.toolkits.medcalc_bench.utils.unit_converter_new import (
+    conversion_column,
+)
+from camel.toolkits.medcalc_bench.utils.weight_conversion import (
+    weight_to_kg_array,
+)
+
+
+def maintenance_fluid_rates(weight):
+    r"""
+    Computes maintenance fluid rates with the 4-2-1 rule.
+
+    Parameters:
+        weight (array_like): Weights in kilograms.
+
+    Returns:
+        numpy.ndarray: The rates in mL/hr: 4 mL/kg/hr for the first 10 kg,
+        2 mL/kg/hr for the next 10 kg and 1 mL/kg/hr above 20 kg. NaN
+        where the weight is missing.
+    """
+
+    weight = np.asarray(weight, dtype=np.float64)
+
+    return round_number_array(
+        np.select(
+            [weight < 10, weight <= 20, weight > 20],
+            [weight * 4, 40 + 2 * (weight - 10), 60 + (weight - 20)],
+            np.nan,
+        )
+    )
+
+
+def total_body_water_fractions(age, sex):
+    r"""
+    Looks up the total body water fraction of each patient.
+
+    Parameters:
+        age (array_like): Ages in years.
+        sex (array_like): "Male" or "Female".
+
+    Returns:
+        numpy.ndarray: 0.6 for children, 0.6 (men) or 0.5 (women) for adults
+        under 65 and 0.5 (men) or 0.45 (women) from 65. NaN for adults of
+        other or missing sex, and for negative or missing ages.
+    """
+
+    age = np.asarray(age, dtype=np.float64)
+    sex = np.asarray(sex)
+    male = sex == "Male"
+    female = sex == "Female"
+    adult = (age >= 18) & (age < 65)
+    elderly = age >= 65
+
+    return np.select(
+        [
+            (age >= 0) & (age < 18),
+            adult & male,
+            adult & female,
+            elderly & male,
+            elderly & female,
+        ],
+        [0.6, 0.6, 0.5, 0.5, 0.45],
+        np.nan,
+    )
+
+
+def free_water_deficits(total_body_water, weight, sodium):
+    r"""
+    Computes free water deficits.
+
+    Parameters:
+        total_body_water (array_like): Total body water fractions, see
+        `total_body_water_fractions`.
+        weight (array_like): Weights in kilograms.
+        sodium (array_like): Sodium in mmol/L.
+
+    Returns:
+        numpy.ndarray: The free water deficits in liters.
+    """
+
+    return round_number_array(
+        np.asarray(total_body_water, dtype=np.float64)
+        * np.asarray(weight, dtype=np.float64)
+        * (np.asarray(sodium, dtype=np.float64) / 140 - 1)
+    )
+
+
+def fluid_balance(columns):
+    r"""
+    Computes maintenance fluid rates and free water deficits for a ward.
+
+    Parameters:
+        columns (dict): Equal-length columns keyed like the calculators'
+        inputs:
+            - "weight", "sodium": (values, units) pairs, where `units` is
+            one unit or an array of units.
+            - "age": age in years; "sex": "Male" or "Female".
+
+    Returns:
+        dict: "maintenance_fluid" in mL/hr (needs weight) and
+        "free_water_deficit" in liters (needs weight, sodium, age and sex),
+        as float64 arrays.
+
+    Example:
+        fluid_balance({"weight": ([22.0], "kg")})
+
+        output: {'maintenance_fluid': array([62.])}
+    """
+
+    weight = weight_to_kg_array(*columns["weight"])
+    results = {"maintenance_fluid": maintenance_fluid_rates(weight)}
+
+    if all(name in columns for name in ("sodium", "age", "sex")):
+        sodium_values, sodium_units = columns["sodium"]
+        sodium = conversion_column(
+            sodium_values, sodium_units, "sodium", 22.99, 1, "mmol/L"
+        )
+        results["free_water_deficit"] = free_water_deficits(
+            total_body_water_fractions(columns["age"], columns["sex"]),
+            weight,
+            sodium,
+        )
+
+    return results
+
+
+if __name__ == "__main__":
+    columns = {
+        "weight": ([8.2, 15.0, 176.0, 68.0], ["kg", "kg", "lbs", "kg"]),
+        "sodium": ([150.0, 138.0, 162.0, 155.0], "mmol/L"),
+        "age": [1, 4, 72, 40],
+        "sex": ["Female", "Male", "Female", "Male"],
+    }
+
+    for name, values in fluid_balance(columns).items():
+        print(name, values)
+
+    # A missing weight and an adult of unrecorded sex give NaN.
+    missing = {
+        "weight": ([float("nan"), 70.0], "kg"),
+        "sodium": ([150.0, 150.0], "mmol/L"),
+        "age": [30, 30],
+        "sex": ["Male", None],
+    }
+    print(fluid_balance(missing))
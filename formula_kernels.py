@@ -0,0 +1,458 @@
+# ========= Copyright 2023-2024 @ CAMEL-AI.org. All Rights Reserved. =========
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ========= Copyright 2023-2024 @ CAMEL-AI.org. All Rights Reserved. =========
+r"""
+NumPy kernels of the continuous calculators.
+
+The closed-form formulas of `mdrd_gfr.py`, `ckd_epi_2021_creatinine.py`, the
+five QT correction calculators, `bsa_calculator.py`, `sch.py`,
+`calcium_correction.py`, `free_water_deficit.py`, `meldna.py`,
+`fibrosis_4.py` and `framingham_risk_score.py` are written as functions of
+arrays in fixed units, keeping the calculators' intermediate and final
+rounding, so any broadcastable mix of scalars and arrays gives the scalar
+answers element by element. `formula_kernels` registers each kernel with
+the units of its inputs and a reader turning a calculator's input dict
+into kernel arguments.
+
+Date: March 2025
+"""
+
+import numpy as np
+
+from camel.toolkits.medcalc_bench.chemistry_panel import (
+    corrected_calcium,
+    corrected_sodium,
+)
+from camel.toolkits.medcalc_bench.fluid_balance import (
+    free_water_deficits,
+    total_body_water_fractions,
+)
+from camel.toolkits.medcalc_bench.liver_panel import (
+    fib4_scores,
+    liver_labs,
+    meldna_scores,
+)
+from camel.toolkits.medcalc_bench.utils.age_conversion import age_conversion
+from camel.toolkits.medcalc_bench.utils.height_conversion import (
+    height_conversion_explanation_cm,
+)
+from camel.toolkits.medcalc_bench.utils.rounding import round_number_array
+from camel.toolkits.medcalc_bench.utils.unit_converter_new import (
+    conversion_explanation,
+    convert_to_units_per_liter_explanation,
+)
+from camel.toolkits.medcalc_bench.utils.weight_conversion import (
+    weight_conversion_explanation,
+)
+
+
+def mdrd_gfr(creatinine, age, female, black=False):
+    r"""
+    Computes the MDRD GFR (mL/min/1.73 m²) from creatinine in mg/dL and
+    age in years, like `mdrd_gfr.py`.
+    """
+
+    return round_number_array(
+        175
+        * np.exp(np.log(creatinine) * -1.154)
+        * np.exp(np.log(age) * -0.203)
+        * np.where(black, 1.212, 1)
+        * np.where(female, 0.742, 1)
+    )
+
+
+def ckd_epi_2021_gfr(creatinine, age, female):
+    r"""
+    Computes the CKD-EPI 2021 eGFR (mL/min/1.73 m²) from creatinine in
+    mg/dL and age in years, like `ckd_epi_2021_creatinine.ckd_epi_2021`,
+    which does not round.
+    """
+
+    a = np.where(female, 0.7, 0.9)
+    b = np.where(creatinine <= a, np.where(female, -0.241, -0.302), -1.2)
+
+    return (
+        142 * (creatinine / a) ** b * 0.9938**age * np.where(female, 1.012, 1)
+    )
+
+
+def rr_interval(heart_rate):
+    r"""
+    Computes the rounded RR interval (s) the QT corrections use.
+    """
+
+    return round_number_array(60 / np.asarray(heart_rate, dtype=np.float64))
+
+
+def qtc_bazett(heart_rate, qt_interval):
+    r"""
+    Computes the QTc (msec) with the Bazett formula.
+    """
+
+    return round_number_array(qt_interval / rr_interval(heart_rate) ** 0.5)
+
+
+def qtc_fredericia(heart_rate, qt_interval):
+    r"""
+    Computes the QTc (msec) with the Fridericia formula.
+    """
+
+    return round_number_array(
+        qt_interval / rr_interval(heart_rate) ** (1 / 3)
+    )
+
+
+def qtc_framingham(heart_rate, qt_interval):
+    r"""
+    Computes the QTc (msec) with the Framingham formula.
+    """
+
+    return round_number_array(
+        qt_interval + (154 * (1 - rr_interval(heart_rate)))
+    )
+
+
+def qtc_hodges(heart_rate, qt_interval):
+    r"""
+    Computes the QTc (msec) with the Hodges formula.
+    """
+
+    return round_number_array(
+        qt_interval + 1.75 * ((60 / rr_interval(heart_rate)) - 60)
+    )
+
+
+def qtc_rautaharju(heart_rate, qt_interval):
+    r"""
+    Computes the QTc (msec) with the Rautaharju formula.
+    """
+
+    return round_number_array(qt_interval * (120 + heart_rate) / 180)
+
+
+def body_surface_area(weight, height):
+    r"""
+    Computes the Mosteller body surface area (m²) from weight in kg and
+    height in cm.
+    """
+
+    return round_number_array(np.sqrt(weight * height / 3600))
+
+
+def meldna(creatinine, bilirubin, inr, sodium, dialysis=False):
+    r"""
+    Computes MELD-Na with `liver_panel.meldna_scores` over broadcast arrays.
+    Rows with a NaN lab value score NaN instead of going through the
+    integer cast of `meldna_scores`.
+    """
+
+    arrays = np.broadcast_arrays(creatinine, bilirubin, inr, sodium, dialysis)
+    columns = [
+        np.asarray(array, dtype=np.float64).reshape(-1) for array in arrays
+    ]
+    valid = ~np.isnan(np.stack(columns[:4])).any(axis=0)
+    scores = np.full(valid.shape, np.nan)
+    scores[valid] = meldna_scores(*(column[valid] for column in columns))
+
+    return scores.reshape(arrays[0].shape)
+
+
+def framingham_risk(
+    age,
+    female,
+    smoker,
+    sys_bp,
+    bp_medicine,
+    total_cholestrol,
+    hdl_cholestrol,
+):
+    r"""
+    Computes the Framingham 10-year risk (%) from age in years, systolic
+    blood pressure in mm Hg and cholesterol in mmol/L, like
+    `framingham_risk_score.py`, which rounds the risk to tens of percent.
+    """
+
+    log_age = np.log(age)
+    log_total = np.log(total_cholestrol)
+    log_hdl = np.log(hdl_cholestrol)
+    log_bp = np.log(sys_bp)
+    log_age_smoke = np.log(np.minimum(age, np.where(female, 78, 70)))
+
+    male_score = (
+        52.00961 * log_age
+        + 20.014077 * log_total
+        - 0.905964 * log_hdl
+        + 1.305784 * log_bp
+        + 0.241549 * bp_medicine
+        + 12.096316 * smoker
+        - 4.605038 * (log_age * log_total)
+        - 2.84367 * (log_age_smoke * smoker)
+        - 2.93323 * (log_age * log_age)
+        - 172.300168
+    )
+    female_score = (
+        31.764001 * log_age
+        + 22.465206 * log_total
+        - 1.187731 * log_hdl
+        + 2.552905 * log_bp
+        + 0.420251 * bp_medicine
+        + 13.07543 * smoker
+        - 5.060998 * (log_age * log_total)
+        - 2.996945 * (log_age_smoke * smoker)
+        - 146.5933061
+    )
+
+    score = np.round(np.where(female, female_score, male_score), 1)
+    baseline = np.where(female, 0.98767, 0.9402)
+    percentage = np.round(1 - baseline ** np.exp(score), 1)
+
+    return np.round(percentage * 100, 3)
+
+
+def _convert_lab(name, value, unit):
+    compound, molar_mass, valence, target = liver_labs[name]
+    return conversion_explanation(
+        value, compound, molar_mass, valence, unit, target
+    )[1]
+
+
+def _creatinine_inputs(inputs):
+    value, unit = inputs["creatinine"]
+    return {
+        "creatinine": conversion_explanation(
+            value, "creatinine", 113.12, None, unit, "mg/dL"
+        )[1],
+        "age": age_conversion(inputs["age"]),
+        "female": inputs["sex"] == "Female",
+    }
+
+
+def _mdrd_inputs(inputs):
+    values = _creatinine_inputs(inputs)
+    values["black"] = inputs.get("race") == "Black"
+    return values
+
+
+def _qt_inputs(inputs):
+    return {
+        "heart_rate": inputs["heart_rate"][0],
+        "qt_interval": inputs["qt_interval"][0],
+    }
+
+
+def _bsa_inputs(inputs):
+    return {
+        "weight": weight_conversion_explanation(inputs["weight"])[1],
+        "height": height_conversion_explanation_cm(inputs["height"])[1],
+    }
+
+
+def _sch_inputs(inputs):
+    sodium, sodium_unit = inputs["sodium"]
+    glucose, glucose_unit = inputs["glucose"]
+    return {
+        "sodium": conversion_explanation(
+            sodium, "sodium", 22.99, 1, sodium_unit, "mEq/L"
+        )[1],
+        "glucose": conversion_explanation(
+            glucose, "glucose", 180.16, None, glucose_unit, "mg/dL"
+        )[1],
+    }
+
+
+def _calcium_inputs(inputs):
+    calcium, calcium_unit = inputs["calcium"]
+    albumin, albumin_unit = inputs["albumin"]
+    return {
+        "calcium": conversion_explanation(
+            calcium, "Calcium", 40.08, 2, calcium_unit, "mg/dL"
+        )[1],
+        "albumin": conversion_explanation(
+            albumin, "Albumin", 66500, None, albumin_unit, "g/dL"
+        )[1],
+    }
+
+
+def _free_water_inputs(inputs):
+    sodium, sodium_unit = inputs["sodium"]
+    return {
+        "total_body_water": float(
+            total_body_water_fractions(
+                age_conversion(inputs["age"]), inputs["sex"]
+            )
+        ),
+        "weight": weight_conversion_explanation(inputs["weight"])[1],
+        "sodium": conversion_explanation(
+            sodium, "sodium", 22.99, 1, sodium_unit, "mmol/L"
+        )[1],
+    }
+
+
+def _meldna_inputs(inputs):
+    return {
+        "creatinine": _convert_lab("creatinine", *inputs["creatinine"]),
+        "bilirubin": _convert_lab("bilirubin", *inputs["bilirubin"]),
+        "inr": inputs["inr"],
+        "sodium": _convert_lab("sodium", *inputs["sodium"]),
+        "dialysis": bool(
+            inputs.get("dialysis_twice") or inputs.get("cvvhd")
+        ),
+    }
+
+
+def _fib4_inputs(inputs):
+    return {
+        "age": age_conversion(inputs["age"]),
+        "ast": inputs["ast"][0],
+        "alt": inputs["alt"][0],
+        "platelet_count": convert_to_units_per_liter_explanation(
+            *inputs["platelet_count"], "platelets", "L"
+        )[1],
+    }
+
+
+def _framingham_inputs(inputs):
+    total, total_unit = inputs["total_cholestrol"]
+    hdl, hdl_unit = inputs["hdl_cholestrol"]
+    return {
+        "age": age_conversion(inputs["age"]),
+        "female": inputs["sex"] == "Female",
+        "smoker": bool(inputs.get("smoker", False)),
+        "sys_bp": inputs["sys_bp"][0],
+        "bp_medicine": bool(inputs.get("bp_medicine", False)),
+        "total_cholestrol": conversion_explanation(
+            total, "total cholestrol", 386.65, None, total_unit, "mmol/L"
+        )[1],
+        "hdl_cholestrol": conversion_explanation(
+            hdl, "hdl cholestrol", 386.65, None, hdl_unit, "mmol/L"
+        )[1],
+    }
+
+
+_qt_units = {"heart_rate": "beats per minute", "qt_interval": "msec"}
+
+# (kernel, units of its arguments, reader of a calculator's inputs) of each
+# calculator. Booleans have no unit.
+formula_kernels = {
+    "mdrd_gfr": (
+        mdrd_gfr,
+        {"creatinine": "mg/dL", "age": "years", "female": None, "black": None},
+        _mdrd_inputs,
+    ),
+    "ckd_epi_2021_creatinine": (
+        ckd_epi_2021_gfr,
+        {"creatinine": "mg/dL", "age": "years", "female": None},
+        _creatinine_inputs,
+    ),
+    "qt_calculator_bazett": (qtc_bazett, _qt_units, _qt_inputs),
+    "qt_calculator_fredericia": (qtc_fredericia, _qt_units, _qt_inputs),
+    "qt_calculator_framingham": (qtc_framingham, _qt_units, _qt_inputs),
+    "qt_calculator_hodges": (qtc_hodges, _qt_units, _qt_inputs),
+    "qt_calculator_rautaharju": (qtc_rautaharju, _qt_units, _qt_inputs),
+    "bsa_calculator": (
+        body_surface_area,
+        {"weight": "kg", "height": "cm"},
+        _bsa_inputs,
+    ),
+    "sch": (
+        corrected_sodium,
+        {"sodium": "mEq/L", "glucose": "mg/dL"},
+        _sch_inputs,
+    ),
+    "calcium_correction": (
+        corrected_calcium,
+        {"calcium": "mg/dL", "albumin": "g/dL"},
+        _calcium_inputs,
+    ),
+    "free_water_deficit": (
+        free_water_deficits,
+        {"total_body_water": None, "weight": "kg", "sodium": "mmol/L"},
+        _free_water_inputs,
+    ),
+    "meldna": (
+        meldna,
+        {
+            "creatinine": "mg/dL",
+            "bilirubin": "mg/dL",
+            "inr": None,
+            "sodium": "mEq/L",
+            "dialysis": None,
+        },
+        _meldna_inputs,
+    ),
+    "fibrosis_4": (
+        fib4_scores,
+        {"age": "years", "ast": "U/L", "alt": "U/L", "platelet_count": "L"},
+        _fib4_inputs,
+    ),
+    "framingham_risk_score": (
+        framingham_risk,
+        {
+            "age": "years",
+            "female": None,
+            "smoker": None,
+            "sys_bp": "mm Hg",
+            "bp_medicine": None,
+            "total_cholestrol": "mmol/L",
+            "hdl_cholestrol": "mmol/L",
+        },
+        _framingham_inputs,
+    ),
+}
+
+
+def kernel_arguments(calculator, inputs):
+    r"""
+    Reads the kernel arguments of a calculator from its input dict.
+
+    Parameters:
+        calculator (str): A key of `formula_kernels`.
+        inputs (dict): The calculator's inputs, e.g. {"age": (49, "years"),
+        "creatinine": (1.2, "mg/dL"), "sex": "Male"}.
+
+    Returns:
+        dict: The kernel arguments in the units of `formula_kernels`.
+    """
+
+    return formula_kernels[calculator][2](inputs)
+
+
+def kernel_argument_columns(calculator, patients):
+    r"""
+    Reads the kernel arguments of a list of patients into columns.
+
+    Parameters:
+        calculator (str): A key of `formula_kernels`.
+        patients (list): The calculator's input dict of every patient.
+
+    Returns:
+        dict: One array per kernel argument, in the units of
+        `formula_kernels`. Without patients, the arrays are empty.
+    """
+
+    if not patients:
+        return {
+            name: np.empty(0) for name in formula_kernels[calculator][1]
+        }
+
+    rows = [kernel_arguments(calculator, inputs) for inputs in patients]
+    return {name: np.array([row[name] for row in rows]) for name in rows[0]}
+
+
+if __name__ == "__main__":
+    heart_rate = np.array([52.0, 81.0, 110.0, 176.0])
+    for kernel in (qtc_bazett, qtc_fredericia, qtc_hodges):
+        print(kernel.__name__, kernel(heart_rate, 330.0))
+
+    print(mdrd_gfr(np.array([1.0, 10.6]), np.array([71, 49]), [True, False]))
+    print(body_surface_area(58.0, 179.0))
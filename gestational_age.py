@@ -23,7 +23,9 @@ Modifications include:
 Date: March 2025
 """
 
-from datetime import datetime
+from camel.toolkits.medcalc_bench.obstetric_dates import (
+    gestational_age_lookup,
+)
 
 
 def compute_gestational_age_explanation(input_parameters):
@@ -73,13 +75,7 @@ def compute_gestational_age_explanation(input_parameters):
         f"menstrual period date was {date1}. "
     )
 
-    datetime1 = datetime.strptime(date1, "%m/%d/%Y")
-    datetime2 = datetime.strptime(date2, "%m/%d/%Y")
-
-    delta = abs(datetime2 - datetime1)
-
-    weeks = delta.days // 7
-    days = delta.days % 7
+    weeks, days = gestational_age_lookup(date2, date1)
 
     if weeks == 0:
         explanation += (
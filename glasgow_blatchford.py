@@ -0,0 +1,158 @@
+# ========= Copyright 2023-2024 @ CAMEL-AI.org. All Rights Reserved. =========
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ========= Copyright 2023-2024 @ CAMEL-AI.org. All Rights Reserved. =========
+r"""
+Columnar Glasgow-Blatchford bleeding score.
+
+The continuous inputs of `glasgow_bleeding_score.py` are scored with band
+tables: each table lists the lower bound of every band and the points of
+every band, so a whole column is banded with one `np.searchsorted`. The
+history findings are packed into the criteria masks of
+`criteria_bitmask.py`.
+
+Date: March 2025
+"""
+
+import numpy as np
+
+from camel.toolkits.medcalc_bench.criteria_bitmask import (
+    encode_columns,
+    glasgow_blatchford_criteria,
+    score_masks,
+)
+from camel.toolkits.medcalc_bench.utils.unit_converter_new import (
+    conversion_column,
+)
+
+
+def _above(threshold):
+    # Lower bound of a band that excludes `threshold` itself.
+    return np.nextafter(threshold, np.inf)
+
+
+# (lower bounds, points) of the bands of each input, where band i covers
+# values from bound i - 1 (inclusive) up to bound i (exclusive). The gaps of
+# the calculator, e.g. a male hemoglobin of exactly 12 g/dL or a BUN of
+# exactly 70 mg/dL, are bands worth 0 points.
+gbs_bands = {
+    "hemoglobin_male": (
+        (10, 12, _above(12), _above(13)),
+        (6, 3, 0, 1, 0),
+    ),
+    "hemoglobin_female": (
+        (10, _above(10), _above(12)),
+        (6, 0, 1, 0),
+    ),
+    "bun": (
+        (18.2, 22.4, 28, 70, _above(70)),
+        (0, 2, 3, 4, 0, 6),
+    ),
+    "sys_bp": ((90, 100, 110), (3, 2, 1, 0)),
+    "heart_rate": ((100,), (0, 1)),
+}
+
+_band_tables = {
+    name: (np.array(bounds, dtype=np.float64), np.array(points))
+    for name, (bounds, points) in gbs_bands.items()
+}
+
+
+def band_points(name, values):
+    r"""
+    Scores a column against one of the band tables of `gbs_bands`.
+
+    Parameters:
+        name (str): A key of `gbs_bands`.
+        values (array_like): The values, in the calculator's units.
+
+    Returns:
+        numpy.ndarray: The points of each value (dtype int64), 0 for NaN.
+    """
+
+    bounds, points = _band_tables[name]
+    values = np.asarray(values, dtype=np.float64)
+    scored = points[np.searchsorted(bounds, values, side="right")]
+
+    return np.where(np.isnan(values), 0, scored)
+
+
+def glasgow_blatchford_scores(columns):
+    r"""
+    Computes Glasgow-Blatchford scores for a batch of visits.
+
+    Parameters:
+        columns (dict): Equal-length columns keyed like the calculator's
+        inputs:
+            - "hemoglobin", "bun": (values, units) pairs, where `units` is
+            one unit or an array of units.
+            - "sex": "Male" or "Female"; any other value is scored with the
+            female hemoglobin bands, like the calculator.
+            - "sys_bp" in mm Hg and "heart_rate" in beats per minute.
+            - "melena_present", "syncope", "hepatic_disease_history",
+            "cardiac_failure": optional booleans.
+
+    Returns:
+        numpy.ndarray: The scores (dtype int64).
+
+    Example:
+        glasgow_blatchford_scores({"hemoglobin": ([11.5], "g/dL"),
+        "bun": ([25.0], "mg/dL"), "sex": ["Male"], "sys_bp": [105.0],
+        "heart_rate": [110.0], "melena_present": [True]})
+
+        output: array([9])
+    """
+
+    hemoglobin = conversion_column(
+        *columns["hemoglobin"], "hemoglobin", 64500, None, "g/dL"
+    )
+    bun = conversion_column(*columns["bun"], "BUN", 28.08, None, "mg/dL")
+    male = np.asarray(columns["sex"]) == "Male"
+
+    scores = (
+        np.where(
+            male,
+            band_points("hemoglobin_male", hemoglobin),
+            band_points("hemoglobin_female", hemoglobin),
+        )
+        + band_points("bun", bun)
+        + band_points("sys_bp", columns["sys_bp"])
+        + band_points("heart_rate", columns["heart_rate"])
+    )
+
+    history = {
+        name: columns[name]
+        for name, _, _ in glasgow_blatchford_criteria["features"]
+        if name in columns
+    }
+    if history:
+        scores += score_masks(
+            glasgow_blatchford_criteria,
+            encode_columns(glasgow_blatchford_criteria, history),
+        )
+
+    return scores.astype(np.int64)
+
+
+if __name__ == "__main__":
+    columns = {
+        "hemoglobin": ([11.5, 12.0, 95.0], ["g/dL", "g/dL", "g/L"]),
+        "bun": ([25.0, 70.0, 9.5], ["mg/dL", "mg/dL", "mmol/L"]),
+        "sex": ["Male", "Male", "Female"],
+        "sys_bp": [105.0, 88.0, 120.0],
+        "heart_rate": [110.0, 96.0, 102.0],
+        "melena_present": [True, False, True],
+        "syncope": [False, True, False],
+        "cardiac_failure": [False, False, True],
+    }
+
+    print(glasgow_blatchford_scores(columns))
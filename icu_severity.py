@@ -0,0 +1,423 @@
+# ========= Copyright 2023-2024 @ CAMEL-AI.org. All Rights Reserved. =========
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ========= Copyright 2023-2024 @ CAMEL-AI.org. All Rights Reserved. =========
+r"""
+Batched ICU severity engine: APACHE II, SOFA and SIRS from one table.
+
+The three calculators share temperature, heart rate, respiratory rate, WBC,
+PaO2/FiO2, creatinine and blood pressure inputs. This engine normalizes
+every column once and evaluates the banded criteria of `apache_ii.py`,
+`sofa.py` and `sirs_criteria.py` with array operations, reproducing the
+scalar answers row by row, including the quirks of each calculator.
+
+Date: March 2025
+"""
+
+import numpy as np
+
+from camel.toolkits.medcalc_bench.utils.convert_temperature import (
+    fahrenheit_to_celsius_array,
+)
+from camel.toolkits.medcalc_bench.utils.rounding import round_number_array
+from camel.toolkits.medcalc_bench.utils.unit_converter_new import (
+    conversion_column,
+    units_per_liter_column,
+)
+
+
+def _bands(values, edges, points, right=True):
+    # Points of the half-open bands [edges[i - 1], edges[i]), or of
+    # (edges[i - 1], edges[i]] when `right` is False.
+    side = "right" if right else "left"
+    return np.asarray(points)[np.searchsorted(edges, values, side=side)]
+
+
+def _column(columns, name, size, default=np.nan):
+    if name not in columns:
+        return np.full(size, default, dtype=np.float64)
+    return np.asarray(columns[name], dtype=np.float64)
+
+
+def _flags(columns, name, size):
+    if name not in columns:
+        return np.zeros(size, dtype=bool)
+    return np.asarray(columns[name], dtype=bool)
+
+
+def _lab(columns, name, *conversion):
+    values, units = columns[name]
+    return conversion_column(values, units, name, *conversion)
+
+
+def _mean_arterial_pressure(sys_bp, dia_bp):
+    return round_number_array(2 * dia_bp / 3 + sys_bp / 3)
+
+
+def apache_ii_scores(columns):
+    r"""
+    Computes APACHE II scores for a table of ICU stays.
+
+    Parameters:
+        columns (dict): Equal-length columns, see `icu_severity`.
+
+    Returns:
+        numpy.ndarray: The APACHE II scores (dtype int64).
+    """
+
+    age = np.asarray(columns["age"], dtype=np.float64)
+    size = len(age)
+    score = np.zeros(size, dtype=np.int64)
+
+    organ_failure = _flags(columns, "organ_failure_immunocompromise", size)
+    if "surgery_type" in columns:
+        surgery_type = np.asarray(columns["surgery_type"], dtype=object)
+        score += organ_failure * np.select(
+            [surgery_type == "Elective", surgery_type == "Emergency"], [2, 5]
+        )
+
+    score += np.select(
+        [
+            (45 < age) & (age <= 54),
+            (55 <= age) & (age <= 64),
+            (65 <= age) & (age <= 74),
+            age > 75,
+        ],
+        [2, 3, 5, 6],
+    )
+
+    # Oxygenation uses the A-a gradient when FiO2 >= 50 % and PaO2 otherwise.
+    fio2 = np.asarray(columns["fio2"], dtype=np.float64)
+    gradient = _column(columns, "a_a_gradient", size)
+    pao2 = _column(columns, "partial_pressure_oxygen", size)
+    score += np.where(
+        fio2 >= 50,
+        np.select(
+            [
+                gradient > 499,
+                (350 <= gradient) & (gradient <= 499),
+                (200 <= gradient) & (gradient <= 349),
+            ],
+            [4, 3, 2],
+        ),
+        np.select(
+            [
+                (61 <= pao2) & (pao2 <= 70),
+                (55 <= pao2) & (pao2 <= 60),
+                pao2 < 55,
+            ],
+            [1, 3, 4],
+        ),
+    )
+
+    temperature = fahrenheit_to_celsius_array(*columns["temperature"])
+    score += _bands(
+        temperature, [30, 32, 34, 36, 38.5, 39, 41], [4, 3, 2, 1, 0, 1, 3, 4]
+    )
+
+    map_value = _mean_arterial_pressure(
+        np.asarray(columns["sys_bp"], dtype=np.float64),
+        np.asarray(columns["dia_bp"], dtype=np.float64),
+    )
+    score += _bands(map_value, [109, 129, 159], [0, 2, 3, 4], right=False)
+
+    score += _bands(columns["heart_rate"], [110, 140, 180], [0, 2, 3, 4])
+    score += _bands(columns["respiratory_rate"], [25, 35, 50], [0, 1, 3, 4])
+    score += _bands(columns["pH"], [7.50, 7.60, 7.70], [0, 1, 3, 4])
+
+    sodium = _lab(columns, "sodium", 22.99, 1, "mmol/L")
+    score += _bands(sodium, [150, 155, 160, 180], [0, 1, 2, 3, 4])
+
+    potassium = _lab(columns, "potassium", 22.99, 1, "mmol/L")
+    score += _bands(potassium, [5.5, 6.0, 7.0], [0, 1, 3, 4])
+
+    creatinine = _lab(columns, "creatinine", 113.12, None, "mg/dL")
+    acute = _flags(columns, "acute_renal_failure", size)
+    chronic = _flags(columns, "chronic_renal_failure", size)
+    high = creatinine >= 3.5
+    mid = (2.0 <= creatinine) & (creatinine < 3.5)
+    low = (1.5 <= creatinine) & (creatinine < 2.0)
+    score += np.select(
+        [
+            high & acute,
+            mid & acute,
+            high & chronic,
+            mid & chronic,
+            low & acute,
+            low & chronic,
+            (0.6 <= creatinine) & (creatinine < 1.5),
+            creatinine < 0.6,
+        ],
+        [8, 6, 4, 3, 4, 2, 0, 2],
+    )
+
+    score += _bands(columns["hemocratit"], [46, 50, 60], [0, 1, 2, 4])
+
+    values, units = columns["wbc"]
+    wbc = units_per_liter_column(values, units, "wbc", "mm^3")
+    score += _bands(wbc, [15, 20, 40], [0, 1, 2, 4])
+
+    return score + np.asarray(columns["gcs"], dtype=np.int64)
+
+
+# The six SOFA organ systems and the value columns each one reads.
+sofa_organs = {
+    "respiratory": ("partial_pressure_oxygen", "fio2"),
+    "cardiovascular": (
+        "sys_bp",
+        "dia_bp",
+        "dopamine",
+        "dobutamine",
+        "epinephrine",
+        "norepinephrine",
+    ),
+    "cns": ("gcs",),
+    "liver": ("bilirubin",),
+    "coagulation": ("platelet_count",),
+    "renal": ("creatinine", "urine_output"),
+}
+
+
+def sofa_organ_scores(columns):
+    r"""
+    Computes the SOFA organ subscores for a table of ICU stays.
+
+    Parameters:
+        columns (dict): Equal-length columns, see `icu_severity`.
+
+    Returns:
+        dict: The points of each organ system of `sofa_organs` (dtype
+        int64), which add up to the SOFA score.
+    """
+
+    pao2 = np.asarray(columns["partial_pressure_oxygen"], dtype=np.float64)
+    size = len(pao2)
+    fio2 = np.asarray(columns["fio2"], dtype=np.float64)
+
+    ratio = round_number_array(pao2 / fio2)
+    ventilation = _flags(columns, "mechanical_ventilation", size)
+    support = ventilation | _flags(columns, "cpap", size)
+    organs = {}
+    organs["respiratory"] = np.select(
+        [
+            (300 <= ratio) & (ratio < 400),
+            (200 <= ratio) & (ratio < 300),
+            (ratio <= 199) & ~support,
+            (100 <= ratio) & (ratio < 199) & support,
+            (ratio < 100) & ventilation,
+        ],
+        [1, 2, 2, 3, 4],
+    )
+
+    dopamine, dobutamine, epinephrine, norepinephrine = (
+        np.nan_to_num(_column(columns, name, size, 0.0))
+        for name in ("dopamine", "dobutamine", "epinephrine", "norepinephrine")
+    )
+    sys_bp = _column(columns, "sys_bp", size)
+    dia_bp = _column(columns, "dia_bp", size)
+    hypotension = (
+        (1 / 3 * sys_bp + 2 / 3 * dia_bp < 70)
+        & (dobutamine == 0)
+        & (epinephrine == 0)
+        & (norepinephrine == 0)
+    )
+    organs["cardiovascular"] = np.select(
+        [
+            hypotension,
+            (dopamine <= 5) | (dobutamine != 0),
+            (dopamine > 5) | (epinephrine <= 0.1) | (norepinephrine <= 0.1),
+            (dopamine > 15) | (epinephrine > 0.1) | (norepinephrine > 0.1),
+        ],
+        [1, 2, 3, 4],
+    )
+
+    gcs = _column(columns, "gcs", size, 15.0)
+    organs["cns"] = np.select(
+        [
+            gcs < 6,
+            (6 <= gcs) & (gcs <= 9),
+            (10 <= gcs) & (gcs <= 12),
+            (13 <= gcs) & (gcs <= 14),
+        ],
+        [4, 3, 2, 1],
+    )
+
+    bilirubin = _lab(columns, "bilirubin", 584.66, None, "mg/dL")
+    organs["liver"] = _bands(
+        bilirubin, [1.2, 2.0, 6.0, 12.0], [0, 1, 2, 3, 4]
+    )
+
+    values, units = columns["platelet_count"]
+    platelets = units_per_liter_column(values, units, "platelet", "µL")
+    organs["coagulation"] = _bands(
+        platelets, [20000, 50000, 100000, 150000], [4, 3, 2, 1, 0]
+    )
+
+    # Renal points come from urine output when creatinine is missing and
+    # from creatinine when urine output is missing, none with both.
+    if "creatinine" in columns:
+        creatinine = _lab(columns, "creatinine", 113.12, None, "mg/dL")
+    else:
+        creatinine = np.full(size, np.nan)
+    urine_output = _column(columns, "urine_output", size)
+    has_creatinine = ~np.isnan(creatinine)
+    has_urine_output = ~np.isnan(urine_output)
+    organs["renal"] = np.select(
+        [
+            ~has_creatinine & (urine_output < 500),
+            has_creatinine & ~has_urine_output,
+        ],
+        [3, _bands(creatinine, [1.2, 2.0, 3.5, 5.0], [0, 1, 2, 3, 4])],
+    )
+
+    return organs
+
+
+def sofa_scores(columns):
+    r"""
+    Computes SOFA scores for a table of ICU stays.
+
+    Parameters:
+        columns (dict): Equal-length columns, see `icu_severity`.
+
+    Returns:
+        numpy.ndarray: The SOFA scores (dtype int64).
+    """
+
+    return sum(sofa_organ_scores(columns).values())
+
+
+def sirs_counts(columns):
+    r"""
+    Counts the SIRS criteria met for a table of ICU stays.
+
+    Parameters:
+        columns (dict): Equal-length columns, see `icu_severity`.
+
+    Returns:
+        numpy.ndarray: The number of criteria met (dtype int64).
+    """
+
+    temperature = fahrenheit_to_celsius_array(*columns["temperature"])
+    size = len(temperature)
+
+    values, units = columns["wbc"]
+    wbc = units_per_liter_column(values, units, "white blood cell", "m^3")
+
+    respiratory_rate = _column(columns, "respiratory_rate", size)
+    paco2 = _column(columns, "paco2", size)
+
+    # Like the scalar calculator, the heart rate criterion always counts.
+    return (
+        ((temperature > 38) | (temperature < 36)).astype(np.int64)
+        + 1
+        + ((wbc > 12000) | (wbc < 4000))
+        + ((respiratory_rate > 20) | (paco2 < 32))
+    )
+
+
+def icu_severity(columns):
+    r"""
+    Computes APACHE II, SOFA and SIRS for a table of ICU stays.
+
+    Parameters:
+        columns (dict): Equal-length columns keyed like the calculators'
+        inputs:
+            - "temperature", "sodium", "potassium", "creatinine",
+            "bilirubin", "wbc", "platelet_count": (values, units) pairs,
+            where `units` is one unit or an array of units.
+            - "age" in years; "heart_rate", "respiratory_rate", "sys_bp",
+            "dia_bp", "fio2", "partial_pressure_oxygen", "a_a_gradient",
+            "paco2", "pH", "hemocratit", "gcs", "urine_output" and the
+            vasopressor doses ("dopamine", "dobutamine", "epinephrine",
+            "norepinephrine") as plain values, NaN where not recorded.
+            - "organ_failure_immunocompromise", "acute_renal_failure",
+            "chronic_renal_failure", "mechanical_ventilation", "cpap":
+            optional booleans; "surgery_type": optional strings.
+
+    Returns:
+        dict: The "apache_ii", "sofa" and "sirs" arrays, each computed when
+        the columns its calculator requires are present.
+
+    Notes:
+        - APACHE II scores the A-a gradient of rows with FiO2 >= 50 % and
+        the PaO2 of the other rows, so each row only needs the one it uses.
+        - Creatinine values of NaN mean that creatinine is missing for the
+        row, as in the SOFA renal criterion.
+    """
+
+    results = {}
+
+    calculators = (
+        (
+            "apache_ii",
+            apache_ii_scores,
+            (
+                "age",
+                "fio2",
+                "temperature",
+                "sys_bp",
+                "dia_bp",
+                "heart_rate",
+                "respiratory_rate",
+                "pH",
+                "sodium",
+                "potassium",
+                "creatinine",
+                "hemocratit",
+                "wbc",
+                "gcs",
+            ),
+        ),
+        (
+            "sofa",
+            sofa_scores,
+            ("partial_pressure_oxygen", "fio2", "bilirubin", "platelet_count"),
+        ),
+        ("sirs", sirs_counts, ("temperature", "wbc")),
+    )
+
+    for name, calculator, required in calculators:
+        if all(key in columns for key in required):
+            results[name] = calculator(columns)
+
+    return results
+
+
+if __name__ == "__main__":
+    columns = {
+        "age": [60, 82],
+        "temperature": ([38.9, 96.0], ["degrees celsius", "fahrenheit"]),
+        "heart_rate": [112.0, 64.0],
+        "respiratory_rate": [28.0, 14.0],
+        "sys_bp": [95.0, 150.0],
+        "dia_bp": [50.0, 85.0],
+        "fio2": [60.0, 30.0],
+        "a_a_gradient": [410.0, np.nan],
+        "partial_pressure_oxygen": [75.0, 58.0],
+        "paco2": [30.0, 40.0],
+        "pH": [7.31, 7.45],
+        "sodium": ([134.0, 158.0], "mmol/L"),
+        "potassium": ([3.8, 5.7], "mmol/L"),
+        "creatinine": ([1.8, 0.9], "mg/dL"),
+        "acute_renal_failure": [True, False],
+        "hemocratit": [32.0, 48.0],
+        "wbc": ([14.8, 9.1], "mm^3"),
+        "bilirubin": ([2.1, 0.8], "mg/dL"),
+        "platelet_count": ([95000.0, 210000.0], "µL"),
+        "gcs": [13, 15],
+        "mechanical_ventilation": [True, False],
+        "norepinephrine": [0.08, 0.0],
+    }
+
+    for name, values in icu_severity(columns).items():
+        print(name, values)
@@ -0,0 +1,294 @@
+# ========= Copyright 2023-2024 @ CAMEL-AI.org. All Rights Reserved. =========
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ========= Copyright 2023-2024 @ CAMEL-AI.org. All Rights Reserved. =========
+r"""
+Batched inverse solving of the continuous calculators.
+
+Inverse questions, such as the creatinine at which the CKD-EPI 2021 eGFR of
+a patient reaches 60, are answered for whole panels at once. The formulas
+of `formula_kernels.py` are inverted in closed form where the unrounded
+formula can be solved for the argument; any other argument is found by a
+bisection that advances every patient together on the kernel itself, so
+its answers also follow the calculators' rounding.
+
+Date: March 2025
+"""
+
+import numpy as np
+
+from camel.toolkits.medcalc_bench.formula_kernels import (
+    formula_kernels,
+    rr_interval,
+)
+
+
+def _ckd_epi_creatinine(target, age, female):
+    female = np.asarray(female, dtype=bool)
+    a = np.where(female, 0.7, 0.9)
+    scale = 142 * 0.9938**age * np.where(female, 1.012, 1)
+    # At or below `a` mg/dL the eGFR is at least `scale`.
+    b = np.where(target >= scale, np.where(female, -0.241, -0.302), -1.2)
+    return a * (target / scale) ** (1 / b)
+
+
+def _ckd_epi_age(target, creatinine, female):
+    female = np.asarray(female, dtype=bool)
+    a = np.where(female, 0.7, 0.9)
+    b = np.where(creatinine <= a, np.where(female, -0.241, -0.302), -1.2)
+    scale = 142 * (creatinine / a) ** b * np.where(female, 1.012, 1)
+    return np.log(target / scale) / np.log(0.9938)
+
+
+def _mdrd_scale(female, black):
+    return 175 * np.where(black, 1.212, 1) * np.where(female, 0.742, 1)
+
+
+def _mdrd_creatinine(target, age, female, black=False):
+    scale = _mdrd_scale(female, black) * age**-0.203
+    return (target / scale) ** (1 / -1.154)
+
+
+def _mdrd_age(target, creatinine, female, black=False):
+    scale = _mdrd_scale(female, black) * creatinine**-1.154
+    return (target / scale) ** (1 / -0.203)
+
+
+# Closed-form inverses of the unrounded formulas, keyed by calculator and
+# solved argument, called with the target and the other kernel arguments.
+# The QT intervals are solved on the calculators' rounded RR interval, and
+# heart rates on the exact RR interval 60 / heart rate.
+inverse_formulas = {
+    ("ckd_epi_2021_creatinine", "creatinine"): _ckd_epi_creatinine,
+    ("ckd_epi_2021_creatinine", "age"): _ckd_epi_age,
+    ("mdrd_gfr", "creatinine"): _mdrd_creatinine,
+    ("mdrd_gfr", "age"): _mdrd_age,
+    ("qt_calculator_bazett", "heart_rate"): (
+        lambda target, qt_interval: 60 * (target / qt_interval) ** 2
+    ),
+    ("qt_calculator_bazett", "qt_interval"): (
+        lambda target, heart_rate: target * rr_interval(heart_rate) ** 0.5
+    ),
+    ("qt_calculator_fredericia", "heart_rate"): (
+        lambda target, qt_interval: 60 * (target / qt_interval) ** 3
+    ),
+    ("qt_calculator_fredericia", "qt_interval"): (
+        lambda target, heart_rate: target
+        * rr_interval(heart_rate) ** (1 / 3)
+    ),
+    ("qt_calculator_framingham", "heart_rate"): (
+        lambda target, qt_interval: 60 / (1 - (target - qt_interval) / 154)
+    ),
+    ("qt_calculator_framingham", "qt_interval"): (
+        lambda target, heart_rate: target
+        - 154 * (1 - rr_interval(heart_rate))
+    ),
+    ("qt_calculator_hodges", "heart_rate"): (
+        lambda target, qt_interval: (target - qt_interval) / 1.75 + 60
+    ),
+    ("qt_calculator_hodges", "qt_interval"): (
+        lambda target, heart_rate: target
+        - 1.75 * (60 / rr_interval(heart_rate) - 60)
+    ),
+    ("qt_calculator_rautaharju", "heart_rate"): (
+        lambda target, qt_interval: 180 * target / qt_interval - 120
+    ),
+    ("qt_calculator_rautaharju", "qt_interval"): (
+        lambda target, heart_rate: 180 * target / (120 + heart_rate)
+    ),
+    ("calcium_correction", "calcium"): (
+        lambda target, albumin: target - 0.8 * (4.0 - albumin)
+    ),
+    ("calcium_correction", "albumin"): (
+        lambda target, calcium: 4.0 - (target - calcium) / 0.8
+    ),
+    ("free_water_deficit", "sodium"): (
+        lambda target, total_body_water, weight: 140
+        * (target / (total_body_water * weight) + 1)
+    ),
+    ("free_water_deficit", "weight"): (
+        lambda target, total_body_water, sodium: target
+        / (total_body_water * (sodium / 140 - 1))
+    ),
+}
+
+# Default bisection brackets of the kernel arguments, in the units of
+# `formula_kernels`.
+solve_ranges = {
+    "creatinine": (0.05, 30.0),
+    "age": (18.0, 120.0),
+    "heart_rate": (20.0, 300.0),
+    "qt_interval": (100.0, 1000.0),
+    "weight": (0.5, 500.0),
+    "height": (20.0, 280.0),
+    "sodium": (80.0, 220.0),
+    "glucose": (0.0, 3000.0),
+    "calcium": (0.0, 25.0),
+    "albumin": (0.0, 10.0),
+}
+
+
+def _bisect(kernel, arguments, solve_for, target, lower, upper):
+    shape = np.broadcast_shapes(
+        np.shape(target),
+        np.shape(lower),
+        np.shape(upper),
+        *(np.shape(value) for value in arguments.values()),
+    )
+
+    def flat(value):
+        return np.broadcast_to(value, shape).reshape(-1)
+
+    low = flat(lower).astype(np.float64)
+    high = flat(upper).astype(np.float64)
+    target = flat(target)
+    arguments = {name: flat(value) for name, value in arguments.items()}
+
+    def evaluate(values, rows):
+        row_arguments = {
+            name: value[rows] for name, value in arguments.items()
+        }
+        row_arguments[solve_for] = values
+        return kernel(**row_arguments)
+
+    everyone = np.arange(low.size)
+    at_low = evaluate(low, everyone)
+    at_high = evaluate(high, everyone)
+    # Whether the kernel is at or past the target, in the direction it
+    # moves over the bracket.
+    increasing = at_high >= at_low
+    solved = np.where(increasing, at_low >= target, at_low <= target)
+    possible = np.where(increasing, at_high >= target, at_high <= target)
+    high[solved] = low[solved]
+
+    rows = np.flatnonzero(possible & ~solved)
+    for _ in range(64):
+        middle = (low[rows] + high[rows]) / 2
+        moving = (middle > low[rows]) & (middle < high[rows])
+        rows, middle = rows[moving], middle[moving]
+        if not len(rows):
+            break
+        results = evaluate(middle, rows)
+        hit = np.where(
+            increasing[rows], results >= target[rows], results <= target[rows]
+        )
+        high[rows[hit]] = middle[hit]
+        low[rows[~hit]] = middle[~hit]
+
+    return np.where(possible, high, np.nan).reshape(shape)
+
+
+def inverse_solve(
+    calculator, arguments, solve_for, target, bounds=None, closed_form=True
+):
+    r"""
+    Solves a continuous calculator for one of its arguments, for every
+    patient of a panel at once.
+
+    Parameters:
+        calculator (str): A key of `formula_kernels.formula_kernels`, e.g.
+        "ckd_epi_2021_creatinine".
+        arguments (dict): The other kernel arguments as arrays or scalars,
+        broadcastable together, in the units of `formula_kernels`; see
+        `formula_kernels.kernel_argument_columns`.
+        solve_for (str): The kernel argument to solve for.
+        target (array_like): The calculator value to reach.
+        bounds (tuple): (lower, upper) bracket of the solution, scalars or
+        arrays. (default: :obj:`solve_ranges[solve_for]`)
+        closed_form (bool): Whether to use `inverse_formulas` when it has
+        the argument. (default: :obj:`True`)
+
+    Returns:
+        numpy.ndarray: The argument values, NaN where there is none.
+
+    Notes:
+        - Closed forms return the value at which the formula, without the
+        calculator's final rounding, equals the target, and NaN where that
+        value falls outside the bracket.
+        - Bisection returns, per patient, the smallest value in the bracket
+        at which the rounded kernel reaches the target in the direction it
+        moves over the bracket (at least the target if it increases, at
+        most if it decreases), and NaN when the bracket does not reach it.
+
+    Example:
+        inverse_solve("ckd_epi_2021_creatinine", {"age": [50, 70],
+        "female": [False, True]}, "creatinine", 60)
+
+        output: array([1.42390639, 1.00841029])
+    """
+
+    kernel, units, _ = formula_kernels[calculator]
+    if solve_for not in units:
+        raise ValueError(
+            f"{calculator} has no argument {solve_for}; expected one of "
+            f"{', '.join(units)}."
+        )
+
+    arguments = {
+        name: np.asarray(value)
+        for name, value in arguments.items()
+        if name != solve_for
+    }
+    target = np.asarray(target, dtype=np.float64)
+
+    inverse = inverse_formulas.get((calculator, solve_for))
+    if closed_form and inverse is not None:
+        lower, upper = bounds or solve_ranges.get(
+            solve_for, (-np.inf, np.inf)
+        )
+        with np.errstate(divide="ignore", invalid="ignore"):
+            values = np.asarray(inverse(target, **arguments), dtype=np.float64)
+            # Values outside the bracket, such as the negative heart rates
+            # of targets below what a QT interval allows, have no patient.
+            return np.where(
+                (values >= lower) & (values <= upper), values, np.nan
+            )
+
+    if bounds is None:
+        if solve_for not in solve_ranges:
+            raise ValueError(f"No default bracket for {solve_for}.")
+        bounds = solve_ranges[solve_for]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return _bisect(kernel, arguments, solve_for, target, *bounds)
+
+
+if __name__ == "__main__":
+    panel = {"age": np.array([45, 62, 78]), "female": [False, True, True]}
+    print(inverse_solve("ckd_epi_2021_creatinine", panel, "creatinine", 60))
+    print(
+        inverse_solve(
+            "ckd_epi_2021_creatinine",
+            panel,
+            "creatinine",
+            60,
+            closed_form=False,
+        )
+    )
+
+    qt = {"qt_interval": np.array([360.0, 400.0, 440.0])}
+    for calculator in ("qt_calculator_bazett", "qt_calculator_hodges"):
+        print(calculator, inverse_solve(calculator, qt, "heart_rate", 470))
+
+    print(
+        inverse_solve(
+            "bsa_calculator", {"height": [150.0, 190.0]}, "weight", 2.0
+        )
+    )
+    print(
+        inverse_solve(
+            "free_water_deficit",
+            {"total_body_water": 0.5, "weight": [60.0, 80.0]},
+            "sodium",
+            3.0,
+        )
+    )
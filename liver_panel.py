@@ -0,0 +1,264 @@
+# ========= Copyright 2023-2024 @ CAMEL-AI.org. All Rights Reserved. =========
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ========= Copyright 2023-2024 @ CAMEL-AI.org. All Rights Reserved. =========
+r"""
+Columnar liver panel: MELD-Na, Child-Pugh and FIB-4 in one pass.
+
+The three liver scores share bilirubin, INR, creatinine, sodium, albumin,
+AST/ALT and platelet inputs. This kernel converts each shared lab column to
+the unit the calculators use once, then evaluates every score on whole
+arrays, matching `meldna.py`, `child_pugh_score.py` and `fibrosis_4.py`.
+
+Date: March 2025
+"""
+
+import math
+
+import numpy as np
+
+from camel.toolkits.medcalc_bench.score_tables import lookup_scores
+from camel.toolkits.medcalc_bench.utils.rounding import round_number_array
+from camel.toolkits.medcalc_bench.utils.unit_converter_new import (
+    conversion_column,
+    units_per_liter_column,
+)
+
+# Compound, molar mass, valence and target unit of each lab column.
+liver_labs = {
+    "creatinine": ("creatinine", 113.12, None, "mg/dL"),
+    "bilirubin": ("bilirubin", 548.66, None, "mg/dL"),
+    "sodium": ("sodium", 22.99, 1, "mEq/L"),
+    "albumin": ("albumin", 66500, None, "g/dL"),
+}
+
+_meldna_inputs = ("creatinine", "bilirubin", "inr", "sodium")
+_child_pugh_inputs = ("inr", "bilirubin", "albumin")
+_fib4_inputs = ("age", "ast", "alt", "platelet_count")
+
+
+def normalize_liver_labs(columns):
+    r"""
+    Converts the lab columns of a liver panel to the calculators' units.
+
+    Parameters:
+        columns (dict): Lab columns keyed like the calculators' inputs, each
+        a (values, units) pair where `units` is one unit or an array.
+
+    Returns:
+        dict: The lab values as float64 arrays, in mg/dL for creatinine and
+        bilirubin, mEq/L for sodium and g/dL for albumin.
+    """
+
+    return {
+        name: conversion_column(columns[name][0], columns[name][1], *lab)
+        for name, lab in liver_labs.items()
+        if name in columns
+    }
+
+
+def _meld_10(meld_i, creatinine, bilirubin, inr):
+    # round(round(meld_i, 1) * 10) as in the scalar calculator. Rows close
+    # to a tie are redone with math.log and Python's decimal rounding.
+    scaled = meld_i * 10
+    meld_10 = np.rint(scaled)
+    ties = np.flatnonzero(np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6)
+
+    for row in ties.tolist():
+        value = (
+            0.957 * math.log(creatinine[row])
+            + 0.378 * math.log(bilirubin[row])
+            + 1.120 * math.log(inr[row])
+            + 0.643
+        )
+        meld_10[row] = round(round(value, 1) * 10)
+
+    return meld_10
+
+
+def meldna_scores(creatinine, bilirubin, inr, sodium, dialysis=None):
+    r"""
+    Computes MELD-Na from normalized lab columns.
+
+    Parameters:
+        creatinine (array_like): Creatinine in mg/dL.
+        bilirubin (array_like): Bilirubin in mg/dL.
+        inr (array_like): The INR.
+        sodium (array_like): Sodium in mEq/L.
+        dialysis (array_like): Whether the patient had dialysis twice in the
+        past week or CVVHD in the past 24 hours. (default: :obj:`None`)
+
+    Returns:
+        numpy.ndarray: The MELD-Na scores (dtype int64).
+
+    Notes:
+        - Like the scalar calculator, creatinine is clamped to [1, 4] and set
+        to 4 on dialysis unless it is below 1, bilirubin and INR are raised
+        to at least 1, sodium is clamped to [125, 137] and the score is
+        capped at 40.
+    """
+
+    creatinine = np.asarray(creatinine, dtype=np.float64)
+    bilirubin = np.maximum(np.asarray(bilirubin, dtype=np.float64), 1.0)
+    inr = np.maximum(np.asarray(inr, dtype=np.float64), 1.0)
+    sodium = np.clip(np.asarray(sodium, dtype=np.float64), 125, 137)
+
+    capped = creatinine > 4.0
+    if dialysis is not None:
+        capped |= np.asarray(dialysis, dtype=bool) & (creatinine >= 1.0)
+    creatinine = np.where(capped, 4.0, np.maximum(creatinine, 1.0))
+
+    meld_i = (
+        0.957 * np.log(creatinine)
+        + 0.378 * np.log(bilirubin)
+        + 1.120 * np.log(inr)
+        + 0.643
+    )
+    meld_10 = _meld_10(meld_i, creatinine, bilirubin, inr)
+
+    meld = np.rint(
+        meld_10 + 1.32 * (137 - sodium) - (0.033 * meld_10 * (137 - sodium))
+    )
+    meldna = np.where(meld_10 > 11, np.minimum(meld, 40), meld_10)
+
+    return meldna.astype(np.int64)
+
+
+def child_pugh_classes(scores):
+    r"""
+    Maps Child-Pugh scores to classes A (5-6), B (7-9) and C (10-15).
+    """
+
+    return np.select([scores <= 6, scores <= 9], ["A", "B"], "C")
+
+
+def fib4_scores(age, ast, alt, platelet_count):
+    r"""
+    Computes FIB-4 from normalized columns.
+
+    Parameters:
+        age (array_like): Age in years.
+        ast (array_like): AST in U/L.
+        alt (array_like): ALT in U/L.
+        platelet_count (array_like): Platelets in count/L.
+
+    Returns:
+        numpy.ndarray: The FIB-4 scores, rounded like `round_number`.
+    """
+
+    billions = np.asarray(platelet_count, dtype=np.float64) / 1e9
+
+    return round_number_array(
+        (np.asarray(age, dtype=np.float64) * np.asarray(ast))
+        / (billions * np.sqrt(np.asarray(alt, dtype=np.float64)))
+    )
+
+
+def liver_panel(columns):
+    r"""
+    Computes MELD-Na, Child-Pugh and FIB-4 for a batch of patients.
+
+    Parameters:
+        columns (dict): Equal-length columns keyed like the calculators'
+        inputs:
+            - "creatinine", "bilirubin", "sodium", "albumin",
+            "platelet_count": (values, units) pairs, where `units` is one
+            unit or an array of units.
+            - "inr", "ast", "alt": values; "age": age in years.
+            - "dialysis_twice", "cvvhd": optional booleans.
+            - "ascites", "encephalopathy": optional categories as taken by
+            the Child-Pugh calculator, None where not reported.
+
+    Returns:
+        dict: The scores whose inputs are all present: "meldna",
+        "child_pugh" with "child_pugh_class", and "fib4".
+
+    Notes:
+        - Bilirubin is converted once with the molar mass used by the
+        Child-Pugh calculator and shared with MELD-Na.
+
+    Example:
+        liver_panel({"creatinine": ([1.0], "mg/dL"),
+        "bilirubin": ([2.8], "mg/dL"), "inr": [1.5],
+        "sodium": ([139.0], "mEq/L")})
+
+        output: {'meldna': array([15])}
+    """
+
+    labs = normalize_liver_labs(columns)
+    labs.update(
+        {
+            name: np.asarray(columns[name], dtype=np.float64)
+            for name in ("inr", "ast", "alt", "age")
+            if name in columns
+        }
+    )
+    results = {}
+
+    if all(name in labs for name in _meldna_inputs):
+        dialysis = None
+        for name in ("dialysis_twice", "cvvhd"):
+            if name in columns:
+                flags = np.asarray(columns[name], dtype=bool)
+                dialysis = flags if dialysis is None else dialysis | flags
+
+        results["meldna"] = meldna_scores(
+            labs["creatinine"],
+            labs["bilirubin"],
+            labs["inr"],
+            labs["sodium"],
+            dialysis,
+        )
+
+    if all(name in labs for name in _child_pugh_inputs):
+        scores = lookup_scores(
+            "child_pugh_score",
+            {
+                "inr": labs["inr"],
+                "bilirubin": labs["bilirubin"],
+                "albumin": labs["albumin"],
+                "ascites": columns.get("ascites"),
+                "encephalopathy": columns.get("encephalopathy"),
+            },
+        )
+        results["child_pugh"] = scores
+        results["child_pugh_class"] = child_pugh_classes(scores)
+
+    if all(name in labs or name in columns for name in _fib4_inputs):
+        platelets = units_per_liter_column(
+            *columns["platelet_count"], "platelets", "L"
+        )
+        results["fib4"] = fib4_scores(
+            labs["age"], labs["ast"], labs["alt"], platelets
+        )
+
+    return results
+
+
+if __name__ == "__main__":
+    columns = {
+        "creatinine": ([1.0, 88.4, 3.2], ["mg/dL", "µmol/L", "mg/dL"]),
+        "bilirubin": ([2.8, 1.2, 51.3], ["mg/dL", "mg/dL", "µmol/L"]),
+        "inr": [1.5, 1.1, 2.6],
+        "sodium": ([139.0, 131.0, 124.0], "mEq/L"),
+        "albumin": ([2.1, 36.0, 3.0], ["g/dL", "g/L", "g/dL"]),
+        "dialysis_twice": [False, False, True],
+        "ascites": ["Absent", None, "Moderate"],
+        "encephalopathy": ["Grade 1-2", None, "Grade 3-4"],
+        "age": [36, 58, 71],
+        "ast": [17.0, 64.0, 120.0],
+        "alt": [144.0, 49.0, 80.0],
+        "platelet_count": ([277000.0, 150000.0, 90000.0], "µL"),
+    }
+
+    for name, values in liver_panel(columns).items():
+        print(name, values)
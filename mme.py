@@ -28,6 +28,25 @@ from camel.toolkits.medcalc_bench.utils.unit_converter_new import (
     conversion_explanation,
 )
 
+mme_drug = {
+    "Codeine": 0.15,
+    "FentaNYL buccal": 0.13,
+    "FentANYL patch": 2.4,
+    "HYDROcodone": 1,
+    "HYDROmorphone": 5,
+    "Methadone": 4.7,
+    "Morphine": 1,
+    "OxyCODONE": 1.5,
+    "OxyMORphone": 3,
+    "Tapentadol": 0.4,
+    "TraMADol": 0.2,
+    "Buprenorphine": 10,
+}
+
+# Drugs whose doses are converted to µg instead of mg before applying
+# their MME conversion factor.
+microgram_drugs = {"FentaNYL buccal", "FentaNYL patch"}
+
 
 def mme_explanation(input_parameters):
     explanation = r"""
@@ -51,21 +70,6 @@ def mme_explanation(input_parameters):
         "(MME) is 0 MME per day.\n"
     )
 
-    mme_drug = {
-        "Codeine": 0.15,
-        "FentaNYL buccal": 0.13,
-        "FentANYL patch": 2.4,
-        "HYDROcodone": 1,
-        "HYDROmorphone": 5,
-        "Methadone": 4.7,
-        "Morphine": 1,
-        "OxyCODONE": 1.5,
-        "OxyMORphone": 3,
-        "Tapentadol": 0.4,
-        "TraMADol": 0.2,
-        "Buprenorphine": 10,
-    }
-
     mme_equivalent = 0
 
     for drug_name in input_parameters:
@@ -76,7 +80,7 @@ def mme_explanation(input_parameters):
 
         units = input_parameters[name + " Dose"][1]
 
-        if name != "FentaNYL buccal" and name != "FentaNYL patch":
+        if name not in microgram_drugs:
             drug_mg_exp, drug_mg = conversion_explanation(
                 input_parameters[name + " Dose"][0],
                 name,
@@ -115,11 +119,7 @@ def mme_explanation(input_parameters):
                 )
                 explanation += drug_mg_exp + "\n"
 
-        target_unit = (
-            "mg"
-            if name != "FentaNYL buccal" and name != "FentaNYL patch"
-            else "µg"
-        )
+        target_unit = "µg" if name in microgram_drugs else "mg"
 
         dose_per_day_key = name + " Dose Per Day"
 
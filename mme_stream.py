@@ -0,0 +1,336 @@
+# ========= Copyright 2023-2024 @ CAMEL-AI.org. All Rights Reserved. =========
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ========= Copyright 2023-2024 @ CAMEL-AI.org. All Rights Reserved. =========
+r"""
+Streaming Morphine Milligram Equivalent (MME) aggregation over dispensing
+events.
+
+Each dispensing event contributes a constant daily MME from its start day
+for its days supply. Per patient, the daily MME is kept as a difference map
+of future changes plus run-length history of the last `window_days` days, so
+memory is bounded by the active prescriptions and the window length, and
+ingesting an event or finalizing a constant stretch of days costs
+O(log k) for k pending changes, regardless of the days supply.
+
+Date: March 2025
+"""
+
+import heapq
+from collections import deque
+from datetime import date
+
+from camel.toolkits.medcalc_bench.mme import mme_drug, microgram_drugs
+from camel.toolkits.medcalc_bench.utils.unit_registry import (
+    compound_code,
+    convert,
+    unit_code,
+)
+
+_DOSE_COMPOUND = compound_code()
+_MG = unit_code("mg")
+_UG = unit_code("µg")
+
+
+def _day_number(day):
+    if isinstance(day, date):
+        return day.toordinal()
+    return int(day)
+
+
+def daily_mme(drug, dose, unit, doses_per_day):
+    r"""
+    Computes the daily MME of one prescription.
+
+    Parameters:
+        drug (str): The opioid name, a key of `mme.mme_drug`.
+        dose (float): The dose per administration.
+        unit (str): The unit of `dose`, e.g. "mg" or "µg".
+        doses_per_day (float): The number of doses taken per day.
+
+    Returns:
+        float: The MME per day, computed like `mme_explanation` but without
+        intermediate rounding.
+    """
+
+    target = _UG if drug in microgram_drugs else _MG
+    amount = convert(dose, unit_code(unit), target, _DOSE_COMPOUND)
+
+    return amount * doses_per_day * mme_drug[drug]
+
+
+class _PatientMME:
+    __slots__ = (
+        "start",
+        "day",
+        "running",
+        "changes",
+        "change_days",
+        "runs",
+        "window_sum",
+        "max_daily",
+        "max_window_sum",
+    )
+
+    def __init__(self, day):
+        # First day of the patient's first event.
+        self.start = day
+        # First day that has not been finalized yet.
+        self.day = day
+        # Daily MME on `day`, before applying changes[day].
+        self.running = 0.0
+        # Pending daily MME changes keyed by day.
+        self.changes = {}
+        # Min-heap of the keys of `changes`.
+        self.change_days = []
+        # Finalized non-zero runs [start, end, value] inside the window.
+        self.runs = deque()
+        self.window_sum = 0.0
+        self.max_daily = 0.0
+        self.max_window_sum = 0.0
+
+
+class MMEStream:
+    r"""
+    Maintains per-patient daily MME and rolling-window maxima over a stream
+    of dispensing events.
+
+    Parameters:
+        window_days (int): The length of the rolling window in days.
+        (default: :obj:`90`)
+
+    Notes:
+        - Days are integers (e.g. day ordinals) or `datetime.date` values.
+        - Events of a patient must arrive in non-decreasing start-day order.
+        Queries finalize every day up to the queried day, so the queried days
+        of a patient must not decrease and later events must start after the
+        last queried day. Days before a patient's first event have no MME
+        and can be queried at any time.
+        - Rolling-window values are averages of the daily MME over the
+        `window_days` days ending on a given day.
+
+    Example:
+        stream = MMEStream()
+        stream.add("p1", "OxyCODONE", 10, "mg", 3, date(2024, 1, 1), 30)
+        stream.daily_mme("p1", date(2024, 1, 15))
+
+        output: 45.0
+    """
+
+    def __init__(self, window_days=90):
+        self.window_days = window_days
+        self._patients = {}
+
+    def add(
+        self, patient, drug, dose, unit, doses_per_day, start, days_supply
+    ):
+        r"""
+        Ingests one dispensing event.
+
+        Parameters:
+            patient (Hashable): The patient identifier.
+            drug (str): The opioid name, a key of `mme.mme_drug`.
+            dose (float): The dose per administration.
+            unit (str): The unit of `dose`.
+            doses_per_day (float): The number of doses taken per day.
+            start (int or date): The first day of the supply.
+            days_supply (int): The number of days the supply covers.
+        """
+
+        start = _day_number(start)
+        state = self._patients.get(patient)
+
+        if state is None:
+            state = self._patients[patient] = _PatientMME(start)
+        elif start < state.day:
+            raise ValueError(
+                f"Event for patient {patient} starts on day {start}, before "
+                f"the already finalized day {state.day}."
+            )
+
+        mme = daily_mme(drug, dose, unit, doses_per_day)
+        changes = state.changes
+        end = start + days_supply
+        for change_day, change in ((start, mme), (end, -mme)):
+            if change_day in changes:
+                changes[change_day] += change
+            else:
+                changes[change_day] = change
+                heapq.heappush(state.change_days, change_day)
+
+    def add_events(self, events):
+        r"""
+        Ingests an iterable of events, each a tuple of the `add` arguments
+        (patient, drug, dose, unit, doses_per_day, start, days_supply).
+        """
+
+        add = self.add
+        for event in events:
+            add(*event)
+
+    def _advance(self, state, day):
+        # Finalize every day before `day`, one constant stretch at a time.
+        window = self.window_days
+        runs = state.runs
+        changes = state.changes
+        change_days = state.change_days
+
+        while state.day < day:
+            t = state.day
+
+            if change_days and change_days[0] == t:
+                heapq.heappop(change_days)
+                state.running += changes.pop(t)
+                if abs(state.running) < 1e-9:
+                    state.running = 0.0
+
+            entering = state.running
+            stop = min(day, change_days[0]) if change_days else day
+
+            # Value leaving the window on day t, from day t - window.
+            exit_day = t - window
+            while runs and runs[0][1] <= exit_day:
+                runs.popleft()
+            if runs and runs[0][0] <= exit_day:
+                leaving = runs[0][2]
+                stop = min(stop, runs[0][1] + window)
+            else:
+                leaving = 0.0
+                if runs:
+                    stop = min(stop, runs[0][0] + window)
+                elif entering:
+                    stop = min(stop, t + window)
+
+            length = stop - t
+            slope = entering - leaving
+            first = state.window_sum + slope
+            state.window_sum += slope * length
+
+            if abs(state.window_sum) < 1e-9:
+                state.window_sum = 0.0
+
+            state.max_window_sum = max(
+                state.max_window_sum, first, state.window_sum
+            )
+            state.max_daily = max(state.max_daily, entering)
+
+            if entering:
+                if runs and runs[-1][1] == t and runs[-1][2] == entering:
+                    runs[-1][1] = stop
+                else:
+                    runs.append([t, stop, entering])
+
+            state.day = stop
+
+            # Idle patients jump straight to the target day.
+            if not changes and not runs and not state.running:
+                state.day = day
+
+    def _state(self, patient, day):
+        state = self._patients[patient]
+
+        # Days before the first event have no supply to finalize.
+        if day <= state.start:
+            return _PatientMME(day)
+
+        if day < state.day:
+            raise ValueError(
+                f"Day {day - 1} of patient {patient} was queried after "
+                f"day {state.day - 1} had already been finalized."
+            )
+
+        self._advance(state, day)
+        return state
+
+    def daily_mme(self, patient, day):
+        r"""
+        Returns the MME per day of a patient on one day.
+
+        Parameters:
+            patient (Hashable): The patient identifier.
+            day (int or date): The day to query.
+
+        Returns:
+            float: The total daily MME of the prescriptions covering `day`.
+        """
+
+        state = self._state(patient, _day_number(day) + 1)
+        runs = state.runs
+
+        if runs and runs[-1][1] == state.day:
+            return runs[-1][2]
+        return 0.0
+
+    def window_mme(self, patient, day):
+        r"""
+        Returns the average daily MME of a patient over the rolling window
+        ending on one day.
+
+        Parameters:
+            patient (Hashable): The patient identifier.
+            day (int or date): The last day of the window.
+
+        Returns:
+            float: The average MME per day over the window.
+        """
+
+        state = self._state(patient, _day_number(day) + 1)
+        return state.window_sum / self.window_days
+
+    def max_daily_mme(self, patient, day):
+        r"""
+        Returns the highest daily MME of a patient up to and including one
+        day.
+        """
+
+        return self._state(patient, _day_number(day) + 1).max_daily
+
+    def max_window_mme(self, patient, day):
+        r"""
+        Returns the highest rolling-window average MME of a patient over all
+        windows ending up to and including one day.
+        """
+
+        state = self._state(patient, _day_number(day) + 1)
+        return state.max_window_sum / self.window_days
+
+    def patients(self):
+        r"""
+        Returns the identifiers of all patients seen so far.
+        """
+
+        return self._patients.keys()
+
+
+if __name__ == "__main__":
+    stream = MMEStream(window_days=90)
+    stream.add_events(
+        [
+            ("p1", "OxyCODONE", 10, "mg", 3, date(2024, 1, 1), 30),
+            ("p1", "Tapentadol", 50, "mg", 2, date(2024, 1, 20), 30),
+            ("p2", "FentaNYL buccal", 200, "µg", 2, date(2024, 1, 5), 7),
+            ("p1", "OxyCODONE", 10, "mg", 3, date(2024, 3, 1), 30),
+        ]
+    )
+
+    for patient, day in (
+        ("p1", date(2024, 1, 25)),
+        ("p1", date(2024, 4, 15)),
+        ("p2", date(2024, 1, 8)),
+    ):
+        print(
+            f"{patient} {day}: daily {stream.daily_mme(patient, day)}, "
+            f"90-day average {round(stream.window_mme(patient, day), 3)}, "
+            f"max daily {stream.max_daily_mme(patient, day)}, "
+            f"max 90-day average "
+            f"{round(stream.max_window_mme(patient, day), 3)}"
+        )
@@ -0,0 +1,384 @@
+# ========= Copyright 2023-2024 @ CAMEL-AI.org. All Rights Reserved. =========
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ========= Copyright 2023-2024 @ CAMEL-AI.org. All Rights Reserved. =========
+r"""
+Vectorized obstetric date calculations on numpy.datetime64.
+
+Batch counterparts of `estimated_due_date.add_40_weeks_explanation`,
+`conception_date.add_2_weeks_explanation` and
+`gestational_age.compute_gestational_age_explanation` that parse and format
+whole "%m/%d/%Y" columns at once instead of calling strptime and strftime
+per record, plus cached scalar lookups backed by a precomputed date index.
+
+Date: March 2025
+"""
+
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+import numpy as np
+
+_DATE_WIDTH = 10
+_ZERO = ord("0")
+_SLASH = ord("/")
+
+# Longest cycle-length offset covered by the precomputed date index.
+_MAX_CYCLE_GAP = 60
+
+# Formatted dates by day offset and the offset of each formatted date,
+# built on first use by `build_date_index`.
+_DATE_STRINGS = []
+_DATE_ROWS = {}
+
+
+def _parse_dates_slow(strings):
+    return np.array(
+        [datetime.strptime(string, "%m/%d/%Y") for string in strings],
+        dtype="datetime64[D]",
+    )
+
+
+def parse_dates(strings):
+    r"""
+    Parses a column of "%m/%d/%Y" date strings in bulk.
+
+    Parameters:
+        strings (array_like): Date strings such as "09/17/2011".
+
+    Returns:
+        numpy.ndarray: The dates as datetime64[D].
+
+    Notes:
+        - Zero-padded dates are decoded arithmetically from their
+        characters. Any other spelling that strptime accepts, such as
+        "9/7/2011", falls back to strptime for that column.
+        - Raises ValueError for strings that are not valid dates.
+    """
+
+    strings = np.asarray(strings, dtype=str)
+    shape = strings.shape
+    strings = strings.ravel()
+
+    if strings.size == 0:
+        return np.empty(shape, dtype="datetime64[D]")
+
+    if strings.dtype.itemsize != _DATE_WIDTH * 4:
+        return _parse_dates_slow(strings.tolist()).reshape(shape)
+
+    chars = strings.view(np.uint32).reshape(-1, _DATE_WIDTH)
+    digits = chars.astype(np.int64) - _ZERO
+
+    if (
+        np.any(chars[:, [2, 5]] != _SLASH)
+        or np.any(digits[:, [0, 1, 3, 4, 6, 7, 8, 9]] < 0)
+        or np.any(digits[:, [0, 1, 3, 4, 6, 7, 8, 9]] > 9)
+    ):
+        return _parse_dates_slow(strings.tolist()).reshape(shape)
+
+    month = digits[:, 0] * 10 + digits[:, 1]
+    day = digits[:, 3] * 10 + digits[:, 4]
+    year = (
+        digits[:, 6] * 1000
+        + digits[:, 7] * 100
+        + digits[:, 8] * 10
+        + digits[:, 9]
+    )
+
+    if np.any((month < 1) | (month > 12) | (day < 1) | (year < 1)):
+        raise ValueError("Invalid date in column.")
+
+    months = ((year - 1970) * 12 + month - 1).astype("datetime64[M]")
+    dates = months.astype("datetime64[D]") + (day - 1)
+
+    # Reject days past the end of their month, e.g. 02/30/2011.
+    if np.any(dates.astype("datetime64[M]") != months):
+        raise ValueError("Invalid date in column.")
+
+    return dates.reshape(shape)
+
+
+def format_dates(dates):
+    r"""
+    Formats datetime64 dates as "%m/%d/%Y" strings in bulk.
+
+    Parameters:
+        dates (array_like): Dates convertible to datetime64[D].
+
+    Returns:
+        numpy.ndarray: The formatted dates as a fixed-width string array.
+    """
+
+    dates = np.asarray(dates, dtype="datetime64[D]")
+    shape = dates.shape
+    dates = dates.ravel()
+
+    months = dates.astype("datetime64[M]")
+    years = months.astype("datetime64[Y]")
+    year = years.astype(np.int64) + 1970
+    month = (months - years).astype(np.int64) + 1
+    day = (dates - months).astype(np.int64) + 1
+
+    digits = np.empty((len(dates), _DATE_WIDTH), dtype=np.int64)
+    digits[:, 0] = month // 10
+    digits[:, 1] = month % 10
+    digits[:, 3] = day // 10
+    digits[:, 4] = day % 10
+    digits[:, 6] = year // 1000
+    digits[:, 7] = year // 100 % 10
+    digits[:, 8] = year // 10 % 10
+    digits[:, 9] = year % 10
+
+    chars = (digits + _ZERO).astype(np.uint32)
+    chars[:, [2, 5]] = _SLASH
+
+    return chars.view(f"<U{_DATE_WIDTH}").reshape(shape)
+
+
+def _as_dates(dates):
+    dates = np.asarray(dates)
+
+    if np.issubdtype(dates.dtype, np.datetime64):
+        return dates.astype("datetime64[D]")
+
+    return parse_dates(dates)
+
+
+def estimated_due_dates(menstrual_dates, cycle_lengths):
+    r"""
+    Computes estimated due dates for a column of patients with Naegele's
+    rule.
+
+    Parameters:
+        menstrual_dates (array_like): Last menstrual period dates, either as
+        "%m/%d/%Y" strings or datetime64 values.
+        cycle_lengths (array_like): Menstrual cycle lengths in days.
+
+    Returns:
+        numpy.ndarray: The estimated due dates as "%m/%d/%Y" strings.
+
+    Notes:
+        - Matches `add_40_weeks_explanation`: 40 weeks are added to the last
+        menstrual period, then the gap between the cycle length and 28 days
+        is added.
+    """
+
+    lmp = _as_dates(menstrual_dates)
+    gap = np.abs(np.asarray(cycle_lengths, dtype=np.int64) - 28)
+
+    return format_dates(lmp + np.timedelta64(280, "D") + gap)
+
+
+def conception_dates(menstrual_dates):
+    r"""
+    Computes estimated conception dates for a column of patients.
+
+    Parameters:
+        menstrual_dates (array_like): Last menstrual period dates, either as
+        "%m/%d/%Y" strings or datetime64 values.
+
+    Returns:
+        numpy.ndarray: The estimated conception dates, 2 weeks after the last
+        menstrual period, as "%m/%d/%Y" strings.
+    """
+
+    return format_dates(_as_dates(menstrual_dates) + np.timedelta64(14, "D"))
+
+
+def gestational_ages(current_dates, menstrual_dates):
+    r"""
+    Computes gestational ages for a column of patients.
+
+    Parameters:
+        current_dates (array_like): The current dates, either as "%m/%d/%Y"
+        strings or datetime64 values.
+        menstrual_dates (array_like): Last menstrual period dates, either as
+        "%m/%d/%Y" strings or datetime64 values.
+
+    Returns:
+        tuple: Contains two int64 arrays:
+            - First element: The completed weeks of gestation.
+            - Second element: The remaining days of gestation.
+    """
+
+    delta = np.abs(
+        (_as_dates(current_dates) - _as_dates(menstrual_dates)).astype(
+            np.int64
+        )
+    )
+
+    return delta // 7, delta % 7
+
+
+@lru_cache(maxsize=65536)
+def parse_date(string):
+    r"""
+    Parses one "%m/%d/%Y" date string, caching the result.
+
+    Parameters:
+        string (str): A date string such as "09/17/2011".
+
+    Returns:
+        datetime: The parsed date.
+    """
+
+    return datetime.strptime(string, "%m/%d/%Y")
+
+
+@lru_cache(maxsize=65536)
+def format_date(date):
+    r"""
+    Formats one date as a "%m/%d/%Y" string, caching the result.
+
+    Parameters:
+        date (datetime): The date to format.
+
+    Returns:
+        str: The formatted date.
+    """
+
+    return date.strftime("%m/%d/%Y")
+
+
+def build_date_index(first_date="01/01/1900", last_date="12/31/2100"):
+    r"""
+    Precomputes the formatted string of every date in a range.
+
+    Parameters:
+        first_date (str): The first menstrual period date to cover, in the
+        format "%m/%d/%Y".
+        last_date (str): The last menstrual period date to cover, in the
+        format "%m/%d/%Y".
+
+    Returns:
+        tuple: Contains two elements:
+            - First element (list): The formatted dates by day offset from
+            `first_date`, extended past `last_date` far enough to hold every
+            due date.
+            - Second element (dict): The day offset of each formatted date.
+
+    Notes:
+        - The index replaces the one used by `due_date_lookup`,
+        `conception_date_lookup` and `gestational_age_lookup`, which build
+        the default range on first use.
+    """
+
+    first, last = parse_dates([first_date, last_date])
+    days = np.arange(
+        first, last + np.timedelta64(280 + _MAX_CYCLE_GAP + 1, "D")
+    )
+    strings = format_dates(days).tolist()
+
+    _DATE_STRINGS[:] = strings
+    _DATE_ROWS.clear()
+    _DATE_ROWS.update(
+        (string, row)
+        for row, string in enumerate(
+            strings[: len(strings) - 280 - _MAX_CYCLE_GAP]
+        )
+    )
+
+    return _DATE_STRINGS, _DATE_ROWS
+
+
+def _date_row(string):
+    if not _DATE_ROWS:
+        build_date_index()
+
+    return _DATE_ROWS.get(string)
+
+
+def due_date_lookup(menstrual_date, cycle_length):
+    r"""
+    Returns the estimated due date of one patient from the date index.
+
+    Parameters:
+        menstrual_date (str): The last menstrual period date in the format
+        "%m/%d/%Y".
+        cycle_length (int): The menstrual cycle length in days.
+
+    Returns:
+        str: The estimated due date in the format "%m/%d/%Y", matching
+        `add_40_weeks_explanation`.
+
+    Notes:
+        - Dates outside the index or spelled without zero padding fall back
+        to the cached `parse_date` and `format_date` path.
+    """
+
+    row = _date_row(menstrual_date)
+    gap = abs(cycle_length - 28)
+
+    if row is not None and gap <= _MAX_CYCLE_GAP and gap == int(gap):
+        return _DATE_STRINGS[row + 280 + int(gap)]
+
+    return format_date(
+        parse_date(menstrual_date) + timedelta(weeks=40, days=gap)
+    )
+
+
+def conception_date_lookup(menstrual_date):
+    r"""
+    Returns the estimated conception date of one patient from the date
+    index.
+
+    Parameters:
+        menstrual_date (str): The last menstrual period date in the format
+        "%m/%d/%Y".
+
+    Returns:
+        str: The date 2 weeks after `menstrual_date` in the format
+        "%m/%d/%Y".
+    """
+
+    row = _date_row(menstrual_date)
+
+    if row is not None:
+        return _DATE_STRINGS[row + 14]
+
+    return format_date(parse_date(menstrual_date) + timedelta(weeks=2))
+
+
+def gestational_age_lookup(current_date, menstrual_date):
+    r"""
+    Returns the gestational age of one patient from the date index.
+
+    Parameters:
+        current_date (str): The current date in the format "%m/%d/%Y".
+        menstrual_date (str): The last menstrual period date in the format
+        "%m/%d/%Y".
+
+    Returns:
+        tuple: The completed weeks and remaining days of gestation.
+    """
+
+    current_row = _date_row(current_date)
+    menstrual_row = _date_row(menstrual_date)
+
+    if current_row is not None and menstrual_row is not None:
+        days = abs(current_row - menstrual_row)
+    else:
+        days = abs(parse_date(current_date) - parse_date(menstrual_date)).days
+
+    return days // 7, days % 7
+
+
+if __name__ == "__main__":
+    menstrual_dates = ["09/17/2011", "12/03/2023", "01/21/2004"]
+
+    print(estimated_due_dates(menstrual_dates, [21, 28, 35]))
+    print(conception_dates(menstrual_dates))
+    print(
+        gestational_ages(
+            ["04/29/2022", "11/15/2005"], ["01/06/2022", "6/16/2005"]
+        )
+    )
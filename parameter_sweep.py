@@ -0,0 +1,118 @@
+# ========= Copyright 2023-2024 @ CAMEL-AI.org. All Rights Reserved. =========
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ========= Copyright 2023-2024 @ CAMEL-AI.org. All Rights Reserved. =========
+r"""
+Vectorized parameter sweeps of the continuous calculators.
+
+A sweep reads the kernel arguments of a base patient once, replaces the
+swept arguments with their grids laid out along separate axes, and lets
+the kernels of `formula_kernels.py` broadcast over the Cartesian product,
+so a sweep of any size is one NumPy evaluation without explanation text.
+
+Date: March 2025
+"""
+
+import numpy as np
+
+from camel.toolkits.medcalc_bench.formula_kernels import (
+    formula_kernels,
+    kernel_arguments,
+)
+
+
+def parameter_sweep(calculator, inputs, grids):
+    r"""
+    Evaluates a calculator over the Cartesian product of parameter grids.
+
+    Parameters:
+        calculator (str): A key of `formula_kernels.formula_kernels`, e.g.
+        "ckd_epi_2021_creatinine" or "qt_calculator_bazett".
+        inputs (dict): The base patient in the calculator's input format.
+        grids (dict): One-dimensional grids of the swept kernel arguments,
+        in the units listed in `formula_kernels`, e.g.
+        {"creatinine": np.linspace(0.5, 4, 50)}.
+
+    Returns:
+        numpy.ndarray: The results, with one axis per grid in the order of
+        `grids`.
+
+    Example:
+        parameter_sweep("qt_calculator_bazett",
+        {"heart_rate": (60, "beats per minute"),
+        "qt_interval": (330, "msec")},
+        {"heart_rate": [60, 90], "qt_interval": [330, 400, 450]})
+
+        output: array([[330.   , 400.   , 450.   ],
+                       [404.065, 489.776, 550.997]])
+    """
+
+    units = formula_kernels[calculator][1]
+    unknown = [name for name in grids if name not in units]
+    if unknown:
+        raise ValueError(
+            f"{calculator} has no argument {', '.join(unknown)}; expected "
+            f"one of {', '.join(units)}."
+        )
+
+    arguments = kernel_arguments(calculator, inputs)
+    shape = []
+    for axis, (name, grid) in enumerate(grids.items()):
+        grid = np.asarray(grid)
+        if grid.ndim != 1:
+            raise ValueError(f"The grid of {name} must be one-dimensional.")
+        layout = [1] * len(grids)
+        layout[axis] = -1
+        arguments[name] = grid.reshape(layout)
+        shape.append(len(grid))
+
+    results = formula_kernels[calculator][0](**arguments)
+
+    return np.broadcast_to(results, shape).copy()
+
+
+if __name__ == "__main__":
+    patient = {
+        "age": (64, "years"),
+        "creatinine": (1.1, "mg/dL"),
+        "sex": "Female",
+    }
+    creatinine = np.linspace(0.6, 3.0, 5)
+    print(
+        parameter_sweep(
+            "ckd_epi_2021_creatinine",
+            patient,
+            {"creatinine": creatinine, "age": [40, 60, 80]},
+        ).round(3)
+    )
+    print(parameter_sweep("mdrd_gfr", patient, {"creatinine": creatinine}))
+
+    qt = {"heart_rate": (72, "beats per minute"), "qt_interval": (400, "msec")}
+    heart_rate = np.arange(50, 131, 20)
+    for calculator in ("qt_calculator_bazett", "qt_calculator_rautaharju"):
+        sweep = parameter_sweep(calculator, qt, {"heart_rate": heart_rate})
+        print(calculator, sweep)
+
+    print(
+        parameter_sweep(
+            "bsa_calculator",
+            {"weight": (150, "lbs"), "height": (170, "cm")},
+            {"weight": [50, 70, 90], "height": [160, 180]},
+        )
+    )
+    print(
+        parameter_sweep(
+            "sch",
+            {"sodium": (134.0, "mEq/L"), "glucose": (90.0, "mg/dL")},
+            {"glucose": [100, 400, 800]},
+        )
+    )
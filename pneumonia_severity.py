@@ -0,0 +1,262 @@
+# ========= Copyright 2023-2024 @ CAMEL-AI.org. All Rights Reserved. =========
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ========= Copyright 2023-2024 @ CAMEL-AI.org. All Rights Reserved. =========
+r"""
+Columnar pneumonia severity kernel: PSI and CURB-65 for a whole census.
+
+Both scores consume age, BUN, respiratory rate, blood pressure and mental
+status. The kernel converts BUN, sodium, glucose and temperature columns
+once and evaluates `psi_score.py` and `curb_65.py` on whole arrays, adding
+the PSI risk class.
+
+Date: March 2025
+"""
+
+import numpy as np
+
+from camel.toolkits.medcalc_bench.score_tables import lookup_scores
+from camel.toolkits.medcalc_bench.utils.convert_temperature import (
+    fahrenheit_to_celsius_array,
+)
+from camel.toolkits.medcalc_bench.utils.unit_converter_new import (
+    conversion_column,
+)
+
+# PSI history and exam findings with their points.
+psi_findings = {
+    "nursing_home_resident": 10,
+    "neoplastic_disease": 30,
+    "liver_disease": 20,
+    "chf": 10,
+    "cerebrovascular_disease": 10,
+    "renal_disease": 10,
+    "altered_mental_status": 20,
+    "pleural_effusion": 10,
+}
+
+# Comorbidities that exclude PSI risk class I.
+_class_one_comorbidities = (
+    "neoplastic_disease",
+    "liver_disease",
+    "chf",
+    "cerebrovascular_disease",
+    "renal_disease",
+    "altered_mental_status",
+)
+
+
+def _flags(columns, name, size):
+    if name not in columns:
+        return np.zeros(size, dtype=bool)
+    return np.asarray(columns[name], dtype=bool)
+
+
+def _bun_mg_dl(columns):
+    values, units = columns["bun"]
+    return conversion_column(values, units, "BUN", 28.02, None, "mg/dL")
+
+
+def psi_points(columns, bun=None):
+    r"""
+    Computes PSI points for a census.
+
+    Parameters:
+        columns (dict): Equal-length columns, see `pneumonia_severity`.
+        bun (array_like): BUN already converted to mg/dL, to share the
+        conversion with CURB-65. (default: :obj:`None`)
+
+    Returns:
+        tuple: The PSI points (float64, as the age may be fractional) and a
+        boolean array marking patients who meet the class I criteria.
+
+    Notes:
+        - Sodium is converted with a valence of 1, which gives the scalar
+        calculator's values for mmol/L and mass units and also accepts
+        mEq/L, where the calculator has no valence to convert with.
+    """
+
+    age = np.asarray(columns["age"], dtype=np.float64)
+    size = len(age)
+
+    if bun is None:
+        bun = _bun_mg_dl(columns)
+
+    female = np.asarray(columns["sex"], dtype=object) == "Female"
+    points = age - 10 * female
+
+    for name, finding_points in psi_findings.items():
+        points += finding_points * _flags(columns, name, size)
+
+    pulse = np.asarray(columns["heart_rate"], dtype=np.float64)
+    temperature = fahrenheit_to_celsius_array(*columns["temperature"])
+    respiratory_rate = np.asarray(
+        columns["respiratory_rate"], dtype=np.float64
+    )
+    sys_bp = np.asarray(columns["sys_bp"], dtype=np.float64)
+
+    abnormal_pulse = pulse >= 125
+    abnormal_temperature = (temperature < 35) | (temperature > 39.9)
+    abnormal_respiratory_rate = respiratory_rate >= 30
+    hypotension = sys_bp < 90
+
+    sodium_values, sodium_units = columns["sodium"]
+    sodium = conversion_column(
+        sodium_values, sodium_units, "sodium", 22.99, 1, "mmol/L"
+    )
+    glucose_values, glucose_units = columns["glucose"]
+    glucose = conversion_column(
+        glucose_values, glucose_units, "glucose", 180.16, None, "mg/dL"
+    )
+    hemocratit = np.asarray(columns["hemocratit"], dtype=np.float64)
+    pao2, pao2_units = columns["partial_pressure_oxygen"]
+    pao2 = np.asarray(pao2, dtype=np.float64)
+    pao2_units = np.asarray(pao2_units)
+
+    points += (
+        10 * abnormal_pulse
+        + 15 * abnormal_temperature
+        + 30 * (np.asarray(columns["pH"], dtype=np.float64) < 7.35)
+        + 20 * abnormal_respiratory_rate
+        + 20 * hypotension
+        + 20 * (bun >= 30)
+        + 20 * (sodium < 130)
+        + 10 * (glucose >= 250)
+        + 10 * (hemocratit < 30)
+        + 10 * ((pao2_units == "mm Hg") & (pao2 < 60))
+        + 10 * ((pao2_units == "kPa") & (pao2 < 8))
+    )
+
+    class_one = (
+        (age <= 50)
+        & ~abnormal_pulse
+        & ~abnormal_temperature
+        & ~abnormal_respiratory_rate
+        & ~hypotension
+    )
+    for name in _class_one_comorbidities:
+        class_one &= ~_flags(columns, name, size)
+
+    return points, class_one
+
+
+def psi_classes(points, class_one=None):
+    r"""
+    Maps PSI points to risk classes.
+
+    Parameters:
+        points (array_like): PSI points.
+        class_one (array_like): Patients meeting the class I criteria (age
+        50 or younger, none of the listed comorbidities, altered mental
+        status or abnormal vital signs). (default: :obj:`None`)
+
+    Returns:
+        numpy.ndarray: The classes "I" to "V": II up to 70 points, III up
+        to 90, IV up to 130 and V above.
+    """
+
+    classes = np.select(
+        [points <= 70, points <= 90, points <= 130], ["II", "III", "IV"], "V"
+    )
+
+    if class_one is not None:
+        classes[np.asarray(class_one, dtype=bool)] = "I"
+
+    return classes
+
+
+def pneumonia_severity(columns):
+    r"""
+    Computes PSI points and class and CURB-65 for a census.
+
+    Parameters:
+        columns (dict): Equal-length columns keyed like the calculators'
+        inputs:
+            - "bun", "sodium", "glucose", "temperature",
+            "partial_pressure_oxygen": (values, units) pairs, where `units`
+            is one unit or an array of units.
+            - "age" in years; "sex"; "heart_rate", "respiratory_rate",
+            "sys_bp", "dia_bp", "pH" and "hemocratit" as plain values.
+            - The findings of `psi_findings` and "confusion": optional
+            booleans. CURB-65 uses "altered_mental_status" when "confusion"
+            is not given.
+
+    Returns:
+        dict: "psi" points, "psi_class" and "curb_65" arrays. CURB-65 only
+        needs age, BUN, respiratory rate and blood pressure, and is
+        computed alone when the PSI columns are incomplete.
+
+    Example:
+        pneumonia_severity({"age": [37], "sys_bp": [90.0], "dia_bp": [50.0],
+        "respiratory_rate": [30.0], "bun": ([3.5], "mmol/L")})
+
+        output: {'curb_65': array([2])}
+    """
+
+    bun = _bun_mg_dl(columns)
+    results = {}
+
+    psi_columns = (
+        "sex",
+        "heart_rate",
+        "temperature",
+        "pH",
+        "sodium",
+        "glucose",
+        "hemocratit",
+        "partial_pressure_oxygen",
+    )
+    if all(name in columns for name in psi_columns):
+        points, class_one = psi_points(columns, bun)
+        results["psi"] = points
+        results["psi_class"] = psi_classes(points, class_one)
+
+    confusion = columns.get("confusion", columns.get("altered_mental_status"))
+    results["curb_65"] = lookup_scores(
+        "curb_65",
+        {
+            "age": columns["age"],
+            "sys_bp": columns["sys_bp"],
+            "dia_bp": columns["dia_bp"],
+            "respiratory_rate": columns["respiratory_rate"],
+            "bun": bun,
+            "confusion": confusion,
+        },
+    )
+
+    return results
+
+
+if __name__ == "__main__":
+    columns = {
+        "age": [37, 81, 64],
+        "sex": ["Male", "Female", "Male"],
+        "heart_rate": [102.0, 130.0, 88.0],
+        "temperature": ([38.2, 95.0, 101.3], ["degrees celsius", "fahrenheit",
+                                             "fahrenheit"]),
+        "pH": [7.38, 7.31, 7.42],
+        "respiratory_rate": [30.0, 24.0, 18.0],
+        "sys_bp": [90.0, 85.0, 132.0],
+        "dia_bp": [50.0, 55.0, 78.0],
+        "bun": ([3.5, 42.0, 12.5], ["mmol/L", "mg/dL", "mmol/L"]),
+        "sodium": ([138.0, 128.0, 135.0], "mmol/L"),
+        "glucose": ([110.0, 260.0, 6.2], ["mg/dL", "mg/dL", "mmol/L"]),
+        "hemocratit": [41.0, 28.0, 39.0],
+        "partial_pressure_oxygen": ([75.0, 7.5, 58.0], ["mm Hg", "kPa",
+                                                        "mm Hg"]),
+        "nursing_home_resident": [False, True, False],
+        "chf": [False, True, False],
+        "altered_mental_status": [False, True, False],
+    }
+
+    for name, values in pneumonia_severity(columns).items():
+        print(name, values)
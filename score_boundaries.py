@@ -0,0 +1,291 @@
+# ========= Copyright 2023-2024 @ CAMEL-AI.org. All Rights Reserved. =========
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ========= Copyright 2023-2024 @ CAMEL-AI.org. All Rights Reserved. =========
+r"""
+Band boundary index and what-if score curves for APACHE II, PSI and SOFA.
+
+For every banded input of the three scores, `score_boundaries` lists the
+values at which one of its criteria changes. A what-if curve for one input,
+holding the others fixed, evaluates the columnar kernels of
+`icu_severity.py` and `pneumonia_severity.py` at every boundary and between
+neighbouring boundaries in one batch, then locates each change of the score
+at the exact floating-point value with a vectorized bisection. The curve
+therefore reproduces the calculators even where they round intermediate
+values, such as the mean arterial pressure or the PaO2/FiO2 ratio.
+
+Date: March 2025
+"""
+
+import numpy as np
+
+from camel.toolkits.medcalc_bench.icu_severity import (
+    apache_ii_scores,
+    sofa_scores,
+)
+from camel.toolkits.medcalc_bench.pneumonia_severity import psi_points
+
+
+def _pressure_boundaries(edges):
+    # Systolic and diastolic pressures at which the mean arterial pressure
+    # reaches each edge, given the other pressure of the patient.
+    def sys_bp(patient):
+        dia_bp = patient.get("dia_bp", np.nan)
+        return [3 * edge - 2 * dia_bp for edge in edges]
+
+    def dia_bp(patient):
+        sys_bp = patient.get("sys_bp", np.nan)
+        return [(3 * edge - sys_bp) / 2 for edge in edges]
+
+    return {"sys_bp": (sys_bp, None), "dia_bp": (dia_bp, None)}
+
+
+def _ratio_boundaries(edges):
+    # PaO2 and FiO2 at which the PaO2/FiO2 ratio reaches each edge.
+    def pao2(patient):
+        fio2 = patient.get("fio2", np.nan)
+        return [edge * fio2 for edge in edges]
+
+    def fio2(patient):
+        pao2 = patient.get("partial_pressure_oxygen", np.nan)
+        return [pao2 / edge for edge in edges]
+
+    return {"partial_pressure_oxygen": (pao2, None), "fio2": (fio2, None)}
+
+
+# (boundaries, unit) of the banded inputs of each score. The boundaries are
+# the values at which a criterion changes, or a function of the patient's
+# other inputs returning them; the unit is the one the what-if values of a
+# (values, units) column are given in, None for plain columns.
+score_boundaries = {
+    "apache_ii": {
+        "age": ((45, 54, 55, 64, 65, 74, 75), None),
+        "fio2": ((50,), None),
+        "a_a_gradient": ((200, 349, 350, 499), None),
+        "partial_pressure_oxygen": ((55, 60, 61, 70), None),
+        "temperature": ((30, 32, 34, 36, 38.5, 39, 41), "degrees celsius"),
+        **_pressure_boundaries((109, 129, 159)),
+        "heart_rate": ((110, 140, 180), None),
+        "respiratory_rate": ((25, 35, 50), None),
+        "pH": ((7.50, 7.60, 7.70), None),
+        "sodium": ((150, 155, 160, 180), "mmol/L"),
+        "potassium": ((5.5, 6.0, 7.0), "mmol/L"),
+        "creatinine": ((0.6, 1.5, 2.0, 3.5), "mg/dL"),
+        "hemocratit": ((46, 50, 60), None),
+        "wbc": ((15, 20, 40), "mm^3"),
+        "gcs": (tuple(range(3, 16)), None),
+    },
+    "psi": {
+        "heart_rate": ((125,), None),
+        "temperature": ((35, 39.9), "degrees celsius"),
+        "pH": ((7.35,), None),
+        "respiratory_rate": ((30,), None),
+        "sys_bp": ((90,), None),
+        "bun": ((30,), "mg/dL"),
+        "sodium": ((130,), "mmol/L"),
+        "glucose": ((250,), "mg/dL"),
+        "hemocratit": ((30,), None),
+        "partial_pressure_oxygen": ((60,), "mm Hg"),
+    },
+    "sofa": {
+        **_ratio_boundaries((100, 199, 200, 300, 400)),
+        **_pressure_boundaries((70,)),
+        "dopamine": ((0, 5, 15), None),
+        "dobutamine": ((0,), None),
+        "epinephrine": ((0, 0.1), None),
+        "norepinephrine": ((0, 0.1), None),
+        "gcs": ((6, 9, 10, 12, 13, 14), None),
+        "bilirubin": ((1.2, 2.0, 6.0, 12.0), "mg/dL"),
+        "platelet_count": ((20000, 50000, 100000, 150000), "µL"),
+        "creatinine": ((1.2, 2.0, 3.5, 5.0), "mg/dL"),
+        "urine_output": ((500,), None),
+    },
+}
+
+
+def _psi(columns):
+    return psi_points(columns)[0]
+
+
+_score_kernels = {
+    "apache_ii": apache_ii_scores,
+    "psi": _psi,
+    "sofa": sofa_scores,
+}
+
+_SIGN_BIT = np.iinfo(np.int64).min
+
+
+def _float_keys(values):
+    # Integers ordered like the float64 values, consecutive for adjacent
+    # floats, so bisecting them converges in at most 64 steps.
+    bits = np.ascontiguousarray(values, dtype=np.float64).view(np.int64)
+    return np.where(bits < 0, -(bits & ~_SIGN_BIT), bits)
+
+
+def _key_floats(keys):
+    bits = np.where(keys < 0, -keys | _SIGN_BIT, keys)
+    return bits.astype(np.int64).view(np.float64)
+
+
+def _evaluate(score, patient, variable, unit, values):
+    size = len(values)
+    columns = {}
+
+    for name, value in patient.items():
+        if isinstance(value, tuple):
+            columns[name] = ([value[0]] * size, value[1])
+        else:
+            columns[name] = [value] * size
+    columns[variable] = values if unit is None else (values, unit)
+
+    return np.asarray(_score_kernels[score](columns))
+
+
+def what_if_curve(score, patient, variable):
+    r"""
+    Computes the score of a patient as a piecewise-constant function of one
+    input, holding the other inputs fixed.
+
+    Parameters:
+        score (str): "apache_ii", "psi" or "sofa".
+        patient (dict): The patient's inputs in the format of the columnar
+        kernels with one value per input, e.g. {"age": 60,
+        "sodium": (134.0, "mmol/L"), ...}. See `icu_severity.icu_severity`
+        and `pneumonia_severity.pneumonia_severity`.
+        variable (str): The input to vary, a key of
+        `score_boundaries[score]`.
+
+    Returns:
+        tuple: (bounds, points) in the format of
+        `glasgow_blatchford.gbs_bands`: band i covers the values from
+        bounds[i - 1] (inclusive) up to bounds[i] (exclusive) and scores
+        points[i], so the score at `x`, in the unit listed in
+        `score_boundaries`, is
+        points[np.searchsorted(bounds, x, side="right")].
+
+    Notes:
+        - Each bound is the smallest float64 value with the new score, so
+        a criterion such as "above 39.9" starts at the float right after
+        39.9.
+        - PSI adds the age itself and APACHE II the GCS itself; the age is
+        therefore not indexed for PSI, and the APACHE II GCS curve has a
+        step at every whole value from 3 to 15.
+
+    Example:
+        what_if_curve("apache_ii", patient, "potassium")
+
+        output: (array([5.5, 6. , 7. ]), array([27, 28, 30, 31]))
+    """
+
+    variables = score_boundaries[score]
+    if variable not in variables:
+        raise ValueError(
+            f"{variable} is not a banded input of {score}; expected one of "
+            f"{', '.join(variables)}."
+        )
+
+    boundaries, unit = variables[variable]
+    if callable(boundaries):
+        boundaries = boundaries(patient)
+    boundaries = np.unique(np.asarray(boundaries, dtype=np.float64))
+    boundaries = boundaries[np.isfinite(boundaries)]
+
+    if not len(boundaries):
+        points = _evaluate(score, patient, variable, unit, np.zeros(1))
+        return np.empty(0), points
+
+    # Sample every boundary, the midpoints between them and one value past
+    # each end; the score is constant between neighbouring samples.
+    gap = np.diff(boundaries).min() if len(boundaries) > 1 else 1.0
+    samples = np.empty(2 * len(boundaries) + 1)
+    samples[0] = boundaries[0] - gap
+    samples[1:-1:2] = boundaries
+    samples[2:-1:2] = (boundaries[:-1] + boundaries[1:]) / 2
+    samples[-1] = boundaries[-1] + gap
+
+    scores = _evaluate(score, patient, variable, unit, samples)
+    changes = np.flatnonzero(scores[:-1] != scores[1:])
+    targets = scores[changes + 1]
+
+    # Bisect every change at once for the first value with the new score.
+    low = _float_keys(samples[changes])
+    high = _float_keys(samples[changes + 1])
+    while True:
+        middle = (low >> 1) + (high >> 1) + (low & high & 1)
+        active = np.flatnonzero(middle > low)
+        if not len(active):
+            break
+        hit = (
+            _evaluate(
+                score, patient, variable, unit, _key_floats(middle[active])
+            )
+            == targets[active]
+        )
+        high[active[hit]] = middle[active[hit]]
+        low[active[~hit]] = middle[active[~hit]]
+
+    return _key_floats(high), np.concatenate([scores[:1], targets])
+
+
+if __name__ == "__main__":
+    patient = {
+        "age": 60,
+        "temperature": (38.9, "degrees celsius"),
+        "heart_rate": 112.0,
+        "respiratory_rate": 28.0,
+        "sys_bp": 95.0,
+        "dia_bp": 50.0,
+        "fio2": 60.0,
+        "a_a_gradient": 410.0,
+        "partial_pressure_oxygen": 75.0,
+        "pH": 7.31,
+        "sodium": (134.0, "mmol/L"),
+        "potassium": (3.8, "mmol/L"),
+        "creatinine": (1.8, "mg/dL"),
+        "acute_renal_failure": True,
+        "hemocratit": 32.0,
+        "wbc": (14.8, "mm^3"),
+        "gcs": 13,
+    }
+
+    for variable in ("potassium", "sys_bp", "creatinine"):
+        print(variable, what_if_curve("apache_ii", patient, variable))
+
+    sofa_patient = {
+        "partial_pressure_oxygen": 90.0,
+        "fio2": 0.4,
+        "sys_bp": 95.0,
+        "dia_bp": 50.0,
+        "bilirubin": (2.1, "mg/dL"),
+        "platelet_count": (95000.0, "µL"),
+        "gcs": 13,
+        "mechanical_ventilation": True,
+    }
+    print(what_if_curve("sofa", sofa_patient, "partial_pressure_oxygen"))
+
+    psi_patient = {
+        "age": 81,
+        "sex": "Female",
+        "heart_rate": 130.0,
+        "temperature": (35.0, "degrees celsius"),
+        "pH": 7.31,
+        "respiratory_rate": 24.0,
+        "sys_bp": 85.0,
+        "dia_bp": 55.0,
+        "bun": (42.0, "mg/dL"),
+        "sodium": (128.0, "mmol/L"),
+        "glucose": (260.0, "mg/dL"),
+        "hemocratit": 28.0,
+        "partial_pressure_oxygen": (7.5, "kPa"),
+    }
+    print(what_if_curve("psi", psi_patient, "temperature"))
@@ -0,0 +1,410 @@
+# ========= Copyright 2023-2024 @ CAMEL-AI.org. All Rights Reserved. =========
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ========= Copyright 2023-2024 @ CAMEL-AI.org. All Rights Reserved. =========
+r"""
+Exhaustive lookup tables for scores with small discrete input domains.
+
+Once their continuous inputs are cut into the bands the calculators compare
+against, the Glasgow Coma Scale, Centor, FeverPAIN, CURB-65 and Child-Pugh
+scores only see a few hundred distinct inputs. Each table is generated by
+running every banded input combination through the existing calculator on
+first use, and stores the answers in a flat array indexed by a mixed-radix
+key, so scoring a patient is one key computation and one array read.
+
+Date: March 2025
+"""
+
+from itertools import product
+
+import numpy as np
+
+from camel.toolkits.medcalc_bench.centor_score import (
+    compute_centor_score_explanation,
+)
+from camel.toolkits.medcalc_bench.child_pugh_score import (
+    compute_child_pugh_score_explanation,
+)
+from camel.toolkits.medcalc_bench.curb_65 import curb_65_explanation
+from camel.toolkits.medcalc_bench.feverpain import (
+    compute_fever_pain_explanation,
+)
+from camel.toolkits.medcalc_bench.glasgow_coma_score import (
+    compute_glasgow_coma_score_explanation,
+)
+
+# Stand-in for any categorical value a calculator does not recognize.
+UNRECOGNIZED = "unrecognized"
+
+
+def _band(name, edges, unit=None):
+    # `edges` are (threshold, inclusive) pairs in increasing order; the band
+    # of a value is the number of edges it passes, where passing means
+    # value >= threshold if inclusive and value > threshold otherwise.
+    representatives = []
+
+    for band in range(len(edges) + 1):
+        lower = edges[band - 1] if band else None
+        upper = edges[band] if band < len(edges) else None
+
+        if lower is None:
+            representatives.append(upper[0] - 1)
+        elif upper is None:
+            representatives.append(lower[0] + 1)
+        elif lower[0] == upper[0]:
+            representatives.append(lower[0])
+        else:
+            representatives.append((lower[0] + upper[0]) / 2)
+
+    return {
+        "name": name,
+        "kind": "band",
+        "edges": edges,
+        "unit": unit,
+        "domain": representatives,
+    }
+
+
+def _category(name, domain):
+    # None in `domain` stands for a missing key.
+    return {
+        "name": name,
+        "kind": "category",
+        "domain": list(domain),
+        "index": {value: index for index, value in enumerate(domain)},
+    }
+
+
+def _flag(name):
+    # Missing, reported absent and reported present.
+    return {"name": name, "kind": "flag", "domain": [None, False, True]}
+
+
+_gcs_eye = (
+    "eyes open spontaneously",
+    "eye opening to verbal command",
+    "eye opening to pain",
+    "no eye opening",
+    "not testable",
+)
+_gcs_verbal = (
+    "oriented",
+    "confused",
+    "inappropriate words",
+    "incomprehensible sounds",
+    "no verbal response",
+    "not testable",
+)
+_gcs_motor = (
+    "obeys commands",
+    "localizes pain",
+    "withdrawal from pain",
+    "flexion to pain",
+    "extension to pain",
+    "no motor response",
+)
+
+# Calculator and banded dimensions of every table. Band inputs are expected
+# in the unit the calculator compares in (years, degrees celsius, mg/dL,
+# g/dL, mm Hg, breaths per minute).
+table_specs = {
+    "glasgow_coma_score": (
+        compute_glasgow_coma_score_explanation,
+        [
+            _category("best_eye_response", _gcs_eye),
+            _category("best_verbal_response", _gcs_verbal),
+            _category("best_motor_response", _gcs_motor),
+        ],
+    ),
+    "centor_score": (
+        compute_centor_score_explanation,
+        [
+            _band(
+                "age",
+                ((3, True), (14, False), (15, True), (44, False), (45, True)),
+                "years",
+            ),
+            _band("temperature", ((38, False),), "degrees celsius"),
+            _flag("exudate_swelling_tonsils"),
+            _flag("tender_lymph_nodes"),
+            _flag("cough_absent"),
+        ],
+    ),
+    "feverpain": (
+        compute_fever_pain_explanation,
+        [
+            _flag("fever_24_hours"),
+            _flag("cough_coryza_absent"),
+            _flag("symptom_onset"),
+            _flag("purulent_tonsils"),
+            _flag("severe_tonsil_inflammation"),
+        ],
+    ),
+    "curb_65": (
+        curb_65_explanation,
+        [
+            _band("age", ((65, True),), "years"),
+            _band("sys_bp", ((90, True),), "mm hg"),
+            # The calculator truncates blood pressures and respiratory rate
+            # to integers, so int(dia_bp) <= 60 is dia_bp < 61.
+            _band("dia_bp", ((61, True),), "mm hg"),
+            _band("respiratory_rate", ((30, True),), "breaths per minute"),
+            _band("bun", ((19, False),), "mg/dL"),
+            _flag("confusion"),
+        ],
+    ),
+    "child_pugh_score": (
+        compute_child_pugh_score_explanation,
+        [
+            _band("inr", ((1.7, True), (2.3, False))),
+            # A bilirubin of exactly 2 mg/dL falls between the calculator's
+            # ranges and scores no points.
+            _band("bilirubin", ((2, True), (2, False), (3, True)), "mg/dL"),
+            _band("albumin", ((2.8, False), (3.5, False)), "g/dL"),
+            _category(
+                "ascites", (None, "Absent", "Slight", "Moderate", UNRECOGNIZED)
+            ),
+            _category(
+                "encephalopathy",
+                (
+                    None,
+                    "No Encephalopathy",
+                    "Grade 1-2",
+                    "Grade 3-4",
+                    UNRECOGNIZED,
+                ),
+            ),
+        ],
+    ),
+}
+
+_tables = {}
+
+
+def _input_variables(dimensions, values):
+    input_variables = {}
+
+    for dimension, value in zip(dimensions, values):
+        if dimension["kind"] == "band":
+            if dimension["unit"] is not None:
+                value = (value, dimension["unit"])
+        elif value is None:
+            continue
+        input_variables[dimension["name"]] = value
+
+    return input_variables
+
+
+def score_table(name):
+    r"""
+    Returns the answer table of a score, generating it on first use.
+
+    Parameters:
+        name (str): A key of `table_specs`, e.g. "curb_65".
+
+    Returns:
+        numpy.ndarray: The flat answer array. Entry `table_key(name, values)`
+        holds the calculator's answer for `values`.
+
+    Notes:
+        - Generation calls the calculator once per banded input
+        combination, at most a few thousand calls per table.
+    """
+
+    table = _tables.get(name)
+
+    if table is None:
+        function, dimensions = table_specs[name]
+        table = np.array(
+            [
+                function(_input_variables(dimensions, values))["Answer"]
+                for values in product(
+                    *(dimension["domain"] for dimension in dimensions)
+                )
+            ]
+        )
+        _tables[name] = table
+
+    return table
+
+
+def build_score_tables():
+    r"""
+    Generates every table up front, e.g. at service start-up.
+    """
+
+    for name in table_specs:
+        score_table(name)
+
+
+def _index(dimension, value):
+    kind = dimension["kind"]
+
+    if kind == "band":
+        return sum(
+            value >= threshold if inclusive else value > threshold
+            for threshold, inclusive in dimension["edges"]
+        )
+    if kind == "flag":
+        return 0 if value is None else 1 + bool(value)
+
+    index = dimension["index"]
+    if value in index:
+        return index[value]
+    if UNRECOGNIZED in index and value is not None:
+        return index[UNRECOGNIZED]
+    raise ValueError(f"Unknown {dimension['name']}: {value}")
+
+
+def table_key(name, values):
+    r"""
+    Computes the mixed-radix key of one patient.
+
+    Parameters:
+        name (str): A key of `table_specs`.
+        values (dict): The inputs keyed by dimension name. Banded inputs are
+        plain numbers in the calculator's comparison unit, flags are
+        booleans, and missing keys are treated like missing keys of the
+        calculator.
+
+    Returns:
+        int: The position of the patient's answer in `score_table(name)`.
+    """
+
+    key = 0
+
+    for dimension in table_specs[name][1]:
+        key = key * len(dimension["domain"]) + _index(
+            dimension, values.get(dimension["name"])
+        )
+
+    return key
+
+
+def _column_indices(dimension, column, size):
+    kind = dimension["kind"]
+
+    if column is None:
+        return np.full(size, _index(dimension, None), dtype=np.int64)
+
+    if kind == "band":
+        column = np.asarray(column, dtype=np.float64)
+        indices = np.zeros(size, dtype=np.int64)
+        for threshold, inclusive in dimension["edges"]:
+            indices += column >= threshold if inclusive else column > threshold
+        return indices
+
+    column = np.asarray(column)
+
+    if kind == "flag" and column.dtype == bool:
+        return column.astype(np.int64) + 1
+
+    if column.dtype == object:
+        # Mixed values such as None and strings cannot be sorted.
+        cache = {}
+        indices = np.empty(size, dtype=np.int64)
+        for row, value in enumerate(column):
+            index = cache.get(value)
+            if index is None:
+                index = cache[value] = _index(dimension, value)
+            indices[row] = index
+        return indices
+
+    uniques, inverse = np.unique(column, return_inverse=True)
+    mapped = np.array(
+        [_index(dimension, value.item()) for value in uniques],
+        dtype=np.int64,
+    )
+    return mapped[inverse.reshape(-1)]
+
+
+def table_keys(name, columns):
+    r"""
+    Computes the mixed-radix keys of a batch of patients.
+
+    Parameters:
+        name (str): A key of `table_specs`.
+        columns (dict): Equal-length arrays keyed by dimension name, in the
+        same form as the values of `table_key`. A missing column means the
+        input is missing for every patient; at least one column is needed.
+
+    Returns:
+        numpy.ndarray: The keys (dtype int64), one per patient.
+    """
+
+    if not columns:
+        raise ValueError(f"{name} needs at least one column.")
+
+    size = len(next(iter(columns.values())))
+    keys = np.zeros(size, dtype=np.int64)
+
+    for dimension in table_specs[name][1]:
+        keys *= len(dimension["domain"])
+        keys += _column_indices(
+            dimension, columns.get(dimension["name"]), size
+        )
+
+    return keys
+
+
+def lookup_score(name, values):
+    r"""
+    Scores one patient with a table read, see `table_key`.
+    """
+
+    return score_table(name)[table_key(name, values)].item()
+
+
+def lookup_scores(name, columns):
+    r"""
+    Scores a batch of patients with one gather, see `table_keys`.
+    """
+
+    return score_table(name)[table_keys(name, columns)]
+
+
+if __name__ == "__main__":
+    print(
+        lookup_score(
+            "glasgow_coma_score",
+            {
+                "best_eye_response": "eye opening to pain",
+                "best_verbal_response": "confused",
+                "best_motor_response": "localizes pain",
+            },
+        )
+    )
+    print(
+        lookup_scores(
+            "curb_65",
+            {
+                "age": [37, 70, 82],
+                "sys_bp": [90.0, 85.0, 130.0],
+                "dia_bp": [50.0, 55.0, 80.0],
+                "respiratory_rate": [30.0, 22.0, 18.0],
+                "bun": [9.8, 25.0, 15.0],
+                "confusion": [False, True, False],
+            },
+        )
+    )
+    print(
+        lookup_scores(
+            "child_pugh_score",
+            {
+                "inr": [1.5, 2.0, 2.6],
+                "bilirubin": [2.8, 1.2, 2.0],
+                "albumin": [2.1, 3.6, 3.0],
+                "ascites": ["Absent", "Slight", "Moderate"],
+                "encephalopathy": ["Grade 1-2", None, "No Encephalopathy"],
+            },
+        )
+    )
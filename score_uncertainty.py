@@ -0,0 +1,266 @@
+# ========= Copyright 2023-2024 @ CAMEL-AI.org. All Rights Reserved. =========
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ========= Copyright 2023-2024 @ CAMEL-AI.org. All Rights Reserved. =========
+r"""
+Monte Carlo uncertainty of lab-driven calculators.
+
+Measured inputs are perturbed with per-input error models, drawn from a
+seeded NumPy generator as a (patients, samples) matrix, and the kernel of
+`formula_kernels.py` is evaluated once over the whole matrix, so the score
+distribution of every patient comes from one array evaluation instead of
+thousands of scalar calls. Large panels are processed in blocks of
+patients to bound memory.
+
+Date: March 2025
+"""
+
+import warnings
+
+import numpy as np
+
+from camel.toolkits.medcalc_bench.formula_kernels import (
+    formula_kernels,
+    kernel_argument_columns,
+)
+
+# Error models, each drawing perturbed values of an input from its measured
+# values (one row per patient), a scale and the generator.
+error_models = {
+    # Additive normal error with standard deviation `scale`.
+    "normal": lambda values, scale, rng, size: values
+    + rng.normal(0.0, 1.0, size) * scale,
+    # Normal error proportional to the value, `scale` being the
+    # coefficient of variation.
+    "proportional": lambda values, scale, rng, size: values
+    * (1 + rng.normal(0.0, 1.0, size) * scale),
+    # Log-normal multiplicative error with log standard deviation `scale`,
+    # which keeps positive values positive.
+    "lognormal": lambda values, scale, rng, size: values
+    * np.exp(rng.normal(0.0, 1.0, size) * scale),
+    # Uniform error within plus or minus `scale`.
+    "uniform": lambda values, scale, rng, size: values
+    + rng.uniform(-1.0, 1.0, size) * scale,
+}
+
+# Largest number of patient samples evaluated at once.
+_BLOCK_SIZE = 2**20
+
+
+def score_samples(calculator, arguments, errors, samples, rng):
+    r"""
+    Draws perturbed kernel arguments and evaluates the calculator on them.
+
+    Parameters:
+        calculator (str): A key of `formula_kernels.formula_kernels`.
+        arguments (dict): Kernel argument columns of equal length, see
+        `formula_kernels.kernel_argument_columns`.
+        errors (dict): The error model of each perturbed argument, see
+        `score_quantiles`.
+        samples (int): The number of samples per patient.
+        rng (numpy.random.Generator): The generator to draw from.
+
+    Returns:
+        numpy.ndarray: The sampled scores, of shape (patients, samples).
+    """
+
+    kernel, units, _ = formula_kernels[calculator]
+    unknown = [name for name in errors if name not in units]
+    if unknown:
+        raise ValueError(
+            f"{calculator} has no argument {', '.join(unknown)}; expected "
+            f"one of {', '.join(units)}."
+        )
+    for name, (model, _) in errors.items():
+        if model not in error_models:
+            raise ValueError(
+                f"Unknown error model {model} for {name}; expected one of "
+                f"{', '.join(error_models)}."
+            )
+
+    size = len(next(iter(arguments.values())))
+    shape = (size, samples)
+    sampled = {}
+
+    for name, value in arguments.items():
+        value = np.asarray(value)[:, None]
+        if name in errors:
+            model, scale = errors[name]
+            scale = np.asarray(scale, dtype=np.float64)
+            if scale.ndim:
+                scale = scale[:, None]
+            value = error_models[model](value, scale, rng, shape)
+            # Measured inputs are positive, so draws at or below zero are
+            # not scored rather than clamped or logged by the kernel.
+            value = np.where(value > 0, value, np.nan)
+        sampled[name] = np.broadcast_to(value, shape).reshape(-1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scores = kernel(**sampled)
+
+    return np.asarray(scores, dtype=np.float64).reshape(shape)
+
+
+def score_quantiles(
+    calculator,
+    patients,
+    errors,
+    samples=10000,
+    quantiles=(0.05, 0.5, 0.95),
+    seed=None,
+):
+    r"""
+    Estimates quantiles of a calculator's answer for every patient under
+    measurement error of its inputs.
+
+    Parameters:
+        calculator (str): A key of `formula_kernels.formula_kernels`, e.g.
+        "meldna", "fibrosis_4", "framingham_risk_score" or
+        "ckd_epi_2021_creatinine".
+        patients (list): The calculator's input dict of every patient.
+        errors (dict): The error model of each perturbed kernel argument,
+        as (model, scale) with a model of `error_models`, in the units of
+        `formula_kernels`, e.g. {"creatinine": ("proportional", 0.05)}.
+        The scale is one number or one number per patient.
+        samples (int): The number of samples per patient.
+        (default: :obj:`10000`)
+        quantiles (tuple): The quantiles to estimate.
+        (default: :obj:`(0.05, 0.5, 0.95)`)
+        seed (int): The seed of the generator, for reproducible runs.
+        (default: :obj:`None`)
+
+    Returns:
+        numpy.ndarray: The quantiles, of shape (patients, quantiles), empty
+        for an empty list of patients.
+
+    Notes:
+        - Draws at or below zero, such as a negative creatinine from an
+        additive normal error, and samples the kernel cannot score are NaN
+        and left out of the quantiles; patients without any scorable sample
+        get NaN quantiles.
+
+    Example:
+        score_quantiles("ckd_epi_2021_creatinine",
+        [{"age": (60, "years"), "creatinine": (1.2, "mg/dL"),
+        "sex": "Male"}], {"creatinine": ("proportional", 0.05)}, seed=7)
+
+        output: array([[63.01927993, 69.28672578, 76.77623485]])
+    """
+
+    rng = np.random.default_rng(seed)
+    arguments = kernel_argument_columns(calculator, patients)
+    scales = {
+        name: np.broadcast_to(
+            np.asarray(scale, dtype=np.float64), len(patients)
+        )
+        for name, (_, scale) in errors.items()
+    }
+
+    block = max(1, _BLOCK_SIZE // samples)
+    results = [np.empty((0, len(quantiles)))]
+    for start in range(0, len(patients), block):
+        rows = slice(start, start + block)
+        scores = score_samples(
+            calculator,
+            {name: value[rows] for name, value in arguments.items()},
+            {
+                name: (model, scales[name][rows])
+                for name, (model, _) in errors.items()
+            },
+            samples,
+            rng,
+        )
+        with warnings.catch_warnings():
+            # Patients without any scorable sample get NaN quantiles.
+            warnings.simplefilter("ignore", RuntimeWarning)
+            results.append(np.nanquantile(scores, quantiles, axis=1).T)
+
+    return np.concatenate(results)
+
+
+if __name__ == "__main__":
+    patients = [
+        {"age": (60, "years"), "creatinine": (1.2, "mg/dL"), "sex": "Male"},
+        {"age": (45, "years"), "creatinine": (88.4, "µmol/L"),
+         "sex": "Female"},
+    ]
+    print(
+        score_quantiles(
+            "ckd_epi_2021_creatinine",
+            patients,
+            {"creatinine": ("proportional", 0.05)},
+            seed=7,
+        ).round(2)
+    )
+
+    liver = [
+        {
+            "creatinine": (1.4, "mg/dL"),
+            "bilirubin": (2.8, "mg/dL"),
+            "inr": 1.5,
+            "sodium": (131.0, "mEq/L"),
+        }
+    ]
+    print(
+        score_quantiles(
+            "meldna",
+            liver,
+            {
+                "creatinine": ("proportional", 0.05),
+                "bilirubin": ("proportional", 0.1),
+                "inr": ("normal", 0.05),
+                "sodium": ("normal", 1.5),
+            },
+            samples=5000,
+            seed=7,
+        )
+    )
+
+    fib4 = [
+        {
+            "age": (55, "years"),
+            "ast": (80, "U/L"),
+            "alt": (60, "U/L"),
+            "platelet_count": (150000, "µL"),
+        }
+    ]
+    print(
+        score_quantiles(
+            "fibrosis_4",
+            fib4,
+            {"ast": ("lognormal", 0.08), "alt": ("lognormal", 0.08)},
+            seed=7,
+        )
+    )
+
+    framingham = [
+        {
+            "age": (62, "years"),
+            "sex": "Male",
+            "smoker": True,
+            "sys_bp": (145, "mm Hg"),
+            "total_cholestrol": (230.0, "mg/dL"),
+            "hdl_cholestrol": (40.0, "mg/dL"),
+        }
+    ]
+    print(
+        score_quantiles(
+            "framingham_risk_score",
+            framingham,
+            {
+                "sys_bp": ("normal", 5.0),
+                "total_cholestrol": ("proportional", 0.03),
+                "hdl_cholestrol": ("proportional", 0.03),
+            },
+            seed=7,
+        )
+    )
@@ -0,0 +1,343 @@
+# ========= Copyright 2023-2024 @ CAMEL-AI.org. All Rights Reserved. =========
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ========= Copyright 2023-2024 @ CAMEL-AI.org. All Rights Reserved. =========
+r"""
+Sepsis-3 onset detection from a stream of SOFA organ subscores.
+
+Sepsis-3 is an acute rise of the SOFA score by 2 points or more. For every
+patient and organ system, the lowest subscore observed over a lookback
+window is kept in a monotonic deque, so the baseline of each organ is
+available in O(1) and every observation costs O(1) amortized. Observations
+are processed in event-time order: they are buffered per patient and
+released once the patient's watermark (latest event time minus the
+allowed lateness) has moved past them, and observations arriving at or
+behind the released stream are dropped.
+
+Date: March 2025
+"""
+
+import heapq
+from collections import deque
+from itertools import count
+
+import numpy as np
+
+from camel.toolkits.medcalc_bench.icu_severity import (
+    sofa_organ_scores,
+    sofa_organs,
+)
+
+_ORGANS = tuple(sofa_organs)
+_ORGAN_INDEX = {organ: index for index, organ in enumerate(_ORGANS)}
+
+# Organs scored only where all of their value columns are present; the
+# others are scored where any one of them is.
+_NEEDS_ALL = {"respiratory"}
+
+# Columns `sofa_organ_scores` always reads, with their unit (None for plain
+# columns), filled with NaN when a snapshot batch leaves them out.
+_REQUIRED_COLUMNS = {
+    "partial_pressure_oxygen": None,
+    "fio2": None,
+    "bilirubin": "mg/dL",
+    "platelet_count": "µL",
+}
+
+
+class _PatientSepsis:
+    __slots__ = (
+        "pending",
+        "latest",
+        "released",
+        "current",
+        "windows",
+        "septic",
+    )
+
+    def __init__(self):
+        # Buffered (time, sequence, organ, points) observations.
+        self.pending = []
+        # Latest event time seen, which sets the watermark.
+        self.latest = None
+        # Event time of the last released observations.
+        self.released = None
+        # Last released subscore of each organ, None until observed.
+        self.current = [None] * len(_ORGANS)
+        # Monotonic deques of (time, points) with increasing points.
+        self.windows = [deque() for _ in _ORGANS]
+        self.septic = False
+
+
+class SepsisStream:
+    r"""
+    Detects Sepsis-3 onsets from per-organ SOFA subscores over event time.
+
+    Parameters:
+        lookback (float): The length of the baseline window, in the unit of
+        the event times, e.g. hours. (default: :obj:`24`)
+        allowed_lateness (float): How far behind a patient's latest event
+        time an observation may arrive and still be processed in order.
+        (default: :obj:`0`)
+        threshold (int): The SOFA increase over baseline that marks an
+        onset. (default: :obj:`2`)
+
+    Notes:
+        - The baseline of an organ is its lowest subscore observed in the
+        window [t - lookback, t]; an organ without observations in the
+        window uses its last subscore, so it adds no increase.
+        - Observations with the same event time are applied together before
+        the increase is evaluated.
+        - An onset is emitted when the increase reaches `threshold`, and the
+        patient can have a new onset once the increase falls below it.
+
+    Example:
+        stream = SepsisStream(lookback=24)
+        stream.add("bed 3", 0, "respiratory", 0)
+        stream.add("bed 3", 6, "respiratory", 2)
+        stream.flush()
+
+        output: [('bed 3', 6, 2, 2)]
+    """
+
+    def __init__(self, lookback=24, allowed_lateness=0, threshold=2):
+        self.lookback = lookback
+        self.allowed_lateness = allowed_lateness
+        self.threshold = threshold
+        self.late_observations = 0
+        self._patients = {}
+        self._sequence = count()
+
+    def add(self, patient, time, organ, points):
+        r"""
+        Ingests one organ subscore observation.
+
+        Parameters:
+            patient (Hashable): The patient identifier.
+            time (float): The event time of the observation.
+            organ (str): The organ system, a key of
+            `icu_severity.sofa_organs`.
+            points (int): The organ's SOFA subscore.
+
+        Returns:
+            list: The onsets released by this observation, each a tuple
+            (patient, time, increase, sofa) where `sofa` is the total of
+            the current subscores.
+        """
+
+        state = self._patients.get(patient)
+        if state is None:
+            state = self._patients[patient] = _PatientSepsis()
+
+        if state.released is not None and time <= state.released:
+            self.late_observations += 1
+            return []
+
+        heapq.heappush(
+            state.pending,
+            (time, next(self._sequence), _ORGAN_INDEX[organ], points),
+        )
+        if state.latest is None or time > state.latest:
+            state.latest = time
+
+        watermark = state.latest - self.allowed_lateness
+        return self._release(patient, state, watermark)
+
+    def add_snapshots(self, patients, times, columns):
+        r"""
+        Ingests a batch of SOFA input snapshots.
+
+        Parameters:
+            patients (array_like): The patient of each row.
+            times (array_like): The event time of each row.
+            columns (dict): Equal-length SOFA columns in the format of
+            `icu_severity.icu_severity`, any of which may be left out. An
+            organ is observed in a row when its value columns are not NaN:
+            both PaO2 and FiO2 for the respiratory system, any one of them
+            for the others.
+
+        Returns:
+            list: The onsets released by the batch, see `add`.
+
+        Example:
+            stream.add_snapshots(["bed 8", "bed 8"], [0.0, 1.0],
+            {"gcs": [15, np.nan], "bilirubin": ([np.nan, 2.4], "mg/dL")})
+
+            observes the CNS at time 0 and the liver at time 1.
+        """
+
+        patients = list(patients)
+        times = list(times)
+        size = len(patients)
+
+        present = {}
+        for name, values in columns.items():
+            if isinstance(values, tuple):
+                values = values[0]
+            present[name] = ~np.isnan(np.asarray(values, dtype=float))
+
+        columns = dict(columns)
+        for name, unit in _REQUIRED_COLUMNS.items():
+            if name not in columns:
+                missing = np.full(size, np.nan)
+                columns[name] = missing if unit is None else (missing, unit)
+
+        organ_scores = sofa_organ_scores(columns)
+        rows = []
+
+        for organ, inputs in sofa_organs.items():
+            found = [present[name] for name in inputs if name in present]
+            if organ in _NEEDS_ALL:
+                if len(found) < len(inputs):
+                    continue
+                observed = np.logical_and.reduce(found)
+            elif found:
+                observed = np.logical_or.reduce(found)
+            else:
+                continue
+            rows.extend(
+                (row, organ, points)
+                for row, points in zip(
+                    np.flatnonzero(observed).tolist(),
+                    organ_scores[organ][observed].tolist(),
+                )
+            )
+
+        onsets = []
+        for row, organ, points in sorted(rows, key=lambda item: item[0]):
+            onsets.extend(self.add(patients[row], times[row], organ, points))
+
+        return onsets
+
+    def flush(self):
+        r"""
+        Releases every buffered observation, e.g. at the end of a replay.
+
+        Returns:
+            list: The onsets released, see `add`.
+        """
+
+        onsets = []
+        for patient, state in self._patients.items():
+            onsets.extend(self._release(patient, state, float("inf")))
+        return onsets
+
+    def _release(self, patient, state, watermark):
+        pending = state.pending
+        onsets = []
+
+        while pending and pending[0][0] < watermark:
+            time = pending[0][0]
+            while pending and pending[0][0] == time:
+                _, _, organ, points = heapq.heappop(pending)
+                self._apply(state, time, organ, points)
+            state.released = time
+
+            increase, sofa = self._increase(state, time)
+            if increase >= self.threshold:
+                if not state.septic:
+                    state.septic = True
+                    onsets.append((patient, time, increase, sofa))
+            else:
+                state.septic = False
+
+        return onsets
+
+    def _apply(self, state, time, organ, points):
+        window = state.windows[organ]
+        while window and window[-1][1] >= points:
+            window.pop()
+        window.append((time, points))
+        state.current[organ] = points
+
+    def _increase(self, state, time):
+        start = time - self.lookback
+        increase = 0
+        sofa = 0
+
+        for window, current in zip(state.windows, state.current):
+            if current is None:
+                continue
+            while window and window[0][0] < start:
+                window.popleft()
+            baseline = window[0][1] if window else current
+            increase += current - baseline
+            sofa += current
+
+        return increase, sofa
+
+    def increase(self, patient):
+        r"""
+        Returns the SOFA increase over baseline of a patient as of the last
+        released observation, 0 if none was released yet.
+        """
+
+        state = self._patients.get(patient)
+        if state is None or state.released is None:
+            return 0
+        return self._increase(state, state.released)[0]
+
+    def discharge(self, patient):
+        r"""
+        Drops the state of a patient, e.g. at ICU discharge.
+        """
+
+        self._patients.pop(patient, None)
+
+
+if __name__ == "__main__":
+    stream = SepsisStream(lookback=24, allowed_lateness=2)
+    observations = [
+        ("bed 3", 0.0, "respiratory", 0),
+        ("bed 3", 0.0, "renal", 0),
+        ("bed 3", 4.0, "coagulation", 1),
+        ("bed 3", 6.5, "respiratory", 2),
+        # Arrives late but within the allowed lateness.
+        ("bed 3", 5.0, "renal", 1),
+        ("bed 3", 9.0, "cns", 0),
+        # Arrives behind the released stream and is dropped.
+        ("bed 3", 3.0, "liver", 4),
+        ("bed 5", 1.0, "cardiovascular", 1),
+        ("bed 5", 40.0, "cardiovascular", 3),
+    ]
+    for observation in observations:
+        for onset in stream.add(*observation):
+            print(onset)
+    print(stream.flush(), stream.late_observations)
+
+    columns = {
+        "partial_pressure_oxygen": [90.0, 70.0],
+        "fio2": [0.4, 0.5],
+        "bilirubin": ([1.0, 2.4], "mg/dL"),
+        "platelet_count": ([180000.0, 90000.0], "µL"),
+        "gcs": [15, 14],
+    }
+    stream = SepsisStream()
+    print(stream.add_snapshots(["bed 8", "bed 8"], [0.0, 12.0], columns))
+    print(stream.flush())
+
+    # Vitals and labs replayed at different times, each row holding only
+    # the values measured then.
+    nan = float("nan")
+    partial = {
+        "partial_pressure_oxygen": [170.0, nan, 68.0, nan],
+        "fio2": [0.4, nan, 0.6, nan],
+        "gcs": [15, nan, nan, 13],
+        "platelet_count": ([nan, 160000.0, nan, nan], "µL"),
+    }
+    stream = SepsisStream()
+    print(
+        stream.add_snapshots(
+            ["bed 9"] * 4, [0.0, 1.5, 8.0, 9.0], partial
+        )
+    )
+    print(stream.flush())
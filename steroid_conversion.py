@@ -23,10 +23,53 @@ Modifications include:
 Date: March 2025
 """
 
-from camel.toolkits.medcalc_bench.utils.rounding import round_number
+import numpy as np
+
+from camel.toolkits.medcalc_bench.utils.rounding import (
+    round_number,
+    round_number_array,
+)
 from camel.toolkits.medcalc_bench.utils.unit_converter_new import (
     conversion_explanation,
 )
+from camel.toolkits.medcalc_bench.utils.unit_registry import (
+    UNIT_SYMBOLS,
+    compound_code,
+    factor_matrix,
+    unit_code,
+    unit_codes,
+)
+
+conversion_dict = {
+    "Betamethasone IV": 1,
+    "Cortisone PO": 33.33,
+    "Dexamethasone IV": 1,
+    "Dexamethasone PO": 1,
+    "Hydrocortisone IV": 26.67,
+    "Hydrocortisone PO": 26.67,
+    "MethylPrednisoLONE IV": 5.33,
+    "MethylPrednisoLONE PO": 5.33,
+    "PrednisoLONE PO": 6.67,
+    "PredniSONE PO": 6.67,
+    "Triamcinolone IV": 5.33,
+}
+
+steroid_names = list(conversion_dict)
+steroid_codes = {name: code for code, name in enumerate(steroid_names)}
+
+# Rounded mg-to-mg conversion factors, indexed by (input, target) steroid.
+steroid_equivalence = np.array(
+    [
+        [
+            round_number(conversion_dict[target] / conversion_dict[source])
+            for target in steroid_names
+        ]
+        for source in steroid_names
+    ]
+)
+
+_MG = unit_code("mg")
+_DOSE_COMPOUND = compound_code()
 
 
 def compute_steroid_conversion_explanation(input_parameters):
@@ -112,19 +155,6 @@ def compute_steroid_conversion_explanation(input_parameters):
             7. PredniSONE: Route = PO, Equivalent Dose = 5 mg
             8. Triamcinolone: Route = IV, Equivalent Dose = 4 mg
         """
-    conversion_dict = {
-        "Betamethasone IV": 1,
-        "Cortisone PO": 33.33,
-        "Dexamethasone IV": 1,
-        "Dexamethasone PO": 1,
-        "Hydrocortisone IV": 26.67,
-        "Hydrocortisone PO": 26.67,
-        "MethylPrednisoLONE IV": 5.33,
-        "MethylPrednisoLONE PO": 5.33,
-        "PrednisoLONE PO": 6.67,
-        "PredniSONE PO": 6.67,
-        "Triamcinolone IV": 5.33,
-    }
 
     explanation += "\n\n"
     input_drug_mass_exp, input_drug_mass = conversion_explanation(
@@ -141,10 +171,11 @@ def compute_steroid_conversion_explanation(input_parameters):
     input_drug_name = input_parameters["input steroid"][0]
     input_unit = input_parameters["input steroid"][2]
 
-    from_multiplier = conversion_dict[input_drug_name]
-    to_multiplier = conversion_dict[target_drug_name]
-
-    conversion_factor = round_number(to_multiplier / from_multiplier)
+    conversion_factor = float(
+        steroid_equivalence[
+            steroid_codes[input_drug_name], steroid_codes[target_drug_name]
+        ]
+    )
     converted_amount = round_number(input_drug_mass * conversion_factor)
     input_drug_mass = round_number(input_drug_mass)
 
@@ -166,6 +197,73 @@ def compute_steroid_conversion_explanation(input_parameters):
     return {"Explanation": explanation, "Answer": converted_amount}
 
 
+def convert_steroids(input_steroids, doses, units, target_steroids):
+    r"""
+    Converts arrays of corticosteroid doses into equivalent target doses.
+
+    Parameters:
+        input_steroids (Sequence[str]): The input steroid of each order, a
+        key of `conversion_dict` such as "Hydrocortisone PO".
+        doses (array_like): The input dose of each order.
+        units (Sequence[str] or str): The unit of each dose, or one unit for
+        all doses, e.g. "mg" or "g".
+        target_steroids (Sequence[str] or str): The target steroid of each
+        order, or one target steroid for all orders.
+
+    Returns:
+        numpy.ndarray: The equivalent doses of the target steroids in mg,
+        matching the answers of `compute_steroid_conversion_explanation`.
+
+    Example:
+        convert_steroids(
+            ["Hydrocortisone PO", "Dexamethasone PO"],
+            [190.936, 8.58],
+            "mg",
+            "MethylPrednisoLONE IV",
+        )
+
+        output: "array([38.187, 45.731])"
+    """
+
+    doses = np.asarray(doses, dtype=np.float64)
+    sources = np.fromiter(
+        (steroid_codes[name] for name in input_steroids),
+        dtype=np.int64,
+        count=len(input_steroids),
+    )
+
+    if isinstance(target_steroids, str):
+        targets = steroid_codes[target_steroids]
+    else:
+        targets = np.fromiter(
+            (steroid_codes[name] for name in target_steroids),
+            dtype=np.int64,
+            count=len(target_steroids),
+        )
+
+    if isinstance(units, str):
+        src_units = unit_code(units)
+    else:
+        src_units = unit_codes(units)
+
+    # Doses given in other units are rounded after conversion to mg, like
+    # the explanation path through `conversion_explanation`.
+    to_mg = factor_matrix(_DOSE_COMPOUND)[src_units, _MG]
+    unsupported = np.isnan(to_mg)
+    if np.any(unsupported):
+        code = np.broadcast_to(src_units, unsupported.shape)[unsupported][0]
+        raise ValueError(
+            f"Unsupported dose unit: {UNIT_SYMBOLS[code]}; expected a mass "
+            "unit such as mg or g."
+        )
+    to_mg = round_number_array(to_mg)
+    mg = np.where(
+        np.asarray(src_units) == _MG, doses, round_number_array(doses * to_mg)
+    )
+
+    return round_number_array(mg * steroid_equivalence[sources, targets])
+
+
 if __name__ == "__main__":
     # Defining test cases
     test_cases = [
@@ -185,3 +283,12 @@ if __name__ == "__main__":
         result = compute_steroid_conversion_explanation(input_variables)
         print(result)
         print("-" * 50)
+
+    print(
+        convert_steroids(
+            [case['input steroid'][0] for case in test_cases],
+            [case['input steroid'][1] for case in test_cases],
+            [case['input steroid'][2] for case in test_cases],
+            [case['target steroid'] for case in test_cases],
+        )
+    )
@@ -23,18 +23,187 @@ Date: March 2025
 """
 
 
+import numpy as np
+
+# Whole-year divisor per age unit string. 0 marks ages given in days, which
+# always count as 0 years, and None marks units that are skipped.
+_AGE_UNIT_DIVISORS = {}
+
+
+def _age_unit_divisor(unit):
+    try:
+        return _AGE_UNIT_DIVISORS[unit]
+    except KeyError:
+        pass
+
+    if "year" in unit:
+        divisor = 1
+    elif "months" in unit:
+        divisor = 12
+    elif "weeks" in unit:
+        divisor = 52
+    elif "days" in unit:
+        divisor = 0
+    else:
+        divisor = None
+
+    _AGE_UNIT_DIVISORS[unit] = divisor
+    return divisor
+
+
 def age_conversion(input):
-    count = 0
-    while count < len(input):
-        if "year" in input[count + 1]:
+    for count in range(0, len(input), 2):
+        divisor = _age_unit_divisor(input[count + 1])
+
+        if divisor is None:
+            continue
+        if divisor == 1:
             return input[count]
-        elif "months" in input[count + 1]:
-            return input[count] // 12
-        elif "weeks" in input[count + 1]:
-            return input[count] // 52
-        elif "days" in input[count + 1]:
+        if divisor == 0:
             return 0
-        count += 2
+        return input[count] // divisor
+
+
+def age_conversion_ragged(values, units, offsets):
+    r"""
+    Converts ragged (value, unit) age records into years at once.
+
+    Parameters:
+        values (array_like): The age values of all records, concatenated.
+        units (array_like): The age unit of each value, e.g. "years",
+        "months", "weeks" or "days".
+        offsets (array_like): Record boundaries into `values`, of length
+        n_records + 1, so record i is values[offsets[i]:offsets[i + 1]].
+
+    Returns:
+        numpy.ndarray: The age of each record in years (dtype float64), or
+        -1 for records without a recognized unit.
+
+    Notes:
+        - Like `age_conversion`, the first recognized unit of each record
+        decides the age: ages in years are kept as given, months are
+        floor-divided by 12 and weeks by 52, and ages given in days count
+        as 0 years.
+    """
+
+    values = np.asarray(values, dtype=np.float64)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    n_records = len(offsets) - 1
+
+    unique_units, inverse = np.unique(
+        np.asarray(units, dtype=str), return_inverse=True
+    )
+    unit_divisors = [
+        _age_unit_divisor(unit) for unit in unique_units.tolist()
+    ]
+    divisors = np.array(
+        [-1 if divisor is None else divisor for divisor in unit_divisors],
+        dtype=np.int64,
+    )[inverse.ravel()]
+
+    # Ages in years are kept as given, others floor-divided like `//`.
+    with np.errstate(divide="ignore", invalid="ignore"):
+        years = np.where(
+            divisors == 1,
+            values,
+            np.where(
+                divisors > 1,
+                np.floor_divide(values, np.maximum(divisors, 1)),
+                0,
+            ),
+        )
+
+    result = np.full(n_records, -1, dtype=np.float64)
+
+    if len(values) == 0:
+        return result
+
+    # Position of the first recognized unit in each record.
+    positions = np.where(divisors >= 0, np.arange(len(values)), len(values))
+    lengths = np.diff(offsets)
+    nonempty = lengths > 0
+    first = np.full(n_records, len(values), dtype=np.int64)
+    first[nonempty] = np.minimum.reduceat(positions, offsets[:-1][nonempty])
+
+    matched = first < offsets[1:]
+    result[matched] = years[first[matched]]
+
+    return result
+
+
+def age_conversion_batch(ages):
+    r"""
+    Converts a batch of age lists, e.g. [(2, "years"), (30, "months")],
+    into years.
+
+    Parameters:
+        ages (Sequence[Sequence]): Flat age lists in the `age_conversion`
+        format, alternating values and units.
+
+    Returns:
+        numpy.ndarray: The age of each patient in years (dtype float64), or
+        -1 where no unit was recognized.
+    """
+
+    values = [value for age in ages for value in age[0::2]]
+    units = [unit for age in ages for unit in age[1::2]]
+    offsets = np.zeros(len(ages) + 1, dtype=np.int64)
+    np.cumsum([len(age) // 2 for age in ages], out=offsets[1:])
+
+    return age_conversion_ragged(values, units, offsets)
+
+
+def age_columns_to_years(years=None, months=None, weeks=None, days=None):
+    r"""
+    Converts pre-split age columns into years.
+
+    Parameters:
+        years (array_like): Ages in years, NaN where not recorded.
+        months (array_like): Ages in months, NaN where not recorded.
+        weeks (array_like): Ages in weeks, NaN where not recorded.
+        days (array_like): Ages in days, NaN where not recorded.
+
+    Returns:
+        numpy.ndarray: The age in years (dtype float64), or -1 where no
+        column holds a value. Ages in years are kept as given and the other
+        columns floor-divided, like `age_conversion`.
+
+    Notes:
+        - Columns take precedence in the order years, months, weeks, days,
+        matching `age_conversion` on lists written in that order.
+    """
+
+    columns = [
+        (column, divisor)
+        for column, divisor in (
+            (years, 1),
+            (months, 12),
+            (weeks, 52),
+            (days, 0),
+        )
+        if column is not None
+    ]
+
+    if not columns:
+        raise ValueError("At least one age column is required.")
+
+    columns = [
+        (np.asarray(column, dtype=np.float64), divisor)
+        for column, divisor in columns
+    ]
+    result = np.full(columns[0][0].shape, -1, dtype=np.float64)
+
+    # Fill from the lowest to the highest precedence column.
+    for column, divisor in reversed(columns):
+        present = ~np.isnan(column)
+        if divisor == 0:
+            result[present] = 0
+        elif divisor == 1:
+            result[present] = column[present]
+        else:
+            result[present] = np.floor_divide(column[present], divisor)
+
+    return result
 
 
 def age_conversion_explanation(input):
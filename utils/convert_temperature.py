@@ -22,7 +22,40 @@ Modifications include:
 Date: March 2025
 """
 
-from camel.toolkits.medcalc_bench.utils.rounding import round_number
+import numpy as np
+
+from camel.toolkits.medcalc_bench.utils.rounding import (
+    round_number,
+    round_number_array,
+)
+
+
+def fahrenheit_to_celsius(temperature, units):
+    if units == "degrees celsius":
+        return temperature
+
+    return round_number((temperature - 32) * 5 / 9)
+
+
+def fahrenheit_to_celsius_array(temperatures, units):
+    r"""
+    Vectorized `fahrenheit_to_celsius` over a column of temperatures.
+
+    Parameters:
+        temperatures (array_like): The temperatures.
+        units (str or array_like): The unit of every temperature, or one
+        unit. Any unit other than "degrees celsius" is read as fahrenheit.
+
+    Returns:
+        numpy.ndarray: The temperatures in degrees celsius as float64.
+    """
+
+    temperatures = np.asarray(temperatures, dtype=np.float64)
+    celsius = np.asarray(units) == "degrees celsius"
+
+    return np.where(
+        celsius, temperatures, round_number_array((temperatures - 32) * 5 / 9)
+    )
 
 
 def fahrenheit_to_celsius_explanation(temperature, units):
@@ -24,6 +24,8 @@ Date: March 2025
 
 from math import floor, log10
 
+import numpy as np
+
 
 def round_number(num):
     if num > 0.001:
@@ -34,3 +36,56 @@ def round_number(num):
         if num == 0:
             return 0
         return round(num, -int(floor(log10(abs(num)))) + 2)
+
+
+def round_number_array(values):
+    r"""
+    Vectorized `round_number` over a NumPy array.
+
+    Parameters:
+        values (array_like): The values to round.
+
+    Returns:
+        numpy.ndarray: The rounded values as float64.
+
+    Notes:
+        - Values at or below 0.001 are rounded to three significant digits
+        by scaling them to three integer digits, like values above 0.001 to
+        the nearest thousandth. Values that this scaled rounding could
+        resolve differently from Python's correctly rounded `round`
+        (near-ties, values next to a power of ten, very large values,
+        negative values of magnitude 1000 or more and values too small to
+        scale exactly) are rounded with `round_number` itself, so results
+        match the scalar function exactly.
+        - NaN and infinite values are returned unchanged.
+    """
+
+    values = np.asarray(values, dtype=np.float64)
+    finite = np.isfinite(values)
+    large = values > 0.001
+    small = finite & ~large & (values != 0)
+
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        magnitude = np.log10(np.abs(values))
+        digits = np.where(small, 2 - np.floor(magnitude), 3)
+        scale = 10.0**digits
+        scaled = values * scale
+        result = np.where(finite, np.rint(scaled) / scale, values)
+        tie = np.abs(np.abs(scaled) % 1 - 0.5) <= 1e-6
+        power = np.abs(magnitude - np.rint(magnitude)) <= 1e-9
+
+    # Above 1e9 the scaled value's own rounding error exceeds the margin.
+    tie |= ~(np.abs(scaled) < 1e9)
+    exact = ~finite | (values == 0) | (large & ~tie)
+    exact |= small & ~tie & ~power & (digits >= 0) & (digits <= 22)
+    result[values == 0] = 0
+
+    if not exact.all():
+        flat = result.reshape(-1)
+        inexact = np.flatnonzero(~exact.reshape(-1))
+        for index, value in zip(
+            inexact.tolist(), values.reshape(-1)[inexact].tolist()
+        ):
+            flat[index] = round_number(value)
+
+    return result
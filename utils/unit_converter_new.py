@@ -23,7 +23,20 @@ Modifications include:
 Date: March 2025
 """
 
-from camel.toolkits.medcalc_bench.utils.rounding import round_number
+import numpy as np
+
+from camel.toolkits.medcalc_bench.utils.rounding import (
+    round_number,
+    round_number_array,
+)
+from camel.toolkits.medcalc_bench.utils.unit_registry import (
+    UNIT_CODES,
+    UNIT_KINDS,
+    UNIT_PARTS,
+    UNIT_SYMBOLS,
+    compound_code,
+    factor_matrix,
+)
 
 
 def vol_to_vol_explanation(
@@ -279,12 +292,12 @@ def conversion_explanation(
 
     explanation = ""
 
-    if "/" in src_unit and "/" in tgt_unit:
-        src_mass_unit = src_unit.split("/")[0]
-        src_volume_unit = src_unit.split("/")[1]
+    src_parts = _unit_parts(src_unit)
+    tgt_parts = _unit_parts(tgt_unit)
 
-        tgt_mass_unit = tgt_unit.split("/")[0]
-        tgt_volume_unit = tgt_unit.split("/")[1]
+    if src_parts is not None and tgt_parts is not None:
+        src_mass_unit, src_volume_unit = src_parts
+        tgt_mass_unit, tgt_volume_unit = tgt_parts
 
         if (
             src_mass_unit == tgt_mass_unit
@@ -372,7 +385,7 @@ def conversion_explanation(
             f"{tgt_mass_unit} {compound}/{tgt_volume_unit}. "
         )
     elif (
-        ("/" not in src_unit and "/" not in tgt_unit)
+        (src_parts is None and tgt_parts is None)
         and src_unit in conversion_factors_mass
         and tgt_unit in conversion_factors_mass
     ):
@@ -388,7 +401,7 @@ def conversion_explanation(
         )
 
     elif (
-        ("/" not in src_unit and "/" not in tgt_unit)
+        (src_parts is None and tgt_parts is None)
         and src_unit in conversion_factors_volume
         and tgt_unit in conversion_factors_volume
     ):
@@ -400,50 +413,82 @@ def conversion_explanation(
     return explanation, result
 
 
+def _unit_parts(unit):
+    # Concentration units are interned, so only unknown units are split.
+    code = UNIT_CODES.get(unit)
+
+    if code is not None:
+        parts = UNIT_PARTS[code]
+        if parts is None:
+            return None
+        return UNIT_SYMBOLS[parts[0]], UNIT_SYMBOLS[parts[1]]
+
+    if "/" not in unit:
+        return None
+
+    parts = unit.split("/")
+    return parts[0], parts[1]
+
+
+def _amount_kind(unit):
+    code = UNIT_CODES.get(unit)
+
+    if code is None:
+        return None
+
+    return UNIT_KINDS[code]
+
+
 def mass_conversion_explanation(
     value, compound, valence, molar_mass, src_mass_unit, tgt_mass_unit
 ):
     explanation = f"The mass of {compound} is {value} {src_mass_unit}. "
 
-    if ("g" in src_mass_unit and "g" in tgt_mass_unit) or (
-        "mol" in src_mass_unit and "mol" in tgt_mass_unit
-    ):
+    src_kind = _amount_kind(src_mass_unit)
+    tgt_kind = _amount_kind(tgt_mass_unit)
+
+    # Unknown units fail the unit lookup, like the factor tables do.
+    for unit, kind in ((src_mass_unit, src_kind), (tgt_mass_unit, tgt_kind)):
+        if kind not in ('g', 'mol', 'mEq'):
+            raise KeyError(unit)
+
+    if src_kind == tgt_kind and src_kind in ('g', 'mol'):
         conv_explanation, mass_value = molg_to_molg_explanation(
             value, compound, src_mass_unit, tgt_mass_unit
         )
         explanation += conv_explanation
 
-    elif "mol" in src_mass_unit and "g" in tgt_mass_unit:
+    elif src_kind == 'mol' and tgt_kind == 'g':
         conv_explanation, mass_value = mol_g_explanation(
             value, compound, molar_mass, src_mass_unit, tgt_mass_unit
         )
         explanation += conv_explanation
 
-    elif "g" in src_mass_unit and "mol" in tgt_mass_unit:
+    elif src_kind == 'g' and tgt_kind == 'mol':
         conv_explanation, mass_value = g_to_mol_explanation(
             value, compound, molar_mass, src_mass_unit, tgt_mass_unit
         )
         explanation += conv_explanation
 
-    elif "mol" in src_mass_unit and "mEq" in tgt_mass_unit:
+    elif src_kind == 'mol' and tgt_kind == 'mEq':
         conv_explanation, mass_value = mol_to_mEq_explanation(
             value, compound, valence, src_mass_unit
         )
         explanation += conv_explanation
 
-    elif "mEq" in src_mass_unit and "mol" in tgt_mass_unit:
+    elif src_kind == 'mEq' and tgt_kind == 'mol':
         conv_explanation, mass_value = mEq_to_mol_explanation(
             value, compound, valence, tgt_mass_unit
         )
         explanation += conv_explanation
 
-    elif "mEq" in src_mass_unit and "g" in tgt_mass_unit:
+    elif src_kind == 'mEq' and tgt_kind == 'g':
         conv_explanation, mass_value = mEq_to_g_explanation(
             value, compound, molar_mass, valence, tgt_mass_unit
         )
         explanation += conv_explanation
 
-    elif "g" in src_mass_unit and "mEq" in tgt_mass_unit:
+    elif src_kind == 'g' and tgt_kind == 'mEq':
         conv_explanation, mass_value = g_to_mEq_explanation(
             value, compound, molar_mass, valence, src_mass_unit
         )
@@ -495,6 +540,196 @@ def convert_to_units_per_liter_explanation(value, unit, compound, target_unit):
     return explanation, result
 
 
+# Unit factors of the registry, which divides the same unit-to-base factors
+# as the scalar converters.
+_UNIT_FACTORS = factor_matrix(compound_code())
+
+
+def _registry_factor(src_unit, tgt_unit):
+    return round_number(
+        float(_UNIT_FACTORS[UNIT_CODES[src_unit], UNIT_CODES[tgt_unit]])
+    )
+
+
+def _molg_steps(src_unit, tgt_unit):
+    if src_unit == tgt_unit:
+        return []
+    return [("*", _registry_factor(src_unit, tgt_unit))]
+
+
+def _mass_steps(src_unit, tgt_unit, molar_mass, valence):
+    # The arithmetic of `mass_conversion_explanation`, as (operator,
+    # operand) steps each followed by `round_number`, or None where the
+    # scalar converter fails.
+    src_kind = _amount_kind(src_unit)
+    tgt_kind = _amount_kind(tgt_unit)
+    needs = {
+        ('mol', 'g'): (molar_mass,),
+        ('g', 'mol'): (molar_mass,),
+        ('mol', 'mEq'): (valence,),
+        ('mEq', 'mol'): (valence,),
+        ('mEq', 'g'): (molar_mass, valence),
+        ('g', 'mEq'): (molar_mass, valence),
+    }.get((src_kind, tgt_kind), ())
+    if any(value is None for value in needs):
+        return None
+
+    if src_kind == tgt_kind and src_kind in ('g', 'mol'):
+        return _molg_steps(src_unit, tgt_unit)
+    if src_kind == 'mol' and tgt_kind == 'g':
+        return (
+            _molg_steps(src_unit, 'mol')
+            + [("*", molar_mass)]
+            + _molg_steps('g', tgt_unit)
+        )
+    if src_kind == 'g' and tgt_kind == 'mol':
+        return (
+            _molg_steps(src_unit, 'g')
+            + [("/", molar_mass)]
+            + _molg_steps('mol', tgt_unit)
+        )
+    if src_kind == 'mol' and tgt_kind == 'mEq':
+        return _molg_steps(src_unit, 'mmol') + [("*", valence)]
+    if src_kind == 'mEq' and tgt_kind == 'mol':
+        return [("/", valence)] + _molg_steps('mmol', tgt_unit)
+    if src_kind == 'mEq' and tgt_kind == 'g':
+        return (
+            [("/", valence)]
+            + _molg_steps('mmol', 'mol')
+            + [("*", molar_mass)]
+            + _molg_steps('g', tgt_unit)
+        )
+    if src_kind == 'g' and tgt_kind == 'mEq':
+        return (
+            _molg_steps(src_unit, 'g')
+            + [("/", molar_mass)]
+            + _molg_steps('mol', 'mmol')
+            + [("*", valence)]
+        )
+    return None
+
+
+def _conversion_steps(src_unit, tgt_unit, molar_mass, valence):
+    # The arithmetic of `conversion_explanation` for a unit pair.
+    src_parts = _unit_parts(src_unit)
+    tgt_parts = _unit_parts(tgt_unit)
+
+    if src_parts is not None and tgt_parts is not None:
+        if src_parts == tgt_parts:
+            return []
+        kinds = [_amount_kind(part) for part in src_parts + tgt_parts]
+        if kinds[0] not in ('g', 'mol', 'mEq') or kinds[1] != 'L':
+            return None
+        if kinds[2] not in ('g', 'mol', 'mEq') or kinds[3] != 'L':
+            return None
+        src_mass_unit, src_volume_unit = src_parts
+        tgt_mass_unit, tgt_volume_unit = tgt_parts
+        steps = []
+        if src_mass_unit != tgt_mass_unit:
+            steps = _mass_steps(
+                src_mass_unit, tgt_mass_unit, molar_mass, valence
+            )
+            if steps is None:
+                return None
+        if src_volume_unit == tgt_volume_unit:
+            return steps + [("/", 1)]
+        return steps + [
+            ("/", _registry_factor(src_volume_unit, tgt_volume_unit))
+        ]
+
+    if (
+        src_parts is None
+        and tgt_parts is None
+        and _amount_kind(src_unit) not in (None, 'L', 'conc')
+        and _amount_kind(tgt_unit) not in (None, 'L', 'conc')
+    ):
+        if src_unit == tgt_unit:
+            return []
+        return _mass_steps(src_unit, tgt_unit, molar_mass, valence)
+
+    return None
+
+
+def _convert_column(steps, convert, values, units, tgt_unit):
+    values = np.array(values, dtype=np.float64)
+    units = np.broadcast_to(np.asarray(units, dtype=str), values.shape)
+    pending = (units != tgt_unit) & ~np.isnan(values)
+
+    # Rows already in the target unit are returned unchanged, like the
+    # scalar converters, and missing (NaN) values stay missing. The rows of
+    # every other unit replay the scalar arithmetic, rounding after each
+    # step like it; unit pairs the scalar converter cannot handle go
+    # through it to fail the same way.
+    for unit in np.unique(units[pending]).tolist():
+        rows = pending & (units == unit)
+        plan = steps(unit)
+        if plan is None:
+            values[rows] = [
+                convert(value, unit) for value in values[rows].tolist()
+            ]
+            continue
+        column = values[rows]
+        for operator, operand in plan:
+            if operator == "*":
+                column = round_number_array(column * operand)
+            else:
+                column = round_number_array(column / operand)
+        values[rows] = column
+
+    return values
+
+
+def conversion_column(values, units, compound, molar_mass, valence, tgt_unit):
+    r"""
+    Converts a column of values like `conversion_explanation`, without the
+    explanations.
+
+    Parameters:
+        values (array_like): The values to convert.
+        units (str or array_like): The unit of every value, or one unit.
+        compound (str): The compound name.
+        molar_mass (float): The molar mass of the compound, or None.
+        valence (int): The valence of the compound, or None.
+        tgt_unit (str): The target unit.
+
+    Returns:
+        numpy.ndarray: The converted values as float64, equal to the answers
+        of `conversion_explanation` row by row.
+    """
+
+    return _convert_column(
+        lambda unit: _conversion_steps(unit, tgt_unit, molar_mass, valence),
+        lambda value, unit: conversion_explanation(
+            value, compound, molar_mass, valence, unit, tgt_unit
+        )[1],
+        values,
+        units,
+        tgt_unit,
+    )
+
+
+def units_per_liter_column(values, units, compound, target_unit):
+    r"""
+    Converts a column of counts like `convert_to_units_per_liter_explanation`,
+    without the explanations.
+    """
+
+    def steps(unit):
+        if _amount_kind(unit) != 'L' or _amount_kind(target_unit) != 'L':
+            return None
+        return [("*", _registry_factor(target_unit, unit))]
+
+    return _convert_column(
+        steps,
+        lambda value, unit: convert_to_units_per_liter_explanation(
+            value, unit, compound, target_unit
+        )[1],
+        values,
+        units,
+        target_unit,
+    )
+
+
 def mmHg_to_kPa_explanation(mmHg, compound):
     answer = round_number(0.133322 * mmHg)
     explanation = (
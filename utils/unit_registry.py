@@ -0,0 +1,293 @@
+# ========= Copyright 2023-2024 @ CAMEL-AI.org. All Rights Reserved. =========
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ========= Copyright 2023-2024 @ CAMEL-AI.org. All Rights Reserved. =========
+r"""
+Integer-coded unit registry for the MedCalc-Bench unit converters.
+
+Every unit symbol understood by `unit_converter_new` (amounts, volumes and
+"amount/volume" concentrations) is interned to a small integer code once.
+Conversion factors are precomputed per compound (molar mass, valence) into
+a dense matrix indexed by (src_code, tgt_code), so converting a value is a
+single table read and a multiplication with no string handling.
+
+Date: March 2025
+"""
+
+import numpy as np
+
+# Amount units, expressed in their base unit of the same kind.
+MASS_UNITS = {
+    'kg': ('g', 1000),
+    'g': ('g', 1),
+    'mg': ('g', 0.001),
+    'µg': ('g', 0.000001),
+    'mol': ('mol', 1),
+    'mmol': ('mol', 0.001),
+    'µmol': ('mol', 0.000001),
+    'pmol': ('mol', 0.000000001),
+    'mEq': ('mEq', 1),
+}
+
+# Volume units, expressed in liters.
+VOLUME_UNITS = {
+    'L': 1,
+    'dL': 0.1,
+    'mL': 0.001,
+    'µL': 0.000001,
+    'mm^3': 0.000001,
+    'cm^3': 0.001,
+    'm^3': 1000,
+}
+
+UNIT_SYMBOLS = (
+    list(MASS_UNITS)
+    + list(VOLUME_UNITS)
+    + [f"{mass}/{volume}" for mass in MASS_UNITS for volume in VOLUME_UNITS]
+)
+UNIT_CODES = {symbol: code for code, symbol in enumerate(UNIT_SYMBOLS)}
+
+# Kind of each unit code: "g", "mol" or "mEq" for amounts, "L" for
+# volumes and "conc" for concentrations.
+UNIT_KINDS = [
+    MASS_UNITS[symbol][0]
+    if symbol in MASS_UNITS
+    else 'L'
+    if symbol in VOLUME_UNITS
+    else 'conc'
+    for symbol in UNIT_SYMBOLS
+]
+
+# (mass_code, volume_code) of each concentration code, None otherwise.
+UNIT_PARTS = [
+    tuple(UNIT_CODES[part] for part in symbol.split("/"))
+    if "/" in symbol
+    else None
+    for symbol in UNIT_SYMBOLS
+]
+
+_COMPOUND_CODES = {}
+_COMPOUND_KEYS = []
+_FACTOR_ROWS = []
+_FACTOR_MATRICES = []
+
+
+def unit_code(unit):
+    r"""
+    Returns the integer code of a unit symbol.
+
+    Parameters:
+        unit (str): A unit symbol such as "mg", "dL" or "mmol/L".
+
+    Returns:
+        int: The code of the unit in `UNIT_SYMBOLS`.
+
+    Notes:
+        - Raises ValueError for units outside the registry vocabulary.
+    """
+
+    try:
+        return UNIT_CODES[unit]
+    except KeyError:
+        raise ValueError(f"Unknown unit: {unit}") from None
+
+
+def unit_codes(units):
+    r"""
+    Interns a sequence of unit symbols into an int array of unit codes.
+
+    Parameters:
+        units (Sequence[str]): The unit symbols, e.g. a lab result column.
+
+    Returns:
+        numpy.ndarray: The unit codes (dtype int16), one per input symbol.
+    """
+
+    return np.fromiter(
+        (unit_code(unit) for unit in units), dtype=np.int16, count=len(units)
+    )
+
+
+def _amount_in_mol(unit, molar_mass, valence):
+    kind, factor = MASS_UNITS[unit]
+
+    if kind == 'mol':
+        return factor
+    if kind == 'g':
+        return factor / molar_mass if molar_mass else None
+    return 0.001 / valence if valence else None
+
+
+def _amount_factor(src_unit, tgt_unit, molar_mass, valence):
+    if src_unit == tgt_unit:
+        return 1
+
+    src_kind, src_factor = MASS_UNITS[src_unit]
+    tgt_kind, tgt_factor = MASS_UNITS[tgt_unit]
+
+    if src_kind == tgt_kind:
+        return src_factor / tgt_factor
+
+    src_mol = _amount_in_mol(src_unit, molar_mass, valence)
+    tgt_mol = _amount_in_mol(tgt_unit, molar_mass, valence)
+
+    if src_mol is None or tgt_mol is None:
+        return None
+
+    return src_mol / tgt_mol
+
+
+def _unit_factor(src, tgt, molar_mass, valence):
+    src_symbol = UNIT_SYMBOLS[src]
+    tgt_symbol = UNIT_SYMBOLS[tgt]
+    src_kind = UNIT_KINDS[src]
+    tgt_kind = UNIT_KINDS[tgt]
+
+    if src_kind == 'L' or tgt_kind == 'L':
+        if src_kind != tgt_kind:
+            return None
+        return VOLUME_UNITS[src_symbol] / VOLUME_UNITS[tgt_symbol]
+
+    if (src_kind == 'conc') != (tgt_kind == 'conc'):
+        return None
+
+    if src_kind != 'conc':
+        return _amount_factor(src_symbol, tgt_symbol, molar_mass, valence)
+
+    src_mass, src_volume = UNIT_PARTS[src]
+    tgt_mass, tgt_volume = UNIT_PARTS[tgt]
+
+    mass_factor = _amount_factor(
+        UNIT_SYMBOLS[src_mass], UNIT_SYMBOLS[tgt_mass], molar_mass, valence
+    )
+
+    if mass_factor is None:
+        return None
+
+    volume_factor = (
+        VOLUME_UNITS[UNIT_SYMBOLS[src_volume]]
+        / VOLUME_UNITS[UNIT_SYMBOLS[tgt_volume]]
+    )
+
+    return mass_factor / volume_factor
+
+
+def compound_code(molar_mass=None, valence=None):
+    r"""
+    Interns a compound and builds its conversion factor matrix on first use.
+
+    Parameters:
+        molar_mass (float): The molar mass of the compound in g/mol, or None
+        if the compound is only converted within one kind of amount unit.
+        valence (int): The valence of the compound, or None if the compound
+        is never converted to or from mEq.
+
+    Returns:
+        int: The compound code to pass to `convert` and `convert_array`.
+
+    Notes:
+        - Compounds are keyed by (molar_mass, valence), so e.g. every caller
+        converting creatinine with a molar mass of 113.12 shares one matrix.
+    """
+
+    key = (molar_mass, valence)
+    code = _COMPOUND_CODES.get(key)
+
+    if code is not None:
+        return code
+
+    size = len(UNIT_SYMBOLS)
+    rows = []
+
+    for src in range(size):
+        row = []
+        for tgt in range(size):
+            factor = _unit_factor(src, tgt, molar_mass, valence)
+            row.append(float('nan') if factor is None else factor)
+        rows.append(row)
+
+    code = len(_COMPOUND_KEYS)
+    _COMPOUND_CODES[key] = code
+    _COMPOUND_KEYS.append(key)
+    _FACTOR_ROWS.append(rows)
+    _FACTOR_MATRICES.append(np.array(rows))
+
+    return code
+
+
+def factor_matrix(compound):
+    r"""
+    Returns the dense conversion factor matrix of an interned compound.
+
+    Parameters:
+        compound (int): A code returned by `compound_code`.
+
+    Returns:
+        numpy.ndarray: A square matrix where entry [src, tgt] is the factor
+        converting a value in unit `src` to unit `tgt`, or NaN if the two
+        units cannot be converted into each other for this compound.
+    """
+
+    return _FACTOR_MATRICES[compound]
+
+
+def convert(value, src, tgt, compound):
+    r"""
+    Converts a single value between two unit codes.
+
+    Parameters:
+        value (float): The value to convert.
+        src (int): The unit code of `value`.
+        tgt (int): The target unit code.
+        compound (int): A code returned by `compound_code`.
+
+    Returns:
+        float: The converted value. Unlike `conversion_explanation`, no
+        intermediate step is rounded.
+    """
+
+    return value * _FACTOR_ROWS[compound][src][tgt]
+
+
+def convert_array(values, src, tgt, compound):
+    r"""
+    Converts an array of values between unit codes in one gather-multiply.
+
+    Parameters:
+        values (array_like): The values to convert.
+        src (int or array_like): The unit code(s) of `values`.
+        tgt (int or array_like): The target unit code(s).
+        compound (int): A code returned by `compound_code`.
+
+    Returns:
+        numpy.ndarray: The converted values as float64, NaN wherever the
+        unit pair cannot be converted.
+    """
+
+    return np.asarray(values, dtype=np.float64) * factor_matrix(compound)[
+        src, tgt
+    ]
+
+
+if __name__ == "__main__":
+    creatinine = compound_code(113.12)
+    sodium = compound_code(22.99, 1)
+
+    print(convert(88.4, unit_code("µmol/L"), unit_code("mg/dL"), creatinine))
+    print(
+        convert_array(
+            [140, 3.22, 135],
+            unit_codes(["mEq/L", "mg/mL", "mmol/L"]),
+            unit_code("mmol/L"),
+            sodium,
+        )
+    )
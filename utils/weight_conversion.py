@@ -23,7 +23,12 @@ Modifications include:
 Date: March 2025
 """
 
-from camel.toolkits.medcalc_bench.utils.rounding import round_number
+import numpy as np
+
+from camel.toolkits.medcalc_bench.utils.rounding import (
+    round_number,
+    round_number_array,
+)
 
 
 def weight_conversion_explanation(weight_info):
@@ -79,3 +84,26 @@ def weight_conversion_explanation(weight_info):
         )
     else:
         return f"The patient's weight is {weight} kg. ", weight
+
+
+def weight_to_kg_array(weights, units):
+    r"""
+    Vectorized `weight_conversion_explanation` over a column of weights.
+
+    Parameters:
+        weights (array_like): The weights.
+        units (str or array_like): The unit of every weight, or one unit:
+        "lbs", "g" or "kg". Any other unit is read as kilograms.
+
+    Returns:
+        numpy.ndarray: The weights in kilograms as float64.
+    """
+
+    weights = np.asarray(weights, dtype=np.float64)
+    units = np.asarray(units)
+
+    return np.select(
+        [units == "lbs", units == "g"],
+        [round_number_array(weights * 0.453592), weights / 1000],
+        weights,
+    )
@@ -0,0 +1,273 @@
+# ========= Copyright 2023-2024 @ CAMEL-AI.org. All Rights Reserved. =========
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ========= Copyright 2023-2024 @ CAMEL-AI.org. All Rights Reserved. =========
+r"""
+Edge-triggered SIRS and CURB-65 alerts over a stream of observations.
+
+Per patient, only the last normalized value of each input and the bitmask
+of met criteria are kept. An observation re-evaluates just the criteria
+that read its input, and an event is emitted only when the score crosses
+the alert threshold, with hysteresis: an alert is raised when the score
+reaches `raise_at` and cleared when it falls back to `clear_at`.
+
+Date: March 2025
+"""
+
+from camel.toolkits.medcalc_bench.utils.age_conversion import age_conversion
+from camel.toolkits.medcalc_bench.utils.convert_temperature import (
+    fahrenheit_to_celsius,
+)
+from camel.toolkits.medcalc_bench.utils.unit_converter_new import (
+    conversion_explanation,
+    convert_to_units_per_liter_explanation,
+)
+
+# Normalizers turning an observed value, in the format of the calculators'
+# inputs, into the number the criteria compare against.
+observation_normalizers = {
+    "age": age_conversion,
+    "temperature": lambda value: fahrenheit_to_celsius(value[0], value[1]),
+    "heart_rate": lambda value: value[0],
+    "respiratory_rate": lambda value: value[0],
+    "paco2": lambda value: value[0],
+    "sys_bp": lambda value: value[0],
+    "dia_bp": lambda value: value[0],
+    "wbc": lambda value: convert_to_units_per_liter_explanation(
+        value[0], value[1], "white blood cell", "m^3"
+    )[1],
+    "bun": lambda value: conversion_explanation(
+        value[0], "BUN", 28.02, None, value[1], "mg/dL"
+    )[1],
+    "confusion": bool,
+}
+
+
+def _met(values, name, test):
+    value = values.get(name)
+    return value is not None and test(value)
+
+
+# (criterion, inputs, test) of each score, one point per criterion met. The
+# test receives the dict of the patient's normalized values; inputs that
+# have not been observed yet count as not met, like missing keys of the
+# scalar calculators.
+alert_criteria = {
+    "sirs": (
+        (
+            "temperature",
+            ("temperature",),
+            lambda v: _met(v, "temperature", lambda t: t > 38 or t < 36),
+        ),
+        # Like `sirs_criteria.py`, the heart rate criterion counts for
+        # every heart rate.
+        ("heart_rate", ("heart_rate",), lambda v: "heart_rate" in v),
+        (
+            "wbc",
+            ("wbc",),
+            lambda v: _met(v, "wbc", lambda wbc: wbc > 12000 or wbc < 4000),
+        ),
+        (
+            "respiratory",
+            ("respiratory_rate", "paco2"),
+            lambda v: _met(v, "respiratory_rate", lambda rate: rate > 20)
+            or _met(v, "paco2", lambda paco2: paco2 < 32),
+        ),
+    ),
+    "curb_65": (
+        ("age", ("age",), lambda v: _met(v, "age", lambda age: age >= 65)),
+        ("confusion", ("confusion",), lambda v: bool(v.get("confusion"))),
+        ("bun", ("bun",), lambda v: _met(v, "bun", lambda bun: bun > 19)),
+        (
+            "respiratory_rate",
+            ("respiratory_rate",),
+            lambda v: _met(
+                v, "respiratory_rate", lambda rate: int(rate) >= 30
+            ),
+        ),
+        (
+            "blood_pressure",
+            ("sys_bp", "dia_bp"),
+            lambda v: _met(v, "sys_bp", lambda bp: int(bp) < 90)
+            or _met(v, "dia_bp", lambda bp: int(bp) <= 60),
+        ),
+    ),
+}
+
+
+class _PatientAlert:
+    __slots__ = ("values", "mask", "score", "alerting")
+
+    def __init__(self):
+        self.values = {}
+        self.mask = 0
+        self.score = 0
+        self.alerting = False
+
+
+class AlertStream:
+    r"""
+    Tracks one score per patient over a stream of observations and emits
+    events when it crosses an alert threshold.
+
+    Parameters:
+        score (str): A key of `alert_criteria`, "sirs" or "curb_65".
+        raise_at (int): The score at or above which an alert is raised.
+        clear_at (int): The score at or below which a raised alert is
+        cleared. Must be below `raise_at`. (default: :obj:`raise_at - 1`)
+
+    Notes:
+        - Observations of inputs the score does not read are ignored.
+        - Scores match the scalar calculators on the latest value of every
+        input once all their required inputs have been observed.
+
+    Example:
+        stream = AlertStream("sirs", raise_at=2)
+        stream.observe("bed 4", "heart_rate", (118, "beats per minute"))
+        stream.observe("bed 4", "temperature", (38.6, "degrees celsius"))
+
+        output: ('bed 4', 'raised', 2, None)
+    """
+
+    def __init__(self, score, raise_at, clear_at=None):
+        if clear_at is None:
+            clear_at = raise_at - 1
+        if clear_at >= raise_at:
+            raise ValueError(
+                f"clear_at ({clear_at}) must be below raise_at ({raise_at})."
+            )
+
+        self.criteria = alert_criteria[score]
+        self.raise_at = raise_at
+        self.clear_at = clear_at
+        self._patients = {}
+
+        # Criteria bits that read each input.
+        self._dependents = {}
+        for bit, (_, inputs, test) in enumerate(self.criteria):
+            for name in inputs:
+                self._dependents.setdefault(name, []).append((bit, test))
+
+    def observe(self, patient, name, value, time=None):
+        r"""
+        Ingests one observation.
+
+        Parameters:
+            patient (Hashable): The patient identifier.
+            name (str): The input observed, a key of
+            `observation_normalizers`, e.g. "heart_rate".
+            value: The observed value in the format of the calculators'
+            inputs, e.g. (38.6, "degrees celsius") or True for "confusion".
+            time: The observation time, passed through to the event.
+            (default: :obj:`None`)
+
+        Returns:
+            tuple: (patient, "raised" or "cleared", score, time) when the
+            observation crosses a threshold, None otherwise.
+        """
+
+        dependents = self._dependents.get(name)
+        if dependents is None:
+            return None
+
+        state = self._patients.get(patient)
+        if state is None:
+            state = self._patients[patient] = _PatientAlert()
+
+        normalized = observation_normalizers[name](value)
+        if state.values.get(name) == normalized:
+            return None
+        state.values[name] = normalized
+
+        mask = state.mask
+        for bit, test in dependents:
+            if test(state.values):
+                mask |= 1 << bit
+            else:
+                mask &= ~(1 << bit)
+
+        if mask == state.mask:
+            return None
+        state.mask = mask
+        state.score = bin(mask).count("1")
+
+        if not state.alerting and state.score >= self.raise_at:
+            state.alerting = True
+            return patient, "raised", state.score, time
+        if state.alerting and state.score <= self.clear_at:
+            state.alerting = False
+            return patient, "cleared", state.score, time
+        return None
+
+    def observe_many(self, observations):
+        r"""
+        Ingests an iterable of observations, each a tuple of the `observe`
+        arguments (patient, name, value, time), and yields the events.
+        """
+
+        observe = self.observe
+        for observation in observations:
+            event = observe(*observation)
+            if event is not None:
+                yield event
+
+    def score(self, patient):
+        r"""
+        Returns the current score of a patient, 0 if never observed.
+        """
+
+        state = self._patients.get(patient)
+        return 0 if state is None else state.score
+
+    def criteria_met(self, patient):
+        r"""
+        Returns the names of the criteria a patient currently meets.
+        """
+
+        state = self._patients.get(patient)
+        mask = 0 if state is None else state.mask
+
+        return [
+            name
+            for bit, (name, _, _) in enumerate(self.criteria)
+            if mask >> bit & 1
+        ]
+
+    def discharge(self, patient):
+        r"""
+        Drops the state of a patient, e.g. at discharge.
+        """
+
+        self._patients.pop(patient, None)
+
+
+if __name__ == "__main__":
+    observations = [
+        ("bed 4", "heart_rate", (118, "beats per minute"), "08:00"),
+        ("bed 4", "temperature", (38.6, "degrees celsius"), "08:00"),
+        ("bed 4", "respiratory_rate", (24, "breaths per minute"), "08:05"),
+        ("bed 4", "temperature", (37.9, "degrees celsius"), "09:00"),
+        ("bed 4", "respiratory_rate", (18, "breaths per minute"), "09:30"),
+        ("bed 4", "respiratory_rate", (16, "breaths per minute"), "09:35"),
+        ("bed 7", "wbc", (15200.0, "µL"), "08:10"),
+        ("bed 7", "heart_rate", (95, "beats per minute"), "08:10"),
+    ]
+
+    stream = AlertStream("sirs", raise_at=3, clear_at=1)
+    for event in stream.observe_many(observations):
+        print(event)
+    print(stream.score("bed 4"), stream.criteria_met("bed 7"))
+
+    curb_65 = AlertStream("curb_65", raise_at=2)
+    curb_65.observe("bed 9", "age", (81, "years"))
+    print(curb_65.observe("bed 9", "bun", (8.9, "mmol/L"), "10:00"))
+    print(curb_65.observe("bed 9", "bun", (6.1, "mmol/L"), "14:00"))